@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分析结果统计
+流式分析时逐条累计评分统计，无需保留全部结果
+"""
+
+from typing import Dict
+
+from scoring import score_thresholds
+
+
+class RunningStats:
+    """单遍累计的评分统计"""
+
+    def __init__(self):
+        self.total = 0
+        self.excellent = 0
+        self.good = 0
+        self.fair = 0
+        self.score_sum = 0
+        self.excellent_threshold, self.good_threshold = score_thresholds()
+
+    def add(self, result: Dict):
+        """累计一条分析结果"""
+        score = result['score']
+        self.total += 1
+        self.score_sum += score
+        if score >= self.excellent_threshold:
+            self.excellent += 1
+        elif score >= self.good_threshold:
+            self.good += 1
+        else:
+            self.fair += 1
+
+    @property
+    def avg_score(self) -> float:
+        return self.score_sum / self.total if self.total else 0
+
+    def summary(self) -> Dict:
+        """与分析结果文件一致的统计字段"""
+        return {
+            'total_topics': self.total,
+            'excellent_count': self.excellent,
+            'good_count': self.good,
+            'fair_count': self.fair,
+            'avg_score': round(self.avg_score, 1)
+        }
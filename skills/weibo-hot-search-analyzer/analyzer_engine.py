@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+统一分析引擎接口
+- AnalyzerEngine: 分析引擎协议，所有引擎输出同一结构的结果；同步接口用于命令行，
+  在事件循环中（如异步抓取流程）使用 analyze_async / analyze_all_async
+- 引擎注册表：rules（关键词规则）、smart（SmartAnalyzer）、trend（TrendAnalyzer，AI/规则）
+- ChainEngine: 先用低成本引擎分析全部话题，只把得分或热度靠前的话题交给高成本引擎，
+  高成本引擎可设置单次运行的令牌和耗时预算
+"""
+
+import asyncio
+import re
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Type
+
+import enhanced_analyzer
+from analysis_stats import RunningStats
+from result_record import RESULT_SCHEMA
+from scoring import ScoreBatch, classify_score, heat_weight, np, rank_results
+from smart_analyzer import SmartAnalyzer
+from trend_analyzer import TrendAnalyzer, LLMBudget
+
+logger = logging.getLogger(__name__)
+
+_LIST_ITEM = re.compile(r'<li>(.*?)</li>', re.S)
+
+
+def normalize_result(result: Dict, engine: str) -> Dict:
+    """
+    把任一引擎的分析结果转换为统一结构
+
+    缺失的字段取缺省值，HTML 列表形式的事件时间线转换为字符串列表。
+
+    Args:
+        result: 引擎输出的分析结果
+        engine: 引擎名称
+
+    Returns:
+        只包含 RESULT_SCHEMA 字段的结果
+    """
+    normalized = {}
+    for key, default in RESULT_SCHEMA.items():
+        value = result.get(key, default)
+        normalized[key] = list(value) if isinstance(value, (list, tuple)) else value
+
+    timeline = normalized['event_timeline']
+    if isinstance(timeline, str):
+        normalized['event_timeline'] = [item.strip() for item in _LIST_ITEM.findall(timeline)] or (
+            [timeline.strip()] if timeline.strip() else []
+        )
+
+    if not normalized['score_class']:
+        normalized['score_class'] = classify_score(normalized['score'])
+    normalized['engine'] = result.get('engine') or engine
+    return normalized
+
+
+def summarize_results(results: List[Dict]) -> Dict:
+    """
+    汇总统计并排序
+
+    安装了 NumPy 时一次性计算等级统计、百分位和直方图，并按热度加权得分排序
+    （config.json 的 scoring.heat_weight，缺省为 0 即按总分排序）；否则只做等级统计并按总分排序。
+
+    Returns:
+        total_topics、excellent_count、good_count、fair_count、avg_score、topics，
+        有 NumPy 时另含 score_distribution
+    """
+    if np is None:
+        stats = RunningStats()
+        for result in results:
+            stats.add(result)
+        output = stats.summary()
+        output['topics'] = rank_results(results)
+        return output
+
+    batch = ScoreBatch.from_results(results)
+    summary = batch.summary()
+    weight = heat_weight()
+    output = {key: summary[key] for key in ('total_topics', 'excellent_count', 'good_count', 'fair_count', 'avg_score')}
+    output['topics'] = [results[i] for i in batch.ranking(weight)]
+    output['score_distribution'] = {
+        'percentiles': summary['percentiles'],
+        'histogram': summary['histogram'],
+        'heat_weight': weight
+    }
+    return output
+
+
+class AnalyzerEngine(ABC):
+    """
+    分析引擎协议
+
+    子类实现 analyze：按输入顺序返回与 topics 等长的统一结构结果，
+    分析失败的话题对应位置为 None；排名取话题在输入中的位置（从1开始）。
+    refine_only 为 True 时（作为级联的下一级），引擎无法完成自身分析的话题也返回 None，
+    以保留上一级的结果。
+    本身是异步实现的引擎同时覆盖 analyze_async，analyze 只在同步调用的边界上启动事件循环。
+    """
+
+    name = ''
+    refine_only = False
+
+    @abstractmethod
+    def analyze(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        """同步分析，不能在运行中的事件循环里调用（改用 analyze_async）"""
+
+    async def analyze_async(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        """异步分析，默认在线程中执行 analyze，不阻塞事件循环"""
+        return await asyncio.to_thread(self.analyze, topics)
+
+    def report(self) -> Dict:
+        """本次运行的调度和预算信息，没有时返回空字典"""
+        return {}
+
+    def _summarize(self, results: List[Optional[Dict]]) -> Dict:
+        output = {'analysis_time': datetime.now().isoformat()}
+        output.update(summarize_results([result for result in results if result is not None]))
+        report = self.report()
+        if report:
+            output['schedule'] = report
+        return output
+
+    def analyze_all(self, topics: List[Dict], max_topics: Optional[int] = 20) -> Dict:
+        """
+        分析话题并汇总统计，输出结构与 SmartAnalyzer.analyze_all 一致
+
+        Args:
+            topics: 热搜话题列表
+            max_topics: 最多分析的话题数，None 表示不限制
+
+        Returns:
+            分析结果和统计信息
+        """
+        return self._summarize(self.analyze(topics[:max_topics]))
+
+    async def analyze_all_async(self, topics: List[Dict], max_topics: Optional[int] = 20) -> Dict:
+        """analyze_all 的异步版本，可在运行中的事件循环里调用"""
+        return self._summarize(await self.analyze_async(topics[:max_topics]))
+
+
+# 引擎注册表：名称 -> 引擎类
+ENGINES: Dict[str, Type[AnalyzerEngine]] = {}
+
+
+def register_engine(name: str) -> Callable[[Type[AnalyzerEngine]], Type[AnalyzerEngine]]:
+    """注册分析引擎的类装饰器"""
+    def decorator(cls: Type[AnalyzerEngine]) -> Type[AnalyzerEngine]:
+        cls.name = name
+        ENGINES[name] = cls
+        return cls
+    return decorator
+
+
+def available_engines() -> List[str]:
+    return list(ENGINES)
+
+
+@register_engine('rules')
+class RulesEngine(AnalyzerEngine):
+    """关键词规则引擎（enhanced_analyzer），成本最低"""
+
+    def __init__(self, **options):
+        pass
+
+    def analyze(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        return [normalize_result(result, self.name) for result in enhanced_analyzer.analyze_iter(topics)]
+
+
+@register_engine('smart')
+class SmartEngine(AnalyzerEngine):
+    """SmartAnalyzer 模板引擎，输出完整的事件背景和产品方案"""
+
+    def __init__(self, tianapi_key: Optional[str] = None, workers: int = 1, store=None, **options):
+        """
+        Args:
+            tianapi_key: 天行数据API密钥
+            workers: 工作进程数
+            store: ResultStore，传入时启用增量分析
+        """
+        self.analyzer = SmartAnalyzer(tianapi_key)
+        self.workers = workers
+        self.store = store
+
+    def analyze(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        if self.store is not None:
+            results, _ = self.analyzer._analyze_incremental(topics, self.store, self.workers)
+        else:
+            results = self.analyzer.analyze_iter(topics, max_topics=None, workers=self.workers)
+        return [normalize_result(result, self.name) for result in results]
+
+    def analyze_all(self, topics: List[Dict], max_topics: Optional[int] = 20) -> Dict:
+        analyzed = self.analyzer.analyze_all(topics, store=self.store, max_topics=max_topics, workers=self.workers)
+        output = {'analysis_time': analyzed['analysis_time']}
+        output.update(summarize_results([normalize_result(result, self.name) for result in analyzed['topics']]))
+        if 'cache_stats' in analyzed:
+            output['cache_stats'] = analyzed['cache_stats']
+        return output
+
+
+@register_engine('trend')
+class TrendEngine(AnalyzerEngine):
+    """TrendAnalyzer 引擎：配置了 OpenAI 密钥时由AI生成创意，否则使用其规则引擎"""
+
+    def __init__(self, openai_api_key: Optional[str] = None, llm_cache=None,
+                 token_budget: int = 0, time_budget: float = 0, **options):
+        """
+        Args:
+            openai_api_key: OpenAI API密钥
+            llm_cache: LLMResponseCache 响应缓存
+            token_budget: 单次运行的令牌总数上限，0 表示不限
+            time_budget: 单次运行的AI调用耗时上限（秒），0 表示不限
+        """
+        self.budget = LLMBudget(token_budget, time_budget) if openai_api_key else None
+        self.analyzer = TrendAnalyzer(openai_api_key, cache=llm_cache, budget=self.budget)
+
+    # 作为级联的下一级却没有 OpenAI 密钥时的说明，写入调度信息
+    NO_KEY_NOTICE = '未设置 OpenAI 密钥，trend 引擎未调用AI'
+
+    def report(self) -> Dict:
+        if self.budget is not None:
+            return {'budget': self.budget.report()}
+        return {'notice': self.NO_KEY_NOTICE} if self.refine_only else {}
+
+    async def _collect(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        results: List[Optional[Dict]] = [None] * len(topics)
+        async for result in self.analyzer.analyze_iter(topics, max_topics=None):
+            # 级联时只采用AI生成的创意，预算用尽或调用失败降级为规则的话题保留上一级结果
+            if self.refine_only and result.get('idea_source') != 'ai':
+                continue
+            results[result['rank'] - 1] = normalize_result(result, self.name)
+        return results
+
+    async def analyze_async(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        if self.budget is not None:
+            self.budget.start()
+        elif self.refine_only:
+            logger.warning(f"{self.NO_KEY_NOTICE}，级联的入选话题保留上一级结果")
+        return await self._collect(topics)
+
+    def analyze(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        return asyncio.run(self.analyze_async(topics))
+
+
+class ChainEngine(AnalyzerEngine):
+    """
+    级联引擎
+
+    先用 first 分析全部话题，再按 first 的评分或话题热度挑选话题交给 second：
+    满足 min_score / min_heat 的话题按 rank_by 从高到低排序，取前 top_k 个，
+    并按这个优先级顺序提交，second 有预算时最重要的话题先用。
+    second 的非空字段覆盖 first 的结果，second 失败时保留 first 的结果。
+    """
+
+    RANK_FIELDS = {'score': 'score', 'heat': 'heat_value'}
+
+    def __init__(self, first: AnalyzerEngine, second: AnalyzerEngine,
+                 top_k: Optional[int] = 5, min_score: Optional[int] = None,
+                 min_heat: Optional[int] = None, rank_by: str = 'score'):
+        """
+        Args:
+            first: 低成本引擎，分析全部话题
+            second: 高成本引擎，只分析入选的话题
+            top_k: 最多交给 second 的话题数，None 表示不限制
+            min_score: 入选的最低分（按 first 的评分），None 表示不限制
+            min_heat: 入选的最低热度，None 表示不限制
+            rank_by: 入选话题的排序依据，score 或 heat
+
+        Raises:
+            ValueError: rank_by 不是 score 或 heat
+        """
+        if rank_by not in self.RANK_FIELDS:
+            raise ValueError(f"未知的排序依据: {rank_by}（可选: {', '.join(self.RANK_FIELDS)}）")
+        self.first = first
+        self.second = second
+        self.second.refine_only = True
+        self.top_k = top_k
+        self.min_score = min_score
+        self.min_heat = min_heat
+        self.rank_by = rank_by
+        self.name = f'{first.name}>{second.name}'
+        self.counts = {'topics': 0, 'selected': 0, 'refined': 0}
+
+    def select(self, results: List[Optional[Dict]]) -> List[int]:
+        """挑选交给 second 的话题位置（按优先级从高到低）"""
+        field = self.RANK_FIELDS[self.rank_by]
+        candidates = [
+            i for i, result in enumerate(results)
+            if result is not None
+            and (self.min_score is None or result['score'] >= self.min_score)
+            and (self.min_heat is None or result['heat_value'] >= self.min_heat)
+        ]
+        candidates.sort(key=lambda i: results[i][field], reverse=True)
+        return candidates if self.top_k is None else candidates[:self.top_k]
+
+    def _select(self, topics: List[Dict], results: List[Optional[Dict]]) -> List[int]:
+        selected = self.select(results)
+        self.counts['topics'] += len(topics)
+        self.counts['selected'] += len(selected)
+        logger.info(f"级联分析：{len(topics)} 个话题中 {len(selected)} 个交给 {self.second.name} 引擎")
+        return selected
+
+    def _merge(self, results: List[Optional[Dict]], selected: List[int], refined: List[Optional[Dict]]) -> List[Optional[Dict]]:
+        for i, result in zip(selected, refined):
+            if result is None:
+                continue
+            merged = dict(results[i]) if results[i] is not None else {}
+            for key, value in result.items():
+                if value not in ('', [], 0) or key not in merged:
+                    merged[key] = value
+            # 排名以原始列表为准
+            merged['rank'] = i + 1
+            merged['engine'] = self.name
+            results[i] = merged
+            self.counts['refined'] += 1
+        return results
+
+    def analyze(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        results = self.first.analyze(topics)
+        selected = self._select(topics, results)
+        if not selected:
+            return results
+        return self._merge(results, selected, self.second.analyze([topics[i] for i in selected]))
+
+    async def analyze_async(self, topics: List[Dict]) -> List[Optional[Dict]]:
+        results = await self.first.analyze_async(topics)
+        selected = self._select(topics, results)
+        if not selected:
+            return results
+        return self._merge(results, selected, await self.second.analyze_async([topics[i] for i in selected]))
+
+    def report(self) -> Dict:
+        report = {'engine': self.name, 'rank_by': self.rank_by, 'top_k': self.top_k}
+        report.update(self.counts)
+        for engine in (self.first, self.second):
+            engine_report = engine.report()
+            for key in ('budget', 'notice'):
+                if key in engine_report:
+                    report[key] = engine_report[key]
+        return report
+
+
+def create_engine(spec: str, top_k: Optional[int] = 5, min_score: Optional[int] = None,
+                  min_heat: Optional[int] = None, rank_by: str = 'score', **options) -> AnalyzerEngine:
+    """
+    按名称创建分析引擎
+
+    Args:
+        spec: 引擎名称，如 "smart"；用 ">" 连接表示级联，如 "rules>trend"
+        top_k: 级联时每一级交给下一级的话题数，None 表示不限制
+        min_score: 级联时入选下一级的最低分
+        min_heat: 级联时入选下一级的最低热度
+        rank_by: 级联时入选话题的排序依据，score 或 heat
+        **options: 传给各引擎构造函数的参数（不认识的参数会被忽略），
+                   如 trend 引擎的 token_budget / time_budget
+
+    Returns:
+        分析引擎
+
+    Raises:
+        ValueError: 引擎名称未注册
+    """
+    names = [name.strip() for name in spec.split('>')]
+    engines = []
+    for name in names:
+        if name not in ENGINES:
+            raise ValueError(f"未知的分析引擎: {name}（可选: {', '.join(available_engines())}）")
+        engines.append(ENGINES[name](**options))
+
+    engine = engines[0]
+    for second in engines[1:]:
+        engine = ChainEngine(engine, second, top_k=top_k, min_score=min_score, min_heat=min_heat, rank_by=rank_by)
+    return engine
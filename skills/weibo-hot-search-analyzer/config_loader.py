@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+配置加载
+读取与脚本同目录的 config.json，各模块按需取对应分节
+"""
+
+import json
+import os
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+
+_config_cache: Dict[str, Dict] = {}
+
+
+def load_config(path: Optional[str] = None) -> Dict:
+    """
+    加载配置文件（同一路径只读取一次）
+
+    Args:
+        path: 配置文件路径，默认为脚本目录下的 config.json
+
+    Returns:
+        配置字典，文件不存在或解析失败时返回空字典
+    """
+    path = path or DEFAULT_CONFIG_PATH
+    if path not in _config_cache:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                _config_cache[path] = json.load(f)
+        except FileNotFoundError:
+            _config_cache[path] = {}
+        except json.JSONDecodeError as e:
+            logger.error(f"配置文件解析失败: {path}: {e}")
+            _config_cache[path] = {}
+
+    return _config_cache[path]
+
+
+def get_section(name: str, path: Optional[str] = None) -> Dict:
+    """获取配置中的某个分节，不存在时返回空字典"""
+    return load_config(path).get(name, {}) or {}
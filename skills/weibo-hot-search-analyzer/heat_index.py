@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+热搜时间序列索引
+- 按归一化标题保存每个话题在各次快照中的排名和热度（array 紧凑存储）
+- 数据来自列式快照归档或已保存的JSON快照
+- 查询：热度/排名变化速度、到达峰值的时间、在榜时长、时间窗口内上升最快的话题
+"""
+
+import argparse
+import glob
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from statistics import median
+from typing import List, Dict, Optional, Iterable, Tuple, Union
+
+import serialization
+from snapshot_cache import normalize_title
+
+logger = logging.getLogger(__name__)
+
+TimeLike = Union[str, datetime, None]
+
+
+def _timestamp(value: TimeLike) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class TopicSeries:
+    """单个话题的时间序列：所在快照的序号、排名、热度"""
+
+    __slots__ = ('title', 'snapshots', 'ranks', 'heats')
+
+    def __init__(self, title: str):
+        self.title = title
+        self.snapshots = array('l')
+        self.ranks = array('l')
+        self.heats = array('q')
+
+    def window(self, lo: int, hi: int) -> Tuple[int, int]:
+        """快照序号在 [lo, hi) 内的数据点下标范围"""
+        return bisect_left(self.snapshots, lo), bisect_left(self.snapshots, hi)
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+
+class HeatIndex:
+    """按归一化标题索引的热搜时间序列"""
+
+    def __init__(self):
+        self.times = array('d')  # 各次快照的时间戳（秒），递增
+        self.topics: Dict[str, TopicSeries] = {}
+
+    # ---------- 构建 ----------
+
+    def add_snapshot(self, fetch_time: Union[str, datetime], items: List[Dict]):
+        """
+        追加一次快照，快照需按时间顺序追加
+
+        Args:
+            fetch_time: 抓取时间
+            items: 热搜列表（title、heat、rank）
+
+        Raises:
+            ValueError: 快照时间早于已索引的最后一次快照
+        """
+        ts = _timestamp(fetch_time)
+        if self.times and ts < self.times[-1]:
+            raise ValueError(f"快照需按时间顺序追加: {fetch_time}")
+        if not self.times or ts != self.times[-1]:
+            self.times.append(ts)
+        position = len(self.times) - 1
+
+        for i, item in enumerate(items):
+            title = item.get('title', '')
+            key = normalize_title(title)
+            series = self.topics.get(key)
+            if series is None:
+                series = self.topics[key] = TopicSeries(title)
+            elif series.snapshots and series.snapshots[-1] == position:
+                # 同一快照中重复出现的话题只取第一次
+                continue
+            series.title = title
+            series.snapshots.append(position)
+            series.ranks.append(int(item.get('rank', i + 1) or 0))
+            series.heats.append(int(item.get('heat', 0) or 0))
+
+    @classmethod
+    def from_snapshots(cls, snapshots: Iterable[Tuple[Union[str, datetime], List[Dict]]]) -> 'HeatIndex':
+        """由 (抓取时间, 热搜列表) 序列构建索引"""
+        index = cls()
+        for fetch_time, items in snapshots:
+            index.add_snapshot(fetch_time, items)
+        return index
+
+    @classmethod
+    def from_archive(cls, archive, start: TimeLike = None, end: TimeLike = None) -> 'HeatIndex':
+        """
+        由列式快照归档构建索引（逐列读取，不逐条构造字典）
+
+        Args:
+            archive: SnapshotArchive
+            start: 起始时间
+            end: 结束时间
+        """
+        table = archive.read(start, end, columns=['fetch_time', 'rank', 'title', 'heat'])
+        index = cls()
+        if not table.num_rows:
+            return index
+
+        last_time = None
+        position = -1
+        seen = set()
+        for fetch_time, rank, title, heat in zip(
+            table['fetch_time'].to_pylist(), table['rank'].to_pylist(),
+            table['title'].to_pylist(), table['heat'].to_pylist()
+        ):
+            if fetch_time != last_time:
+                index.times.append(fetch_time.timestamp())
+                last_time = fetch_time
+                position += 1
+                seen = set()
+
+            key = normalize_title(title)
+            if key in seen:
+                continue
+            seen.add(key)
+            series = index.topics.get(key)
+            if series is None:
+                series = index.topics[key] = TopicSeries(title)
+            series.title = title
+            series.snapshots.append(position)
+            series.ranks.append(rank or 0)
+            series.heats.append(heat or 0)
+        return index
+
+    @classmethod
+    def from_json_files(cls, paths: Iterable[str]) -> 'HeatIndex':
+        """由已保存的JSON快照文件（fetch_time + data）构建索引"""
+        snapshots = []
+        for path in paths:
+            snapshot = serialization.load(path)
+            if snapshot.get('fetch_time') and isinstance(snapshot.get('data'), list):
+                snapshots.append((datetime.fromisoformat(snapshot['fetch_time']), snapshot['data']))
+        snapshots.sort(key=lambda pair: pair[0])
+        return cls.from_snapshots(snapshots)
+
+    # ---------- 查询 ----------
+
+    def _range(self, start: TimeLike, end: TimeLike) -> Tuple[int, int]:
+        """时间范围（含两端）对应的快照序号 [lo, hi)"""
+        start_ts = _timestamp(start)
+        end_ts = _timestamp(end)
+        lo = 0 if start_ts is None else bisect_left(self.times, start_ts)
+        hi = len(self.times) if end_ts is None else bisect_right(self.times, end_ts)
+        return lo, hi
+
+    def _interval(self) -> float:
+        """快照的典型间隔（秒）"""
+        if len(self.times) < 2:
+            return 0.0
+        step = max(1, len(self.times) // 1000)
+        gaps = [self.times[i + 1] - self.times[i] for i in range(0, len(self.times) - 1, step)]
+        return median(gaps)
+
+    def get(self, title: str) -> Optional[TopicSeries]:
+        return self.topics.get(normalize_title(title))
+
+    def series(self, title: str, start: TimeLike = None, end: TimeLike = None) -> List[Dict]:
+        """话题在时间范围内的数据点：[{'time', 'rank', 'heat'}]"""
+        topic = self.get(title)
+        if topic is None:
+            return []
+        a, b = topic.window(*self._range(start, end))
+        return [
+            {
+                'time': datetime.fromtimestamp(self.times[topic.snapshots[i]]).isoformat(),
+                'rank': topic.ranks[i],
+                'heat': topic.heats[i]
+            }
+            for i in range(a, b)
+        ]
+
+    def velocity(self, title: str, start: TimeLike = None, end: TimeLike = None) -> Optional[Dict]:
+        """
+        话题在时间范围内的变化速度
+
+        Returns:
+            heat_per_minute: 热度每分钟变化；rank_per_hour: 排名每小时上升的名次（正数表示上升），
+            数据点不足两个时返回 None
+        """
+        topic = self.get(title)
+        if topic is None:
+            return None
+        a, b = topic.window(*self._range(start, end))
+        if b - a < 2:
+            return None
+        elapsed = self.times[topic.snapshots[b - 1]] - self.times[topic.snapshots[a]]
+        if elapsed <= 0:
+            return None
+        return {
+            'title': topic.title,
+            'heat_change': topic.heats[b - 1] - topic.heats[a],
+            'rank_change': topic.ranks[a] - topic.ranks[b - 1],
+            'heat_per_minute': round((topic.heats[b - 1] - topic.heats[a]) / elapsed * 60, 2),
+            'rank_per_hour': round((topic.ranks[a] - topic.ranks[b - 1]) / elapsed * 3600, 2)
+        }
+
+    def time_to_peak(self, title: str, start: TimeLike = None, end: TimeLike = None) -> Optional[Dict]:
+        """
+        从首次上榜到热度峰值的时间
+
+        Returns:
+            first_seen、peak_time、peak_heat、peak_rank（最高名次）、seconds_to_peak
+        """
+        topic = self.get(title)
+        if topic is None:
+            return None
+        a, b = topic.window(*self._range(start, end))
+        if a >= b:
+            return None
+        heats = topic.heats
+        peak = max(range(a, b), key=heats.__getitem__)
+        first_ts = self.times[topic.snapshots[a]]
+        peak_ts = self.times[topic.snapshots[peak]]
+        return {
+            'title': topic.title,
+            'first_seen': datetime.fromtimestamp(first_ts).isoformat(),
+            'peak_time': datetime.fromtimestamp(peak_ts).isoformat(),
+            'peak_heat': heats[peak],
+            'peak_rank': min(topic.ranks[a:b]),
+            'seconds_to_peak': peak_ts - first_ts
+        }
+
+    def dwell_time(self, title: str, start: TimeLike = None, end: TimeLike = None) -> Optional[Dict]:
+        """
+        话题在榜时长：每次在榜的快照计入到下一次快照的间隔（最后一次快照按典型间隔计）
+
+        Returns:
+            appearances（在榜快照数）、seconds（在榜总时长）、first_seen、last_seen
+        """
+        topic = self.get(title)
+        if topic is None:
+            return None
+        lo, hi = self._range(start, end)
+        a, b = topic.window(lo, hi)
+        if a >= b:
+            return None
+
+        interval = self._interval()
+        last = len(self.times) - 1
+        seconds = 0.0
+        for i in range(a, b):
+            position = topic.snapshots[i]
+            seconds += self.times[position + 1] - self.times[position] if position < last else interval
+        return {
+            'title': topic.title,
+            'appearances': b - a,
+            'seconds': seconds,
+            'first_seen': datetime.fromtimestamp(self.times[topic.snapshots[a]]).isoformat(),
+            'last_seen': datetime.fromtimestamp(self.times[topic.snapshots[b - 1]]).isoformat()
+        }
+
+    def top_risers(self, start: TimeLike = None, end: TimeLike = None,
+                   limit: int = 10, by: str = 'heat') -> List[Dict]:
+        """
+        时间窗口内上升最快的话题
+
+        窗口开始时不在榜的话题按从0热度（或榜单末尾）起算。
+
+        Args:
+            start: 窗口起始时间
+            end: 窗口结束时间
+            limit: 返回的话题数
+            by: heat 按热度增量排序，rank 按排名上升名次排序
+
+        Returns:
+            [{'title', 'heat_change', 'rank_change', 'start_heat', 'end_heat', 'start_rank', 'end_rank'}]
+
+        Raises:
+            ValueError: by 不是 heat 或 rank
+        """
+        if by not in ('heat', 'rank'):
+            raise ValueError(f"未知的排序依据: {by}（可选: heat, rank）")
+        lo, hi = self._range(start, end)
+        if lo >= hi:
+            return []
+
+        risers = []
+        for topic in self.topics.values():
+            snapshots = topic.snapshots
+            # 窗口外的话题直接跳过，避免二分查找
+            if not snapshots or snapshots[-1] < lo or snapshots[0] >= hi:
+                continue
+            a, b = topic.window(lo, hi)
+            if a >= b:
+                continue
+            # 窗口开始时已在榜则以当时的数据为起点，否则视为新上榜
+            if snapshots[a] == lo:
+                start_heat, start_rank = topic.heats[a], topic.ranks[a]
+            else:
+                start_heat, start_rank = 0, None
+            end_heat, end_rank = topic.heats[b - 1], topic.ranks[b - 1]
+            risers.append({
+                'title': topic.title,
+                'heat_change': end_heat - start_heat,
+                'rank_change': (start_rank - end_rank) if start_rank is not None else None,
+                'start_heat': start_heat,
+                'end_heat': end_heat,
+                'start_rank': start_rank,
+                'end_rank': end_rank
+            })
+
+        if by == 'heat':
+            risers.sort(key=lambda r: r['heat_change'], reverse=True)
+        else:
+            # 新上榜的话题按从榜单末尾上升计算
+            floor = max((r['start_rank'] or 0 for r in risers), default=0) + 1
+            risers.sort(key=lambda r: (r['start_rank'] or floor) - r['end_rank'], reverse=True)
+        return risers[:limit]
+
+    def stats(self) -> Dict:
+        return {
+            'snapshots': len(self.times),
+            'topics': len(self.topics),
+            'points': sum(len(topic) for topic in self.topics.values())
+        }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='热搜时间序列查询工具')
+    parser.add_argument('--archive', help='列式快照归档目录')
+    parser.add_argument('--json', nargs='*', default=[], help='JSON快照文件（未使用归档时）')
+    parser.add_argument('--start', help='窗口起始时间（ISO 格式）')
+    parser.add_argument('--end', help='窗口结束时间（ISO 格式）')
+    parser.add_argument('--topic', nargs='*', default=[], help='要查询的话题标题')
+    parser.add_argument('--risers', type=int, default=10, help='输出上升最快的话题数')
+    parser.add_argument('--by', choices=['heat', 'rank'], default='heat', help='上升榜的排序依据')
+
+    args = parser.parse_args()
+
+    if args.archive:
+        from snapshot_archive import SnapshotArchive
+        index = HeatIndex.from_archive(SnapshotArchive(args.archive))
+    else:
+        paths = [path for pattern in args.json for path in glob.glob(pattern)]
+        index = HeatIndex.from_json_files(paths)
+    print(f"📚 索引: {index.stats()}")
+
+    for title in args.topic:
+        print(f"\n🔍 {title}")
+        print(f"   速度: {index.velocity(title, args.start, args.end)}")
+        print(f"   峰值: {index.time_to_peak(title, args.start, args.end)}")
+        print(f"   在榜: {index.dwell_time(title, args.start, args.end)}")
+
+    print(f"\n🚀 上升最快的 {args.risers} 个话题（按{args.by}）:")
+    for riser in index.top_risers(args.start, args.end, args.risers, args.by):
+        print(f"   {riser['title']}: 热度 {riser['start_heat']} → {riser['end_heat']}，"
+              f"排名 {riser['start_rank'] or '-'} → {riser['end_rank']}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+共享HTTP客户端
+- 按 config.json 的 api.timeout / api.retry_count 设置超时和重试
+- 指数退避 + 随机抖动
+- 按主机的熔断器，上游持续故障时快速失败
+- 按主机的请求延迟直方图
+"""
+
+import asyncio
+import random
+import time
+import logging
+from bisect import bisect_left
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+from config_loader import get_section
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# 可重试的HTTP状态码
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.RequestException):
+    """熔断器打开，请求被直接拒绝"""
+
+
+class RetryableStatusError(requests.RequestException):
+    """上游返回可重试的状态码"""
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续 failure_threshold 次调用在重试用尽后仍失败则打开，在 reset_timeout 秒内
+    拒绝所有请求；之后进入半开状态，只放行一个试探请求，其余请求在试探有结果前继续被拒绝；
+    试探成功则关闭，失败则立即重新打开。试探超过 reset_timeout 仍无结果（如请求被取消）时放行新的试探。
+    只统计连接错误、超时和可重试状态码，其余错误说明上游可达，按成功处理。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """当前是否允许发出请求"""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+        if self.probe_started is not None and now - self.probe_started < self.reset_timeout:
+            return False
+        self.probe_started = now
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self.probe_started = None
+
+
+class LatencyHistogram:
+    """请求延迟直方图（毫秒分桶）"""
+
+    BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def percentile(self, p: float) -> Optional[float]:
+        """按分桶上界估算百分位延迟（毫秒），超出最大分桶时返回 inf"""
+        if not self.total:
+            return None
+        target = p / 100 * self.total
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def summary(self) -> Dict:
+        labels = [f'<={bound}ms' for bound in self.BUCKETS_MS] + [f'>{self.BUCKETS_MS[-1]}ms']
+        return {
+            'count': self.total,
+            'avg_ms': round(self.sum_ms / self.total, 1) if self.total else None,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class HttpClient:
+    """带重试、熔断和延迟统计的HTTP客户端"""
+
+    def __init__(self, timeout: float = 10, retry_count: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8,
+                 failure_threshold: int = 5, reset_timeout: float = 30,
+                 session: Optional[requests.Session] = None):
+        """
+        初始化客户端
+
+        Args:
+            timeout: 单次请求超时时间（秒）
+            retry_count: 首次请求失败后的最大重试次数
+            backoff_base: 退避基准时间（秒），第 n 次重试前最多等待 backoff_base * 2^n
+            backoff_max: 单次退避的最长时间（秒）
+            failure_threshold: 熔断器打开前允许的连续失败次数
+            reset_timeout: 熔断器打开后多久进入半开状态（秒）
+            session: 复用的 requests 会话
+        """
+        self.timeout = timeout
+        self.retry_count = max(0, retry_count)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = session or requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    @classmethod
+    def from_config(cls, config_path: Optional[str] = None, **overrides) -> 'HttpClient':
+        """按 config.json 中的 api 分节创建客户端"""
+        api_config = get_section('api', config_path)
+        options = {
+            'timeout': api_config.get('timeout', 10),
+            'retry_count': api_config.get('retry_count', 3)
+        }
+        options.update(overrides)
+        return cls(**options)
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def _histogram(self, host: str) -> LatencyHistogram:
+        histogram = self.histograms.get(host)
+        if histogram is None:
+            histogram = self.histograms[host] = LatencyHistogram()
+        return histogram
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（全抖动指数退避）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _before_attempt(self, host: str, url: str):
+        if not self._breaker(host).allow():
+            raise CircuitOpenError(f"熔断器已打开，跳过请求: {url}")
+
+    def _after_attempt(self, host: str, started: float, error: Optional[Exception]):
+        self._histogram(host).record(time.monotonic() - started)
+        breaker = self._breaker(host)
+        if error is None:
+            breaker.record_success()
+        elif breaker.state == CircuitBreaker.HALF_OPEN:
+            # 试探请求失败，立即重新打开，不再重试
+            breaker.record_failure()
+
+    def _should_retry(self, host: str, attempt: int, url: str, error: Exception) -> bool:
+        breaker = self._breaker(host)
+        if breaker.state == CircuitBreaker.OPEN:
+            return False
+        if attempt >= self.retry_count:
+            breaker.record_failure()
+            return False
+        logger.warning(f"请求失败，准备第 {attempt + 1} 次重试: {url}: {error}")
+        return True
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        发送GET请求，连接错误、超时和可重试状态码会按退避策略重试
+
+        Returns:
+            成功的响应（非可重试状态码，未调用 raise_for_status）
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+            requests.RequestException: 重试用尽后的最后一次错误
+        """
+        host = urlsplit(url).netloc
+        kwargs.setdefault('timeout', self.timeout)
+
+        attempt = 0
+        while True:
+            self._before_attempt(host, url)
+            started = time.monotonic()
+            error = None
+            try:
+                response = self.session.get(url, **kwargs)
+                if response.status_code in RETRY_STATUS_CODES:
+                    error = RetryableStatusError(f"HTTP {response.status_code}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except Exception:
+                # 其他错误说明上游可达，不计入熔断
+                self._after_attempt(host, started, None)
+                raise
+            self._after_attempt(host, started, error)
+
+            if error is None:
+                return response
+            if not self._should_retry(host, attempt, url, error):
+                raise error
+            time.sleep(self.backoff(attempt))
+            attempt += 1
+
+    async def get_json_async(self, session: aiohttp.ClientSession, url: str):
+        """
+        在 aiohttp 会话上发送GET请求并解析JSON，重试和熔断策略与 get 相同
+
+        Raises:
+            CircuitOpenError: 熔断器打开
+            aiohttp.ClientError / asyncio.TimeoutError: 重试用尽后的最后一次错误
+        """
+        host = urlsplit(url).netloc
+
+        attempt = 0
+        while True:
+            self._before_attempt(host, url)
+            started = time.monotonic()
+            error = None
+            data = None
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                    if response.status in RETRY_STATUS_CODES:
+                        error = aiohttp.ClientResponseError(
+                            response.request_info, response.history,
+                            status=response.status, message=response.reason or ''
+                        )
+                    else:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = e
+            except Exception:
+                # 其他错误说明上游可达，不计入熔断
+                self._after_attempt(host, started, None)
+                raise
+            self._after_attempt(host, started, error)
+
+            if error is None:
+                return data
+            if not self._should_retry(host, attempt, url, error):
+                raise error
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Dict]:
+        """各主机的延迟直方图和熔断器状态"""
+        return {
+            host: {
+                'latency': histogram.summary(),
+                'circuit': self._breaker(host).state
+            }
+            for host, histogram in self.histograms.items()
+        }
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LLM 响应缓存
+- 以 (模型, 温度, 请求内容, 搜索信息) 的哈希为键，请求内容由调用方只取稳定的输入（如归一化标题），把响应内容保存在本地 SQLite
+- 条目超过 TTL 后失效
+- 条目数超过上限时按最近访问时间淘汰（LRU）
+- 统计命中/未命中次数
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.llm_cache', 'responses.sqlite3')
+
+
+class LLMResponseCache:
+    """基于 SQLite 的 LLM 响应缓存"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = 6 * 3600, max_entries: int = 5000):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite 数据库文件路径
+            ttl: 条目有效期（秒），0 表示永不过期
+            max_entries: 最多保留的条目数，超出时淘汰最久未访问的条目
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 异步分析时可能从执行器线程访问，所有操作串行化
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' content TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)')
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, temperature: float, messages: Any, search_info: Optional[Dict] = None) -> str:
+        """
+        根据请求参数计算缓存键
+
+        Args:
+            model: 模型名称
+            temperature: 温度
+            messages: 请求内容（消息列表或其他可 JSON 序列化的值），应只包含不随轮询变化的输入
+            search_info: 搜索信息
+        """
+        payload = json.dumps(
+            {'model': model, 'temperature': temperature, 'messages': messages, 'search_info': search_info or {}},
+            ensure_ascii=False, sort_keys=True, separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存的响应内容，未命中或已过期时返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute('SELECT content, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+
+            with self.conn:
+                self.conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, content: str):
+        """写入响应内容，必要时淘汰过期和最久未访问的条目"""
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (key, content, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, content, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        if self.ttl:
+            self.conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+
+        count = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                'DELETE FROM responses WHERE key IN ('
+                ' SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def stats(self) -> Dict:
+        """命中统计"""
+        with self._lock:
+            entries = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0,
+            'entries': entries
+        }
+
+    def close(self):
+        self.conn.close()
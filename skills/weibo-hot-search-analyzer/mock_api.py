@@ -6,9 +6,12 @@
 提供测试用的热搜数据
 """
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from datetime import datetime
+import hashlib
 import json
+import random
+import time
 
 app = Flask(__name__)
 
@@ -106,15 +109,34 @@ MOCK_DATA = [
     }
 ]
 
+MOCK_DATA_ETAG = hashlib.sha1(json.dumps(MOCK_DATA, ensure_ascii=False).encode('utf-8')).hexdigest()
+
 @app.route('/hotsearch')
 def get_hot_search():
-    """返回模拟的热搜数据"""
-    return jsonify({
+    """
+    返回模拟的热搜数据
+
+    支持通过查询参数注入故障，用于测试重试和熔断：
+    - fail_rate: 以该概率返回 503（0-1）
+    - delay: 响应前等待的秒数
+    """
+    delay = request.args.get('delay', type=float, default=0)
+    if delay > 0:
+        time.sleep(delay)
+
+    fail_rate = request.args.get('fail_rate', type=float, default=0)
+    if fail_rate > 0 and random.random() < fail_rate:
+        return jsonify({"code": 503, "msg": "injected fault"}), 503
+
+    response = jsonify({
         "code": 0,
         "msg": "success",
         "data": MOCK_DATA,
         "time": datetime.now().isoformat()
     })
+    # ETag 只取决于榜单内容，便于测试条件请求
+    response.set_etag(MOCK_DATA_ETAG)
+    return response.make_conditional(request)
 
 @app.route('/health')
 def health_check():
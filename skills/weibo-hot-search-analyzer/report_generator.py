@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json
 from datetime import datetime
 from typing import List, Dict
 import argparse
 import logging
-from jinja2 import Environment, FileSystemLoader
 import os
 
+from report_renderer import ReportRenderer, VirtualReportRenderer, ENHANCEMENTS_TEMPLATE, references_template
+from results_format import load_results
+from scoring import rank_results
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -20,17 +22,29 @@ logger = logging.getLogger(__name__)
 class ReportGenerator:
     """HTML报告生成器"""
 
-    def __init__(self, template_path: str):
+    def __init__(self, template_path: str, virtual: bool = False):
         """
         初始化报告生成器
 
         Args:
             template_path: HTML模板文件路径
+            virtual: 生成虚拟列表报告（report_template_virtual.html，适合几千个话题），忽略 template_path
         """
         self.template_path = template_path
-        self.env = Environment(
-            loader=FileSystemLoader(os.path.dirname(template_path))
-        )
+        self.virtual = virtual
+        # 共享 Environment，模板只加载、编译一次
+        if virtual:
+            self.renderer = VirtualReportRenderer()
+        else:
+            self.renderer = ReportRenderer(os.path.basename(template_path), os.path.dirname(template_path) or '.')
+        self.env = self.renderer.env
+        self.enhanced = virtual or references_template(self.env, self.renderer.template.name, ENHANCEMENTS_TEMPLATE)
+        if not self.enhanced:
+            # 交互增强脚本不再在渲染后插入，自定义模板需要自行引入
+            logger.warning(
+                f"模板 {template_path} 未引入 {ENHANCEMENTS_TEMPLATE}，报告将不含打印按钮和高分动画；"
+                f"请在 </body> 前加入 {{% if enhance %}}{{% include '{ENHANCEMENTS_TEMPLATE}' %}}{{% endif %}}"
+            )
 
     def generate_report(self, analysis_data: Dict, output_file: str):
         """
@@ -41,122 +55,16 @@ class ReportGenerator:
             output_file: 输出HTML文件路径
         """
         try:
-            # 加载模板
-            template_name = os.path.basename(self.template_path)
-            template = self.env.get_template(template_name)
-
-            # 准备模板数据
-            template_data = {
-                'date': datetime.now().strftime('%Y年%m月%d日 %H:%M'),
-                'total_topics': analysis_data.get('total_topics', 0),
-                'excellent_count': analysis_data.get('excellent_count', 0),
-                'good_count': analysis_data.get('good_count', 0),
-                'avg_score': analysis_data.get('avg_score', 0),
-                'topics': analysis_data.get('topics', [])
-            }
-
-            # 按分数排序话题（高分在前）
-            template_data['topics'].sort(key=lambda x: x.get('score', 0), reverse=True)
-
-            # 渲染HTML
-            html_content = template.render(**template_data)
+            # 按分数（或 scoring.heat_weight 热度加权得分）排序话题
+            analysis_data['topics'] = rank_results(analysis_data.get('topics', []))
 
-            # 添加自定义CSS和JavaScript增强
-            html_content = self._enhance_html(html_content)
-
-            # 保存文件
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-
-            logger.info(f"HTML报告已生成: {output_file}")
+            # 流式渲染并写入文件，交互增强脚本由模板引入（enhance，虚拟列表报告自带交互）
+            self.renderer.render_to_file(analysis_data, output_file, enhance=not self.virtual)
 
         except Exception as e:
             logger.error(f"生成报告失败: {e}")
             raise
 
-    def _enhance_html(self, html_content: str) -> str:
-        """
-        增强HTML内容
-
-        Args:
-            html_content: 原始HTML内容
-
-        Returns:
-            增强后的HTML内容
-        """
-        # 添加交互功能
-        script = """
-        <script>
-        // 添加一些交互功能
-        document.addEventListener('DOMContentLoaded', function() {
-            // 展开/收起详情功能
-            const sections = document.querySelectorAll('.section');
-            sections.forEach(section => {
-                const h3 = section.querySelector('h3');
-                if (h3) {
-                    h3.style.cursor = 'pointer';
-                    h3.addEventListener('click', function() {
-                        const content = section.querySelector('.event-timeline, .product-idea, .score-breakdown');
-                        if (content) {
-                            content.style.display = content.style.display === 'none' ? 'block' : 'none';
-                        }
-                    });
-                }
-            });
-
-            // 高亮高分创意
-            const scoreBadges = document.querySelectorAll('.score-badge');
-            scoreBadges.forEach(badge => {
-                const score = parseInt(badge.textContent);
-                if (score >= 80) {
-                    badge.style.animation = 'pulse 2s infinite';
-                }
-            });
-
-            // 添加打印按钮
-            const header = document.querySelector('.header');
-            const printBtn = document.createElement('button');
-            printBtn.textContent = '🖨️ 打印报告';
-            printBtn.style.cssText = `
-                position: absolute;
-                top: 20px;
-                right: 20px;
-                padding: 10px 20px;
-                background: white;
-                color: #667eea;
-                border: none;
-                border-radius: 5px;
-                cursor: pointer;
-                font-weight: bold;
-            `;
-            printBtn.onclick = () => window.print();
-            header.style.position = 'relative';
-            header.appendChild(printBtn);
-        });
-        </script>
-
-        <style>
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.05); }
-            100% { transform: scale(1); }
-        }
-
-        .score-excellent {
-            animation: pulse 2s infinite;
-        }
-
-        @media print {
-            button { display: none !important; }
-        }
-        </style>
-        """
-
-        # 在</body>标签前插入脚本
-        html_content = html_content.replace('</body>', script + '</body>')
-
-        return html_content
-
     def generate_summary_report(self, analysis_data: Dict) -> str:
         """
         生成摘要报告（Markdown格式）
@@ -168,7 +76,7 @@ class ReportGenerator:
             Markdown格式的摘要报告
         """
         topics = analysis_data.get('topics', [])
-        topics_sorted = sorted(topics, key=lambda x: x.get('score', 0), reverse=True)
+        topics_sorted = rank_results(topics)
 
         markdown = f"""# 微博热搜产品创意分析摘要
 
@@ -230,18 +138,19 @@ def add_date_to_filename(filename: str, date_str: str = None) -> str:
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='HTML报告生成工具')
-    parser.add_argument('--input', required=True, help='分析结果JSON文件路径')
+    parser.add_argument('--input', required=True, help='分析结果JSON文件路径（完整格式或去重格式）')
     parser.add_argument('--output', default='weibo_hotsearch_report.html', help='输出HTML文件路径')
     parser.add_argument('--template', default='report_template.html', help='HTML模板文件路径')
     parser.add_argument('--summary', help='输出Markdown摘要文件路径（可选）')
     parser.add_argument('--no-date', action='store_true', help='不在文件名中添加日期')
+    parser.add_argument('--by-category', action='store_true', help='另外按话题分类各生成一份HTML报告')
+    parser.add_argument('--virtual', action='store_true', help='生成虚拟列表报告（只渲染可视范围内的话题，适合几千个话题）')
 
     args = parser.parse_args()
 
     try:
-        # 读取分析数据
-        with open(args.input, 'r', encoding='utf-8') as f:
-            analysis_data = json.load(f)
+        # 读取分析数据（完整格式或去重格式）
+        analysis_data = load_results(args.input)
 
         # 添加日期到文件名（除非指定了--no-date）
         if not args.no_date:
@@ -260,11 +169,17 @@ def main():
             summary_output = args.summary
 
         # 创建报告生成器
-        generator = ReportGenerator(args.template)
+        generator = ReportGenerator(args.template, virtual=args.virtual)
 
         # 生成HTML报告
         generator.generate_report(analysis_data, html_output)
 
+        # 按分类生成报告（复用已加载的模板）
+        category_reports = {}
+        if args.by_category:
+            name, ext = os.path.splitext(html_output)
+            category_reports = generator.renderer.render_by_category(analysis_data, f'{name}_{{category}}{ext}', enhance=not args.virtual)
+
         # 生成摘要报告（如果指定）
         if summary_output:
             summary_content = generator.generate_summary_report(analysis_data)
@@ -274,6 +189,8 @@ def main():
 
         print(f"\n报告生成成功")
         print(f"HTML报告: {html_output}")
+        for category, path in category_reports.items():
+            print(f"  {category}: {path}")
         if summary_output:
             print(f"Markdown摘要: {summary_output}")
 
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+报告渲染服务
+- 进程内共享 Jinja2 Environment，同一模板只加载、编译一次
+- 编译结果通过 FileSystemBytecodeCache 写入磁盘，新进程冷启动时跳过模板编译
+- 默认关闭 auto_reload，取模板时不再检查文件修改时间（调试模板时可在 config.json 的 report 分节打开）
+- 一个已加载的模板可连续渲染多份报告（每个快照或每个分类一份）
+- 写文件时用 Template.generate() 逐块输出，不在内存中拼出整份HTML
+- FragmentCache: report_template_v2.html 的话题卡片和产品创意部分按内容哈希缓存在 SQLite 中，
+  分钟级刷新后重新生成报告时只渲染有变化的话题
+- VirtualReportRenderer: 话题数据以去重格式的 JSON 嵌入页面一次，浏览器只渲染可视范围内的卡片，
+  展开卡片时才生成详情，适合几千个话题的报告
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable, Tuple, Any
+
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateNotFound, meta
+from markupsafe import Markup, escape
+
+from analysis_stats import RunningStats
+from config_loader import get_section
+from results_format import pack_results
+import serialization
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BYTECODE_DIR = os.path.join(TEMPLATE_DIR, '.template_cache')
+DEFAULT_FRAGMENT_PATH = os.path.join(TEMPLATE_DIR, '.fragment_cache', 'fragments.sqlite3')
+DEFAULT_TEMPLATE = 'report_template_v2.html'
+VIRTUAL_TEMPLATE = 'report_template_virtual.html'
+
+# 可单独缓存的片段模板
+TOPIC_CARD_TEMPLATE = 'report_topic_card.html'
+PRODUCT_SECTION_TEMPLATE = 'report_product_section.html'
+
+# 每次批量读取的片段数（SQLite 参数个数上限以内）
+PREFETCH_BATCH = 500
+
+# 片段的访问时间间隔超过这么多秒才更新
+TOUCH_INTERVAL = 3600
+
+# 交互增强脚本（打印按钮、高分动画），由报告模板引入
+ENHANCEMENTS_TEMPLATE = 'report_enhancements.html'
+
+# 产品创意部分用到的话题字段
+PRODUCT_SECTION_FIELDS = (
+    'product_name',
+    'product_slogan',
+    'core_function',
+    'target_users',
+    'feature_list',
+    'user_pain_points',
+    'solution',
+    'business_model',
+    'competitive_advantage',
+    'implementation_steps'
+)
+
+# 缓存的话题卡片中排名的占位符，取出片段后填入本次的排名
+RANK_SLOT = '{rank}'
+
+# 话题卡片（含产品创意部分）用到的话题字段；排名以占位符缓存，热度不在卡片中显示，
+# 两者变化时缓存仍然命中
+TOPIC_CARD_FIELDS = (
+    'title',
+    'category',
+    'score_class',
+    'score',
+    'event_summary',
+    'key_points',
+    'event_timeline',
+    'public_opinion',
+    'related_topics',
+    'interestingness',
+    'usefulness',
+    'market_analysis'
+) + PRODUCT_SECTION_FIELDS
+
+# 流式写入时攒够这么多字符再写一次文件
+WRITE_BUFFER_CHARS = 64 * 1024
+
+_environments: Dict[Tuple[str, str, bool], Environment] = {}
+_lock = threading.Lock()
+
+
+def get_environment(template_dir: str = TEMPLATE_DIR, cache_dir: Optional[str] = None,
+                    auto_reload: Optional[bool] = None) -> Environment:
+    """
+    获取共享的 Jinja2 Environment（同一模板目录、缓存目录和 auto_reload 设置只创建一次）
+
+    Args:
+        template_dir: 模板目录
+        cache_dir: 字节码缓存目录，默认取 config.json 的 report.bytecode_cache_dir，未设置时为 .template_cache
+        auto_reload: 模板文件修改后是否自动重新加载，默认取 config.json 的 report.auto_reload（缺省关闭）
+
+    Returns:
+        Environment
+    """
+    report_config = get_section('report')
+    cache_dir = cache_dir or report_config.get('bytecode_cache_dir') or DEFAULT_BYTECODE_DIR
+    if auto_reload is None:
+        auto_reload = report_config.get('auto_reload', False)
+
+    key = (os.path.abspath(template_dir), os.path.abspath(cache_dir), bool(auto_reload))
+    with _lock:
+        env = _environments.get(key)
+        if env is None:
+            os.makedirs(cache_dir, exist_ok=True)
+            # 模板目录之后总会搜索脚本目录，自定义模板也能引入内置的 report_enhancements.html
+            env = Environment(
+                loader=FileSystemLoader(list(dict.fromkeys([template_dir, TEMPLATE_DIR]))),
+                bytecode_cache=FileSystemBytecodeCache(cache_dir),
+                auto_reload=bool(auto_reload)
+            )
+            _environments[key] = env
+    return env
+
+
+def references_template(env: Environment, template_name: str, target: str) -> bool:
+    """
+    模板是否（直接或经 extends/include/import 间接）引用了 target
+
+    只能识别模板名为字符串常量的引用；动态模板名视为未引用。
+
+    Args:
+        env: Environment
+        template_name: 要检查的模板
+        target: 被引用的模板名
+
+    Returns:
+        是否引用
+    """
+    pending = [template_name]
+    seen = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            source, _, _ = env.loader.get_source(env, name)
+        except TemplateNotFound:
+            continue
+        for referenced in meta.find_referenced_templates(env.parse(source)):
+            if referenced == target:
+                return True
+            if referenced is not None:
+                pending.append(referenced)
+    return False
+
+
+def build_report_context(analysis_data: Dict, **extra) -> Dict:
+    """
+    由分析结果构建模板数据
+
+    Args:
+        analysis_data: 分析结果数据
+        **extra: 其他模板变量，如 enhance=True 引入交互增强脚本
+    """
+    context = {
+        'date': datetime.now().strftime('%Y年%m月%d日 %H:%M'),
+        'total_topics': analysis_data.get('total_topics', 0),
+        'excellent_count': analysis_data.get('excellent_count', 0),
+        'good_count': analysis_data.get('good_count', 0),
+        'avg_score': analysis_data.get('avg_score', 0),
+        'topics': analysis_data.get('topics', [])
+    }
+    context.update(extra)
+    return context
+
+
+def _safe_filename(name: str) -> str:
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', name).strip('_') or 'other'
+
+
+class FragmentCache:
+    """
+    HTML片段缓存（内存 LRU + SQLite）
+
+    片段按模板源码和所用话题字段的哈希作为键：话题卡片以整个话题为键，
+    产品创意部分只以 PRODUCT_SECTION_FIELDS 为键，同一产品模板的话题共用一份。
+    模板修改后哈希随之变化，旧片段不再命中，最终按最久未使用淘汰。
+    渲染前由 prefetch() 批量读取，新片段和访问时间在 flush() 时批量写入；
+    访问时间超过 TOUCH_INTERVAL 才更新，频繁刷新时不产生额外写入。
+    """
+
+    def __init__(self, path: str = DEFAULT_FRAGMENT_PATH, env: Optional[Environment] = None,
+                 memory_size: int = 4096, max_entries: int = 20000):
+        """
+        初始化片段缓存
+
+        Args:
+            path: SQLite 数据库文件路径
+            env: 渲染片段使用的 Environment，默认使用共享实例
+            memory_size: 内存中保留的片段数量
+            max_entries: 数据库中最多保留的片段数，超出时淘汰最久未使用的片段
+        """
+        self.path = path
+        self.env = env or get_environment()
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self._memory: 'OrderedDict[str, str]' = OrderedDict()
+        self._fingerprints: Dict[str, str] = {}
+        self._pending: Dict[str, str] = {}
+        self._touched: set = set()
+        self._prefetched: Dict[str, str] = {}
+        self._card_keys: Dict[int, Tuple[Any, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS fragments ('
+            ' key TEXT PRIMARY KEY,'
+            ' html TEXT NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_fragments_accessed ON fragments (accessed_at)')
+        self.conn.commit()
+
+    @classmethod
+    def from_config(cls, env: Optional[Environment] = None) -> Optional['FragmentCache']:
+        """按 config.json 的 report 分节创建，fragment_cache 为 false 时返回 None"""
+        report_config = get_section('report')
+        if not report_config.get('fragment_cache', True):
+            return None
+        return cls(report_config.get('fragment_cache_path') or DEFAULT_FRAGMENT_PATH, env)
+
+    def _fingerprint(self, *template_names: str) -> str:
+        """模板源码的哈希（片段中引入的子模板一并计入）"""
+        key = '|'.join(template_names)
+        fingerprint = self._fingerprints.get(key)
+        if fingerprint is None:
+            digest = hashlib.sha1()
+            for name in template_names:
+                source, _, _ = self.env.loader.get_source(self.env, name)
+                digest.update(source.encode('utf-8'))
+            fingerprint = self._fingerprints[key] = digest.hexdigest()
+        return fingerprint
+
+    def _remember(self, key: str, html: str):
+        self._memory[key] = html
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _get(self, key: str) -> Optional[str]:
+        html = self._memory.get(key)
+        if html is not None:
+            self._memory.move_to_end(key)
+            return html
+        html = self._prefetched.get(key)
+        if html is None:
+            with self._lock:
+                row = self.conn.execute('SELECT html, accessed_at FROM fragments WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            html = row[0]
+            if row[1] < time.time() - TOUCH_INTERVAL:
+                self._touched.add(key)
+        self._remember(key, html)
+        return html
+
+    def _key(self, template_name: str, fingerprint: str, payload: Any) -> str:
+        digest = hashlib.sha1(f'{template_name}\n{fingerprint}\n'.encode('utf-8'))
+        digest.update(serialization.dumps_bytes(payload, pretty=False))
+        return digest.hexdigest()
+
+    def _card_fingerprint(self) -> str:
+        return self._fingerprint(TOPIC_CARD_TEMPLATE, PRODUCT_SECTION_TEMPLATE)
+
+    def _card_key(self, topic, fingerprint: str) -> str:
+        payload = [topic.get(field) for field in TOPIC_CARD_FIELDS]
+        return self._key(TOPIC_CARD_TEMPLATE, fingerprint, payload)
+
+    def prefetch(self, topics: Iterable):
+        """
+        渲染前批量读取这些话题的卡片片段，避免逐个查询数据库
+
+        计算出的键在本次渲染中复用（flush() 时清空）。
+        """
+        fingerprint = self._card_fingerprint()
+        missing = []
+        for topic in topics:
+            key = self._card_key(topic, fingerprint)
+            # 保留话题对象的引用，id 在本次渲染中不会被复用
+            self._card_keys[id(topic)] = (topic, key)
+            if key not in self._memory:
+                missing.append(key)
+
+        stale = time.time() - TOUCH_INTERVAL
+        missing = list(dict.fromkeys(missing))
+        with self._lock:
+            for start in range(0, len(missing), PREFETCH_BATCH):
+                batch = missing[start:start + PREFETCH_BATCH]
+                rows = self.conn.execute(
+                    f'SELECT key, html, accessed_at FROM fragments WHERE key IN ({",".join("?" * len(batch))})', batch
+                )
+                for key, html, accessed_at in rows:
+                    self._prefetched[key] = html
+                    if accessed_at < stale:
+                        self._touched.add(key)
+
+    def _put(self, key: str, html: str):
+        self._remember(key, html)
+        self._pending[key] = html
+
+    def fragment(self, template_name: str, fingerprint: str, payload: Any, key: Optional[str] = None,
+                 **context) -> str:
+        """
+        取缓存的片段，未命中时渲染并保存
+
+        Args:
+            template_name: 片段模板
+            fingerprint: 模板源码哈希
+            payload: 决定片段内容的数据（用于计算键）
+            key: 已算好的键，传入时不再由 payload 计算
+            **context: 渲染片段的模板变量
+
+        Returns:
+            片段HTML
+        """
+        key = key or self._key(template_name, fingerprint, payload)
+        html = self._get(key)
+        if html is None:
+            self.misses += 1
+            html = self.env.get_template(template_name).render(**context)
+            self._put(key, html)
+        else:
+            self.hits += 1
+        # 开启自动转义时标记为安全HTML，避免片段被再次转义
+        return Markup(html) if self.env.autoescape else html
+
+    def product_section(self, topic) -> str:
+        """话题的产品创意部分"""
+        payload = [topic.get(field) for field in PRODUCT_SECTION_FIELDS]
+        return self.fragment(PRODUCT_SECTION_TEMPLATE, self._fingerprint(PRODUCT_SECTION_TEMPLATE), payload,
+                             topic=topic)
+
+    def topic_card(self, topic) -> str:
+        """整个话题卡片：排名之外的内容取自缓存，排名在取出后填入"""
+        prefetched = self._card_keys.get(id(topic))
+        if prefetched is not None and prefetched[0] is topic:
+            key = prefetched[1]
+        else:
+            key = self._card_key(topic, self._card_fingerprint())
+        html = self.fragment(TOPIC_CARD_TEMPLATE, '', None, key=key,
+                             topic=topic, rank_slot=RANK_SLOT, product_section=self.product_section)
+        rank = topic.get('rank')
+        return html.replace(RANK_SLOT, escape('' if rank is None else str(rank)), 1)
+
+    def context(self) -> Dict:
+        """交给 report_template_v2.html 的模板变量"""
+        return {'topic_card': self.topic_card, 'product_section': self.product_section}
+
+    def flush(self):
+        """写入新片段、更新访问时间并淘汰多余的片段，清空本次渲染的预取结果"""
+        self._prefetched.clear()
+        self._card_keys.clear()
+        if not self._pending and not self._touched:
+            return
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO fragments (key, html, accessed_at) VALUES (?, ?, ?)',
+                [(key, html, now) for key, html in self._pending.items()]
+            )
+            self.conn.executemany(
+                'UPDATE fragments SET accessed_at = ? WHERE key = ?',
+                [(now, key) for key in self._touched if key not in self._pending]
+            )
+            count = self.conn.execute('SELECT COUNT(*) FROM fragments').fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    'DELETE FROM fragments WHERE key IN ('
+                    ' SELECT key FROM fragments ORDER BY accessed_at ASC LIMIT ?)',
+                    (count - self.max_entries,)
+                )
+        self._pending.clear()
+        self._touched.clear()
+
+    def stats(self) -> Dict:
+        """命中统计"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0
+        }
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class ReportRenderer:
+    """HTML报告渲染器（模板只加载一次，可重复渲染）"""
+
+    def __init__(self, template_name: str = DEFAULT_TEMPLATE, template_dir: str = TEMPLATE_DIR,
+                 env: Optional[Environment] = None, fragment_cache: Optional[FragmentCache] = None):
+        """
+        初始化渲染器
+
+        Args:
+            template_name: 模板文件名
+            template_dir: 模板目录
+            env: 指定的 Environment，默认使用共享实例
+            fragment_cache: 片段缓存，只对引入了可缓存片段的模板（report_template_v2.html）生效
+        """
+        self.env = env or get_environment(template_dir)
+        self.template = self.env.get_template(template_name)
+        self.fragment_cache = fragment_cache
+
+    def _context(self, analysis_data: Dict, extra: Dict) -> Dict:
+        context = build_report_context(analysis_data, **extra)
+        if self.fragment_cache is not None and 'topic_card' not in context:
+            context.update(self.fragment_cache.context())
+            self.fragment_cache.prefetch(context['topics'])
+        return context
+
+    def render(self, analysis_data: Dict, **extra) -> str:
+        """渲染一份报告，返回HTML"""
+        html_content = self.template.render(**self._context(analysis_data, extra))
+        if self.fragment_cache is not None:
+            self.fragment_cache.flush()
+        return html_content
+
+    def render_to_file(self, analysis_data: Dict, output_file: str, **extra) -> str:
+        """
+        流式渲染一份报告并保存
+
+        模板输出逐块写入临时文件，完成后再改名，内存占用与话题数无关，渲染失败时不会留下半份报告。
+
+        Args:
+            analysis_data: 分析结果数据
+            output_file: 输出HTML文件路径
+            **extra: 其他模板变量
+
+        Returns:
+            输出文件路径
+        """
+        temp_path = output_file + '.tmp'
+        if self.fragment_cache is not None:
+            hits, misses = self.fragment_cache.hits, self.fragment_cache.misses
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                buffer = []
+                size = 0
+                for chunk in self.template.generate(**self._context(analysis_data, extra)):
+                    buffer.append(chunk)
+                    size += len(chunk)
+                    if size >= WRITE_BUFFER_CHARS:
+                        f.write(''.join(buffer))
+                        buffer = []
+                        size = 0
+                f.write(''.join(buffer))
+            os.replace(temp_path, output_file)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        if self.fragment_cache is not None:
+            self.fragment_cache.flush()
+            logger.info(f"片段缓存命中 {self.fragment_cache.hits - hits} 个，新渲染 {self.fragment_cache.misses - misses} 个")
+        logger.info(f"HTML报告已生成: {output_file}")
+        return output_file
+
+    def render_many(self, reports: Iterable[Tuple[Dict, str]], **extra) -> List[str]:
+        """
+        用同一个模板批量渲染报告（例如每个快照一份）
+
+        Args:
+            reports: (分析结果, 输出文件路径) 序列
+            **extra: 其他模板变量
+
+        Returns:
+            输出文件路径列表
+        """
+        return [self.render_to_file(analysis_data, output_file, **extra) for analysis_data, output_file in reports]
+
+    def render_by_category(self, analysis_data: Dict, output_pattern: str, **extra) -> Dict[str, str]:
+        """
+        按话题分类各生成一份报告，各份的统计数字按该分类的话题重新计算
+
+        Args:
+            analysis_data: 分析结果数据
+            output_pattern: 输出文件路径模板，含 {category} 占位符，如 report_{category}.html
+            **extra: 其他模板变量
+
+        Returns:
+            {分类: 输出文件路径}
+        """
+        groups: Dict[str, List[Dict]] = {}
+        for topic in analysis_data.get('topics', []):
+            groups.setdefault(topic.get('category') or '其他', []).append(topic)
+
+        reports = {}
+        for category, topics in groups.items():
+            stats = RunningStats()
+            for topic in topics:
+                stats.add(topic)
+            category_data = dict(analysis_data)
+            category_data.update(stats.summary())
+            category_data['topics'] = topics
+            reports[category] = (category_data, output_pattern.format(category=_safe_filename(category)))
+
+        written = self.render_many(reports.values(), **extra)
+        return dict(zip(reports.keys(), written))
+
+
+def build_report_data(topics: Iterable) -> str:
+    """
+    把话题列表序列化为嵌入页面的 JSON
+
+    使用去重格式（见 results_format.py），同一产品模板的内容只出现一次；
+    "<" 转义为 \\u003c，话题内容中的 </script> 不会提前结束脚本标签。
+
+    Args:
+        topics: 话题列表（字典或可按字典读取的结果记录）
+
+    Returns:
+        紧凑的 JSON 字符串
+    """
+    packed = pack_results({'topics': [dict(topic) if not isinstance(topic, dict) else topic for topic in topics]})
+    return serialization.dumps(packed, pretty=False).replace('<', '\\u003c')
+
+
+class VirtualReportRenderer(ReportRenderer):
+    """
+    虚拟列表报告渲染器（report_template_virtual.html）
+
+    服务端只渲染标题和统计摘要，话题数据以 JSON 嵌入一次，由页面脚本按滚动位置生成卡片，
+    文件大小和浏览器中的节点数不再随话题数成倍增长。
+    """
+
+    def __init__(self, template_name: str = VIRTUAL_TEMPLATE, template_dir: str = TEMPLATE_DIR,
+                 env: Optional[Environment] = None):
+        """
+        初始化渲染器
+
+        Args:
+            template_name: 模板文件名
+            template_dir: 模板目录
+            env: 指定的 Environment，默认使用共享实例
+        """
+        super().__init__(template_name, template_dir, env)
+
+    def _context(self, analysis_data: Dict, extra: Dict) -> Dict:
+        context = build_report_context(analysis_data, **extra)
+        report_data = build_report_data(context.pop('topics'))
+        context['report_data'] = Markup(report_data) if self.env.autoescape else report_data
+        return context
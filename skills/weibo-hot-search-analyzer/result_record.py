@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+紧凑的分析结果记录
+- TopicResult: 使用 __slots__ 的只读记录，代替每个话题一个字典
+- 分类、评分等级等重复出现的短字符串和模板文本经 sys.intern 驻留，同一内容只保存一份
+- 产品模板、背景模板产生的列表（功能、痛点、实现步骤、时间线、相关话题）转换为共享的不可变元组，
+  共享池有容量上限
+- 记录支持属性访问（Jinja 模板中的 topic.score）和 get/[] 取值（generate_markdown_summary 等字典用法），
+  to_dict / records_to_dicts 转换回与原结果一致的普通字典用于保存JSON
+
+适合在长时间运行的进程中保留大量分析过的快照
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+
+# 统一结果结构：字段 -> 缺省值（列表字段每次复制）
+RESULT_SCHEMA = {
+    'rank': 0,
+    'title': '',
+    'heat_value': 0,
+    'tags': '',
+    'category': '',
+
+    # 事件背景
+    'event_summary': '',
+    'key_points': [],
+    'event_timeline': [],
+    'public_opinion': '',
+    'related_topics': [],
+
+    # 产品创意
+    'product_name': '',
+    'product_slogan': '',
+    'core_function': '',
+    'feature_list': [],
+    'target_users': '',
+    'user_pain_points': [],
+    'solution': '',
+    'business_model': '',
+    'competitive_advantage': '',
+    'implementation_steps': [],
+
+    # 评分
+    'interestingness': 0,
+    'usefulness': 0,
+    'score': 0,
+    'score_class': '',
+    'market_analysis': '',
+
+    # 产出结果的引擎
+    'engine': ''
+}
+
+RESULT_FIELDS: Tuple[str, ...] = tuple(RESULT_SCHEMA)
+
+# 模板产生的列表字段：相同内容共用一个元组
+_SHARED_LIST_FIELDS = frozenset([
+    'feature_list',
+    'user_pain_points',
+    'implementation_steps',
+    'event_timeline',
+    'related_topics'
+])
+
+# 驻留的字符串字段：取值来自有限的分类或模板文本
+_INTERNED_FIELDS = frozenset([
+    'tags',
+    'category',
+    'score_class',
+    'engine',
+    'product_slogan',
+    'core_function',
+    'target_users',
+    'solution',
+    'business_model',
+    'competitive_advantage',
+    'public_opinion'
+])
+
+# 共享元组池的容量：只存放模板列表，超出时淘汰最久未用的元组，避免长时间运行时无限增长
+SHARED_TUPLE_POOL_SIZE = 4096
+
+_tuple_pool: 'OrderedDict[Tuple, Tuple]' = OrderedDict()
+_pool_lock = threading.Lock()
+
+
+def shared_tuple(values: Iterable) -> Tuple:
+    """
+    内容相同时返回同一个元组对象，元组中的字符串同样驻留
+
+    池中最多保留 SHARED_TUPLE_POOL_SIZE 个元组；含有字典等不可哈希元素时不入池，直接返回新元组。
+    """
+    items = tuple(sys.intern(value) if isinstance(value, str) else value for value in values)
+    try:
+        hash(items)
+    except TypeError:
+        return items
+    with _pool_lock:
+        pooled = _tuple_pool.get(items)
+        if pooled is not None:
+            _tuple_pool.move_to_end(items)
+            return pooled
+        _tuple_pool[items] = items
+        if len(_tuple_pool) > SHARED_TUPLE_POOL_SIZE:
+            _tuple_pool.popitem(last=False)
+    return items
+
+
+class TopicResult:
+    """
+    单个话题的分析结果（只读）
+
+    只保存原结果中出现的字段并记住字段顺序，to_dict 的结果与原字典一致；
+    缺少的字段与字典一样不可访问（Jinja 模板中为未定义，get 返回缺省值）。
+    """
+
+    __slots__ = RESULT_FIELDS + ('_fields', '_extra')
+
+    def __init__(self, **fields):
+        """
+        初始化记录
+
+        Args:
+            **fields: 分析结果字段，RESULT_SCHEMA 之外的字段（如 idea_source）保存在附加字段中
+        """
+        # 字段顺序只有少数几种，同样共享
+        object.__setattr__(self, '_fields', shared_tuple(fields))
+        extra = []
+        for key, value in fields.items():
+            if key in RESULT_SCHEMA:
+                if isinstance(value, (list, tuple)):
+                    value = shared_tuple(value) if key in _SHARED_LIST_FIELDS else tuple(value)
+                elif isinstance(value, str) and key in _INTERNED_FIELDS:
+                    value = sys.intern(value)
+                object.__setattr__(self, key, value)
+            else:
+                extra.append((sys.intern(key), tuple(value) if isinstance(value, list) else value))
+        object.__setattr__(self, '_extra', tuple(extra))
+
+    @classmethod
+    def from_dict(cls, result: Dict) -> 'TopicResult':
+        """由分析结果字典构建"""
+        return cls(**result)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f'TopicResult 为只读记录，不能修改 {name}')
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f'TopicResult 为只读记录，不能删除 {name}')
+
+    def __reduce__(self):
+        return self.__class__.from_dict, (self.to_dict(),)
+
+    def replace(self, **changes) -> 'TopicResult':
+        """返回修改了部分字段的新记录"""
+        fields = self.to_dict()
+        fields.update(changes)
+        return self.__class__(**fields)
+
+    def keys(self) -> List[str]:
+        return list(self._fields)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields
+
+    def __getitem__(self, key: str) -> Any:
+        if key in RESULT_SCHEMA:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        for name, value in self._extra:
+            if name == key:
+                return value
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """与 dict.get 相同"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TopicResult):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TopicResult(rank={self.get('rank')!r}, title={self.get('title')!r}, score={self.get('score')!r})"
+
+    def to_dict(self) -> Dict:
+        """转换为普通字典（元组字段转换为列表，字段和顺序与原结果一致），用于保存JSON或交给修改结果的代码"""
+        result = {}
+        for key in self._fields:
+            value = self[key]
+            result[key] = list(value) if isinstance(value, tuple) else value
+        return result
+
+
+def to_records(results: Iterable[Dict]) -> List[TopicResult]:
+    """把分析结果字典列表转换为记录列表"""
+    return [result if isinstance(result, TopicResult) else TopicResult.from_dict(result) for result in results]
+
+
+def records_to_dicts(records: Iterable[TopicResult]) -> List[Dict]:
+    """把记录列表转换回字典列表"""
+    return [record.to_dict() if isinstance(record, TopicResult) else record for record in records]
+
+
+def compact_output(output: Dict) -> Dict:
+    """
+    把 analyze_all 的输出中的话题转换为记录
+
+    Returns:
+        新的输出字典，topics 为 TopicResult 列表，可直接用于HTML报告和Markdown摘要
+    """
+    compacted = dict(output)
+    compacted['topics'] = to_records(output.get('topics', []))
+    return compacted
+
+
+def expand_output(output: Dict) -> Dict:
+    """compact_output 的逆操作：topics 转换回字典列表，用于保存JSON"""
+    expanded = dict(output)
+    expanded['topics'] = records_to_dicts(output.get('topics', []))
+    return expanded
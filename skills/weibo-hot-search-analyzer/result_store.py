@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分析结果持久化存储
+按 (分析器版本, 归一化标题) 保存单个话题的分析结果，供增量分析复用
+"""
+
+import os
+import sqlite3
+import time
+import logging
+from typing import Dict, Iterable, Tuple
+
+import serialization
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.analysis_cache', 'results.sqlite3')
+
+# SQLite 单条语句的参数个数上限较低，批量查询时分块
+_QUERY_CHUNK = 500
+
+
+class ResultStore:
+    """基于 SQLite 的话题分析结果存储"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        初始化存储
+
+        Args:
+            path: SQLite 数据库文件路径
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' version TEXT NOT NULL,'
+            ' title_key TEXT NOT NULL,'
+            ' tags TEXT NOT NULL,'
+            ' result TEXT NOT NULL,'
+            ' updated_at REAL NOT NULL,'
+            ' PRIMARY KEY (version, title_key))'
+        )
+        self.conn.commit()
+
+    def get_many(self, version: str, title_keys: Iterable[str]) -> Dict[str, Tuple[str, Dict]]:
+        """
+        批量读取分析结果
+
+        Args:
+            version: 分析器版本
+            title_keys: 归一化后的标题
+
+        Returns:
+            归一化标题 -> (分析时的标签, 分析结果)
+        """
+        keys = list(dict.fromkeys(title_keys))
+        found = {}
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f'SELECT title_key, tags, result FROM results WHERE version = ? AND title_key IN ({placeholders})',
+                [version] + chunk
+            )
+            for title_key, tags, result in rows:
+                found[title_key] = (tags, serialization.loads(result))
+        return found
+
+    def put_many(self, version: str, rows: Iterable[Tuple[str, str, Dict]]):
+        """
+        批量写入分析结果（同一事务）
+
+        Args:
+            version: 分析器版本
+            rows: (归一化标题, 标签, 分析结果)
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO results (version, title_key, tags, result, updated_at) VALUES (?, ?, ?, ?, ?)',
+                [(version, key, tags, serialization.dumps(result, pretty=False), now) for key, tags, result in rows]
+            )
+
+    def prune(self, version: str) -> int:
+        """删除其他分析器版本的结果，返回删除的条数"""
+        with self.conn:
+            cursor = self.conn.execute('DELETE FROM results WHERE version != ?', (version,))
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
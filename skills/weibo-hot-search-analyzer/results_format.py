@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+去重的分析结果格式
+同一产品模板的话题共享大段相同内容（功能列表、用户痛点、解决方案、商业模式、实现步骤、事件时间线等），
+完整格式会为每个话题重复写一遍。去重格式把这些内容放进只存一次的模板表，
+每个话题只保存模板编号、话题标识、评分和与模板不同的字段：
+
+    {
+      "format": "packed-v1",
+      "analysis_time": ..., "total_topics": ..., ...
+      "templates": [{"fields": [字段顺序], "values": {字段: 模板值}, "slots": [含标题占位符的字段]}, ...],
+      "topics": [{"_template": 0, "rank": 1, "title": ..., "score": 91, ...}, ...]
+    }
+
+模板值中的话题标题替换为 {title} 占位符，展开时填回各话题的标题，
+因此"基于【标题】热点分析"这类只有标题不同的文本也只存一次。
+load_results 同时支持两种格式；读取去重格式时按需展开话题，不为每个话题复制模板内容。
+"""
+
+import json
+from collections.abc import Mapping, Sequence
+from typing import List, Dict, Any, Callable, Iterator, Optional
+
+import serialization
+
+PACKED_FORMAT = 'packed-v1'
+
+# 由产品模板决定的字段，内容相同的话题归入同一模板
+TEMPLATE_FIELDS = frozenset([
+    'product_slogan',
+    'core_function',
+    'feature_list',
+    'target_users',
+    'user_pain_points',
+    'solution',
+    'business_model',
+    'competitive_advantage',
+    'implementation_steps',
+    'engine'
+])
+
+# 每个话题记录都保存的字段：话题标识和评分
+RECORD_FIELDS = frozenset(['rank', 'title', 'heat_value', 'tags', 'interestingness', 'usefulness', 'score', 'score_class'])
+
+# 话题记录中的模板编号
+TEMPLATE_KEY = '_template'
+
+# 模板值中的标题占位符
+TITLE_SLOT = '{title}'
+
+
+def _fill(value: str, title: str) -> str:
+    return value.replace(TITLE_SLOT, title)
+
+
+def pack_results(output: Dict) -> Dict:
+    """
+    把完整格式的分析结果转换为去重格式
+
+    字段顺序和产品模板字段相同的话题共用一个模板，模板值取该组第一个话题（标题替换为占位符），
+    后续话题只记录与模板展开结果不同的字段。展开后与原结果完全一致（含字段顺序）。
+
+    Args:
+        output: analyze_all 的输出（含 topics 列表）
+
+    Returns:
+        去重格式的分析结果
+    """
+    templates = []
+    index: Dict[str, int] = {}
+    records = []
+    for topic in output.get('topics', []):
+        fields = list(topic)
+        title = topic.get('title') or ''
+        signature = json.dumps(
+            [fields, {key: topic[key] for key in fields if key in TEMPLATE_FIELDS}],
+            ensure_ascii=False, sort_keys=True
+        )
+        template_id = index.get(signature)
+        if template_id is None:
+            template_id = index[signature] = len(templates)
+            values = {}
+            slots = []
+            for key in fields:
+                if key in RECORD_FIELDS:
+                    continue
+                value = topic[key]
+                if isinstance(value, str) and title and title in value and TITLE_SLOT not in value:
+                    value = value.replace(title, TITLE_SLOT)
+                    slots.append(key)
+                values[key] = value
+            templates.append({'fields': fields, 'values': values, 'slots': slots})
+
+        template = templates[template_id]
+        slots = template['slots']
+        record = {TEMPLATE_KEY: template_id}
+        for key in fields:
+            value = topic[key]
+            if key not in RECORD_FIELDS:
+                expected = template['values'][key]
+                if key in slots:
+                    expected = _fill(expected, title)
+                if value == expected:
+                    continue
+            record[key] = value
+        records.append(record)
+
+    packed = {'format': PACKED_FORMAT}
+    for key, value in output.items():
+        if key == 'topics':
+            packed['templates'] = templates
+            packed['topics'] = records
+        elif key not in ('format', 'templates'):
+            packed[key] = value
+    return packed
+
+
+def is_packed(data: Dict) -> bool:
+    """是否为去重格式"""
+    return data.get('format') == PACKED_FORMAT
+
+
+class PackedTopic(Mapping):
+    """
+    去重格式中一个话题的只读视图
+
+    按键取值时先查话题记录再查模板（填入本话题标题），不复制模板内容；迭代顺序与原结果字段顺序一致。
+    模板中的列表由同一模板的所有话题共享，不要原地修改。
+    """
+
+    __slots__ = ('_record', '_template')
+
+    def __init__(self, record: Dict, template: Dict):
+        self._record = record
+        self._template = template
+
+    def __getitem__(self, key: str) -> Any:
+        if key != TEMPLATE_KEY and key in self._record:
+            return self._record[key]
+        value = self._template['values'][key]
+        if key in self._template['slots']:
+            value = _fill(value, self._record.get('title') or '')
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._template['fields'])
+
+    def __len__(self) -> int:
+        return len(self._template['fields'])
+
+    def __repr__(self) -> str:
+        return f"PackedTopic({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """展开为独立的完整字典（列表字段各自复制）"""
+        return {key: list(value) if isinstance(value, list) else value for key, value in self.items()}
+
+
+class PackedTopics(Sequence):
+    """去重格式的话题列表，按下标取用时才构建话题视图"""
+
+    def __init__(self, templates: List[Dict], records: List[Dict]):
+        self.templates = templates
+        self.records = records
+
+    def _view(self, record: Dict) -> PackedTopic:
+        return PackedTopic(record, self.templates[record[TEMPLATE_KEY]])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._view(record) for record in self.records[index]]
+        return self._view(self.records[index])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[PackedTopic]:
+        for record in self.records:
+            yield self._view(record)
+
+    def sort(self, key: Optional[Callable[[PackedTopic], Any]] = None, reverse: bool = False):
+        """与 list.sort 相同，只重排话题记录"""
+        if key is None:
+            raise TypeError('PackedTopics.sort 需要指定 key')
+        self.records.sort(key=lambda record: key(self._view(record)), reverse=reverse)
+
+    def to_list(self) -> List[Dict]:
+        """展开为完整字典列表"""
+        return [topic.to_dict() for topic in self]
+
+
+def _expand(data: Dict, lazy: bool) -> Dict:
+    output = {}
+    for key, value in data.items():
+        if key == 'topics':
+            topics = PackedTopics(data['templates'], value)
+            output['topics'] = topics if lazy else topics.to_list()
+        elif key not in ('format', 'templates'):
+            output[key] = value
+    return output
+
+
+def unpack_results(data: Dict) -> Dict:
+    """
+    把去重格式展开为完整格式（完整格式原样返回）
+
+    Returns:
+        与 pack_results 之前一致的分析结果
+    """
+    return _expand(data, lazy=False) if is_packed(data) else data
+
+
+def load_results(path: str, lazy: bool = True) -> Dict:
+    """
+    读取分析结果文件（完整格式或去重格式）
+
+    Args:
+        path: 结果JSON文件路径
+        lazy: 去重格式时 topics 为按需展开的 PackedTopics；为 False 时展开为普通字典列表
+
+    Returns:
+        分析结果，topics 中的话题可按字典方式读取
+
+    去重格式且 lazy 为 True 时，topics 不是 list：可用 serialization.dump/dumps 直接保存
+    （按完整格式展开输出），标准库 json.dumps 需先用 unpack_results 或 lazy=False 展开。
+    """
+    data = serialization.load(path)
+    return _expand(data, lazy) if is_packed(data) else data
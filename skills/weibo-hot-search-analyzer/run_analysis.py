@@ -6,21 +6,30 @@
 整合数据获取、智能分析、报告生成的完整流程
 """
 
-import json
-import requests
 import os
 import sys
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
 import argparse
 import logging
 
+import requests
+
 # 解决Windows控制台编码问题
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
-# 导入智能分析器
-from smart_analyzer import SmartAnalyzer
+# 导入分析引擎
+from analyzer_engine import create_engine, available_engines
+from config_loader import get_section
+from http_client import HttpClient
+from report_renderer import ReportRenderer, VirtualReportRenderer, FragmentCache, get_environment
+from result_record import compact_output
+from result_store import ResultStore
+from results_format import pack_results
+import serialization
+from snapshot_archive import SnapshotArchive, DEFAULT_ARCHIVE_DIR
+from snapshot_cache import SnapshotCache, DEFAULT_CACHE_DIR
+from weibo_hotsearch_fetcher import parse_tianapi_list
 
 # 配置日志
 logging.basicConfig(
@@ -30,105 +39,182 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class HotSearchFetchError(RuntimeError):
+    """获取热搜数据失败：接口返回错误（业务状态码非 200）或空榜单，run() 在没有归档可用时同样抛出"""
+
+
 class WeiboHotSearchPipeline:
     """微博热搜分析完整流程"""
 
-    def __init__(self, api_key: str = None, output_prefix: str = 'weibo_analysis'):
+    def __init__(self, api_key: str = None, output_prefix: str = 'weibo_analysis',
+                 engine: str = 'smart', openai_api_key: str = None,
+                 top_k: int = 5, min_score: int = None, min_heat: int = None,
+                 rank_by: str = 'score', token_budget: int = 0, time_budget: float = 0,
+                 results_format: str = 'full'):
         """
         初始化流程
 
         Args:
             api_key: 天行数据API密钥
             output_prefix: 输出文件前缀
+            engine: 分析引擎名称，用 ">" 连接表示级联（如 "rules>trend"）
+            openai_api_key: OpenAI API密钥，trend 引擎使用
+            top_k: 级联时交给下一级引擎的话题数
+            min_score: 级联时入选下一级引擎的最低分
+            min_heat: 级联时入选下一级引擎的最低热度
+            rank_by: 级联时入选话题的排序依据（score 或 heat）
+            token_budget: 单次运行AI调用的令牌总数上限，0 表示不限
+            time_budget: 单次运行AI调用的耗时上限（秒），0 表示不限
+            results_format: 分析结果文件格式，full（完整）或 packed（模板去重，见 results_format.py）
         """
         self.api_key = api_key or '65f9a968f0869a2d63564093fed9d911'
         self.output_prefix = output_prefix
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.results_format = results_format
+
+        # 分析引擎配置（引擎在运行时创建，以便传入增量存储和进程数）
+        self.engine_spec = engine
+        self.engine_options = {
+            'tianapi_key': self.api_key,
+            'openai_api_key': openai_api_key,
+            'top_k': top_k,
+            'min_score': min_score,
+            'min_heat': min_heat,
+            'rank_by': rank_by,
+            'token_budget': token_budget,
+            'time_budget': time_budget
+        }
 
-        # 初始化分析器
-        self.analyzer = SmartAnalyzer(self.api_key)
+        # 共享HTTP客户端（超时、重试次数取自 config.json）
+        self.http = HttpClient.from_config()
+
+        # 快照缓存：条件请求，并记录本次榜单相对上次的变化（last_diff）
+        cache_config = get_section('snapshot_cache')
+        self.snapshot_cache = None
+        if cache_config.get('enabled', True):
+            self.snapshot_cache = SnapshotCache(cache_config.get('dir') or DEFAULT_CACHE_DIR)
+        self.last_diff = None
+
+        # 报告渲染器在首次生成报告时创建，模板只加载一次
+        self._renderer = None
+        self._virtual_renderer = None
+
+    @property
+    def renderer(self) -> ReportRenderer:
+        """report_template_v2.html 的渲染器（共享 Environment 与字节码缓存，按配置启用片段缓存）"""
+        if self._renderer is None:
+            env = get_environment(self.base_dir)
+            self._renderer = ReportRenderer('report_template_v2.html', env=env, fragment_cache=FragmentCache.from_config(env))
+        return self._renderer
+
+    @property
+    def virtual_renderer(self) -> VirtualReportRenderer:
+        """report_template_virtual.html 的渲染器，话题数较多时使用"""
+        if self._virtual_renderer is None:
+            self._virtual_renderer = VirtualReportRenderer(env=get_environment(self.base_dir))
+        return self._virtual_renderer
 
     def fetch_hot_search(self) -> list:
-        """获取微博热搜数据"""
+        """
+        获取微博热搜数据
+
+        启用快照缓存（config.json 的 snapshot_cache，默认开启）时使用条件请求，
+        并把相对上次快照的变化保存在 last_diff 中
+
+        Raises:
+            requests.RequestException: 重试用尽或熔断器打开（CircuitOpenError）
+            HotSearchFetchError: 接口返回错误状态码
+        """
         url = f'https://apis.tianapi.com/weibohot/index?key={self.api_key}'
 
         logger.info("正在获取微博热搜数据...")
 
         try:
-            response = requests.get(url, timeout=15)
+            headers = self.snapshot_cache.conditional_headers(url) if self.snapshot_cache else {}
+            response = self.http.get(url, headers=headers)
+            if response.status_code == 304 and self.snapshot_cache:
+                hot_search_list, self.last_diff = self.snapshot_cache.unchanged(url)
+                logger.info("热搜榜单未变化（304）")
+                return hot_search_list
+
             response.encoding = 'utf-8'
             data = response.json()
 
-            if data.get('code') == 200:
-                result_list = data.get('result', {}).get('list', [])
-                logger.info(f"成功获取 {len(result_list)} 条热搜数据")
-
-                # 转换数据格式
-                hot_search_list = []
-                for i, item in enumerate(result_list):
-                    hot_num = item.get('hotnum', '0')
-                    try:
-                        if isinstance(hot_num, str):
-                            hot_value = int(hot_num.replace(',', '').strip())
-                        else:
-                            hot_value = int(hot_num)
-                    except:
-                        hot_value = 0
-
-                    hot_search_list.append({
-                        'title': item.get('hotword', ''),
-                        'heat': hot_value,
-                        'tags': item.get('hottag', '').strip() if item.get('hottag') else '',
-                        'rank': i + 1
-                    })
-
-                return hot_search_list
+            if data.get('code') != 200:
+                raise HotSearchFetchError(f"API请求失败: {data}")
+
+            hot_search_list = parse_tianapi_list(data.get('result', {}).get('list', []), 'hotnum')
+            if self.snapshot_cache:
+                self.last_diff = self.snapshot_cache.update(
+                    url,
+                    hot_search_list,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+                logger.info(f"成功获取 {len(hot_search_list)} 条热搜数据，变化: {self.last_diff.summary()}")
             else:
-                logger.error(f"API请求失败: {data}")
-                return []
+                logger.info(f"成功获取 {len(hot_search_list)} 条热搜数据")
+            return hot_search_list
 
         except Exception as e:
             logger.error(f"获取热搜数据失败: {e}")
+            raise
+        finally:
+            logger.info(f"请求统计: {self.http.stats()}")
+
+    def load_fallback_snapshot(self) -> list:
+        """
+        上游不可用时读取最近一次归档的快照（需在 config.json 中启用 archive）
+
+        Returns:
+            热搜列表，未启用归档或归档为空时返回空列表
+        """
+        archive_config = get_section('archive')
+        if not archive_config.get('enabled'):
+            return []
+        try:
+            snapshot = SnapshotArchive(archive_config.get('dir') or DEFAULT_ARCHIVE_DIR).latest()
+        except ImportError as e:
+            logger.warning(f"无法读取快照归档: {e}")
             return []
+        if snapshot is None:
+            return []
+        fetch_time, items = snapshot
+        logger.warning(f"使用 {fetch_time.isoformat()} 归档的快照（{len(items)} 条）代替本次获取")
+        return items
+
+    def save_raw_data(self, data: list, filename: str, archive: bool = True):
+        """
+        保存原始数据
 
-    def save_raw_data(self, data: list, filename: str):
-        """保存原始数据"""
+        Args:
+            data: 热搜列表
+            filename: 输出文件路径
+            archive: config.json 中启用归档时是否同时追加到列式快照归档（数据本身来自归档时为 False）
+        """
+        fetch_time = datetime.now()
         output_data = {
-            'fetch_time': datetime.now().isoformat(),
+            'fetch_time': fetch_time.isoformat(),
             'total_count': len(data),
             'data': data
         }
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        serialization.dump(output_data, filename)
 
         logger.info(f"原始数据已保存到: {filename}")
 
-    def generate_html_report(self, analysis_data: dict, output_file: str):
-        """生成HTML报告"""
-        template_path = os.path.join(self.base_dir, 'report_template_v2.html')
-
-        env = Environment(loader=FileSystemLoader(self.base_dir))
-        template = env.get_template('report_template_v2.html')
-
-        # 准备模板数据
-        template_data = {
-            'date': datetime.now().strftime('%Y年%m月%d日 %H:%M'),
-            'total_topics': analysis_data.get('total_topics', 0),
-            'excellent_count': analysis_data.get('excellent_count', 0),
-            'good_count': analysis_data.get('good_count', 0),
-            'avg_score': analysis_data.get('avg_score', 0),
-            'topics': analysis_data.get('topics', [])
-        }
-
-        # 渲染HTML
-        html_content = template.render(**template_data)
+        archive_config = get_section('archive')
+        if archive and archive_config.get('enabled'):
+            archive = SnapshotArchive(archive_config.get('dir') or DEFAULT_ARCHIVE_DIR)
+            logger.info(f"快照已追加到归档: {archive.append(data, fetch_time)}")
 
-        # 保存文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-        logger.info(f"HTML报告已生成: {output_file}")
+    def generate_html_report(self, analysis_data: dict, output_file: str):
+        """生成HTML报告，话题数达到 config.json 的 report.virtual_min_topics 时生成虚拟列表报告"""
+        virtual_min_topics = get_section('report').get('virtual_min_topics', 0)
+        if virtual_min_topics and len(analysis_data.get('topics', [])) >= virtual_min_topics:
+            self.virtual_renderer.render_to_file(analysis_data, output_file)
+        else:
+            self.renderer.render_to_file(analysis_data, output_file)
 
     def generate_markdown_summary(self, analysis_data: dict) -> str:
         """生成Markdown摘要"""
@@ -221,8 +307,26 @@ class WeiboHotSearchPipeline:
 
         return markdown
 
-    def run(self, topics_count: int = 20) -> dict:
-        """运行完整流程"""
+    def run(self, topics_count: int = 20, incremental: bool = False, workers: int = 1, force: bool = False) -> dict:
+        """
+        运行完整流程
+
+        Args:
+            topics_count: 分析的话题数量
+            incremental: 是否启用增量分析（复用已保存的同名话题分析结果）
+            workers: 分析使用的进程数，大于 1 时并行分析
+            force: 榜单与上次快照相同时也重新分析
+
+        Returns:
+            分析结果，topics 为 result_record.TopicResult 记录（expand_output 转换回字典）；
+            榜单与上次快照相同而跳过分析时返回 None
+
+        Raises:
+            HotSearchFetchError: 获取热搜数据失败且没有可用的归档快照
+
+        启用快照缓存时只处理变化的部分：榜单与上次相同则跳过本次分析，
+        否则以增量模式分析，标题和标签未变的话题复用已保存的结果
+        """
         # 生成文件名前缀（使用YYMMDD格式，如251222）
         date_prefix = datetime.now().strftime('%y%m%d')
         date_str = date_prefix
@@ -233,27 +337,76 @@ class WeiboHotSearchPipeline:
 
         # 1. 获取热搜数据
         print("📡 步骤1: 获取微博热搜数据...")
-        hot_search_data = self.fetch_hot_search()
+        from_archive = False
+        self.last_diff = None
+        try:
+            hot_search_data = self.fetch_hot_search()
+        except (requests.RequestException, ValueError, HotSearchFetchError) as e:
+            # 上游故障时不分析空列表：有归档时使用最近的快照，否则中止本次运行
+            hot_search_data = self.load_fallback_snapshot()
+            if not hot_search_data:
+                print(f"❌ 获取热搜数据失败，请检查网络或API密钥: {e}")
+                raise HotSearchFetchError(f'获取热搜数据失败: {e}') from e
+            from_archive = True
+            print(f"   ⚠️ 获取热搜数据失败（{e}），改用最近归档的快照")
 
         if not hot_search_data:
-            print("❌ 获取热搜数据失败，请检查网络或API密钥")
-            return None
+            print("❌ 热搜榜单为空，本次不做分析")
+            raise HotSearchFetchError('热搜榜单为空')
+
+        diff = self.last_diff
+        if diff is not None:
+            if diff.previous_hash is not None:
+                if diff.unchanged and not force:
+                    print("   ℹ️ 热搜榜单与上次快照相同，跳过分析（--force 强制重新分析）")
+                    return None
+                summary = diff.summary()
+                print(f"   ✓ 与上次快照相比：新增 {summary['added']}，下榜 {summary['removed']}，"
+                      f"排名变化 {summary['reranked']}，热度变化 {summary['heat_changed']}，标签变化 {summary['tags_changed']}")
+            # 按快照比较时始终保存分析结果，下次只重新分析新增或标签变化的话题
+            incremental = True
 
         # 保存原始数据
         data_file = os.path.join(self.base_dir, f'{date_str}_{self.output_prefix}_data.json')
-        self.save_raw_data(hot_search_data, data_file)
+        self.save_raw_data(hot_search_data, data_file, archive=not from_archive)
         print(f"   ✓ 获取到 {len(hot_search_data)} 条热搜数据\n")
 
         # 2. 智能分析
         print(f"🔍 步骤2: 智能分析热搜话题（分析前 {min(topics_count, len(hot_search_data))} 条）...")
-        analysis_results = self.analyzer.analyze_all(hot_search_data[:topics_count])
+        store = ResultStore() if incremental else None
+        try:
+            engine = create_engine(self.engine_spec, store=store, workers=workers, **self.engine_options)
+            if engine.name != 'smart':
+                print(f"   • 分析引擎: {engine.name}")
+            analysis_results = engine.analyze_all(hot_search_data, max_topics=topics_count)
+            if diff is not None:
+                analysis_results['snapshot_diff'] = diff.summary()
+        finally:
+            if store is not None:
+                store.close()
 
         # 保存分析结果
         results_file = os.path.join(self.base_dir, f'{date_str}_{self.output_prefix}_results.json')
-        with open(results_file, 'w', encoding='utf-8') as f:
-            json.dump(analysis_results, f, ensure_ascii=False, indent=2)
+        saved_results = pack_results(analysis_results) if self.results_format == 'packed' else analysis_results
+        serialization.dump(saved_results, results_file)
+        if 'schedule' in analysis_results:
+            schedule = analysis_results['schedule']
+            if 'engine' in schedule:
+                print(f"   ✓ 级联分析：{schedule['topics']} 个话题中 {schedule['selected']} 个入选，{schedule['refined']} 个由 {schedule['engine'].split('>')[-1]} 引擎完成")
+            if 'budget' in schedule:
+                budget = schedule['budget']
+                print(f"   ✓ AI调用预算：调用 {budget['llm_calls']} 次，跳过 {budget['skipped_calls']} 次，"
+                      f"消耗 {budget['tokens_used']} 令牌，用时 {budget['elapsed_seconds']} 秒")
+            if 'notice' in schedule:
+                print(f"   ⚠️ {schedule['notice']}")
+        if 'cache_stats' in analysis_results:
+            cache_stats = analysis_results['cache_stats']
+            print(f"   ✓ 增量分析命中率: {cache_stats['hit_rate']:.0%}（复用 {cache_stats['hits']} 条，新分析 {cache_stats['misses']} 条）")
         print(f"   ✓ 分析完成，结果已保存\n")
 
+        # 保存后话题转换为只读的紧凑记录：报告、摘要和返回给调用方（如定时轮询）保留的都是记录
+        analysis_results = compact_output(analysis_results)
+
         # 3. 生成HTML报告
         print("📊 步骤3: 生成可视化HTML报告...")
         html_file = os.path.join(self.base_dir, f'{date_str}_{self.output_prefix}_report.html')
@@ -300,17 +453,44 @@ def main():
     parser.add_argument('--api-key', help='天行数据API密钥')
     parser.add_argument('--output', default='weibo_analysis', help='输出文件前缀')
     parser.add_argument('--topics', type=int, default=20, help='分析的话题数量')
+    parser.add_argument('--incremental', action='store_true', help='增量分析：只分析新增或变化的话题')
+    parser.add_argument('--force', action='store_true', help='榜单与上次快照相同时也重新分析')
+    parser.add_argument('--workers', type=int, default=1, help='分析使用的进程数（大批量话题时可设为CPU核数）')
+    parser.add_argument('--engine', default='smart',
+                        help=f"分析引擎（{'/'.join(available_engines())}），用 > 连接表示级联，如 rules>trend")
+    parser.add_argument('--openai-key', help='OpenAI API密钥（trend 引擎使用）')
+    parser.add_argument('--top-k', type=int, default=5, help='级联分析时交给下一级引擎的话题数')
+    parser.add_argument('--min-score', type=int, default=None, help='级联分析时入选下一级引擎的最低分')
+    parser.add_argument('--min-heat', type=int, default=None, help='级联分析时入选下一级引擎的最低热度')
+    parser.add_argument('--rank-by', choices=['score', 'heat'], default='score', help='级联分析时按评分或热度挑选话题')
+    parser.add_argument('--token-budget', type=int, default=0, help='单次运行AI调用的令牌总数上限（0 表示不限）')
+    parser.add_argument('--time-budget', type=float, default=0, help='单次运行AI调用的耗时上限，秒（0 表示不限）')
+    parser.add_argument('--results-format', choices=['full', 'packed'], default='full',
+                        help='分析结果文件格式：full 完整，packed 模板去重（体积更小）')
 
     args = parser.parse_args()
 
     # 创建流程实例
     pipeline = WeiboHotSearchPipeline(
         api_key=args.api_key,
-        output_prefix=args.output
+        output_prefix=args.output,
+        engine=args.engine,
+        openai_api_key=args.openai_key,
+        top_k=args.top_k,
+        min_score=args.min_score,
+        min_heat=args.min_heat,
+        rank_by=args.rank_by,
+        token_budget=args.token_budget,
+        time_budget=args.time_budget,
+        results_format=args.results_format
     )
 
-    # 运行分析
-    pipeline.run(topics_count=args.topics)
+    # 运行分析；获取失败时以非零状态退出，定时任务可据此报警（榜单未变化而跳过时正常退出）
+    try:
+        pipeline.run(topics_count=args.topics, incremental=args.incremental, workers=args.workers, force=args.force)
+    except HotSearchFetchError as e:
+        logger.error(f"程序执行失败: {e}")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
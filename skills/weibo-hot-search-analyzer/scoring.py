@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+评分规则与批量评分
+- 评分等级阈值取自 config.json 的 scoring 分节（excellent_threshold / good_threshold）
+- classify_score: 单个总分的等级，供各分析器共用
+- ScoreBatch: 用 NumPy 数组一次性计算一批话题的等级、统计、直方图、百分位和热度加权得分
+- rank_results: 各分析器和报告共用的话题排序（按总分，或按 scoring.heat_weight 热度加权）
+
+NumPy 为可选依赖，只有 ScoreBatch（以及热度加权排序）需要
+"""
+
+import logging
+from typing import List, Dict, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 取决于运行环境
+    np = None
+
+from config_loader import get_section
+
+logger = logging.getLogger(__name__)
+
+# 评分等级，从高到低
+SCORE_CLASSES = ('excellent', 'good', 'fair')
+
+_thresholds: Optional[Tuple[int, int]] = None
+
+
+def score_thresholds() -> Tuple[int, int]:
+    """(优秀阈值, 良好阈值)，取自 config.json，缺省为 (80, 60)"""
+    global _thresholds
+    if _thresholds is None:
+        scoring = get_section('scoring')
+        _thresholds = (scoring.get('excellent_threshold', 80), scoring.get('good_threshold', 60))
+    return _thresholds
+
+
+def classify_score(score: float) -> str:
+    """总分对应的评分等级：excellent / good / fair"""
+    excellent, good = score_thresholds()
+    if score >= excellent:
+        return 'excellent'
+    elif score >= good:
+        return 'good'
+    return 'fair'
+
+
+def heat_weight() -> float:
+    """热度加权系数，取自 config.json 的 scoring.heat_weight，缺省为 0（不加权）"""
+    return get_section('scoring').get('heat_weight', 0)
+
+
+class ScoreBatch:
+    """一批话题的评分（NumPy 数组）"""
+
+    def __init__(self, interestingness: Sequence[float], usefulness: Sequence[float],
+                 heat: Optional[Sequence[float]] = None, thresholds: Optional[Tuple[int, int]] = None,
+                 scores: Optional[Sequence[float]] = None):
+        """
+        初始化批量评分
+
+        Args:
+            interestingness: 有趣度评分（0-80）
+            usefulness: 有用度评分（0-20）
+            heat: 热度，缺省为全0
+            thresholds: (优秀阈值, 良好阈值)，缺省取自 config.json
+            scores: 总分，缺省为有趣度与有用度之和
+
+        Raises:
+            ImportError: 未安装 NumPy
+        """
+        if np is None:
+            raise ImportError('批量评分需要 numpy，请先执行 pip install numpy')
+        self.interestingness = np.asarray(interestingness, dtype=np.float64)
+        self.usefulness = np.asarray(usefulness, dtype=np.float64)
+        self.heat = np.zeros_like(self.interestingness) if heat is None else np.asarray(heat, dtype=np.float64)
+        self.thresholds = thresholds or score_thresholds()
+        if scores is None:
+            self.scores = self.interestingness + self.usefulness
+        else:
+            self.scores = np.asarray(scores, dtype=np.float64)
+
+    @classmethod
+    def from_results(cls, results: List[Dict], thresholds: Optional[Tuple[int, int]] = None) -> 'ScoreBatch':
+        """
+        由分析结果构建
+
+        总分取各结果的 score 字段（与 RunningStats 一致），不由有趣度和有用度重新计算：
+        分析器可能对总分另行调整或四舍五入。
+        """
+        return cls(
+            [result.get('interestingness', 0) for result in results],
+            [result.get('usefulness', 0) for result in results],
+            [result.get('heat_value', 0) or 0 for result in results],
+            thresholds,
+            scores=[result['score'] for result in results]
+        )
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def class_codes(self) -> 'np.ndarray':
+        """等级编码：0 excellent、1 good、2 fair"""
+        excellent, good = self.thresholds
+        return np.where(self.scores >= excellent, 0, np.where(self.scores >= good, 1, 2))
+
+    def classes(self) -> List[str]:
+        """各话题的评分等级"""
+        names = np.array(SCORE_CLASSES)
+        return names[self.class_codes()].tolist()
+
+    def class_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.class_codes(), minlength=len(SCORE_CLASSES))
+        return {name: int(count) for name, count in zip(SCORE_CLASSES, counts)}
+
+    def histogram(self, bins: int = 10, value_range: Tuple[float, float] = (0, 100)) -> Dict:
+        """得分直方图：{'edges': 分桶边界, 'counts': 各桶数量}"""
+        counts, edges = np.histogram(self.scores, bins=bins, range=value_range)
+        return {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+    def percentiles(self, points: Sequence[float] = (50, 90, 99)) -> Dict[str, float]:
+        """得分百分位"""
+        if not len(self):
+            return {f'p{point:g}': 0 for point in points}
+        values = np.percentile(self.scores, points)
+        return {f'p{point:g}': round(float(value), 1) for point, value in zip(points, values)}
+
+    def heat_weighted(self, weight: Optional[float] = None) -> 'np.ndarray':
+        """
+        热度加权得分：(1 - weight) * 总分 + weight * 100 * 归一化热度
+
+        热度按 log1p 压缩后除以本批最大值归一化到 0-1，weight 为 0 时等于总分。
+
+        Args:
+            weight: 热度权重（0-1），缺省取自 config.json 的 scoring.heat_weight
+        """
+        weight = heat_weight() if weight is None else weight
+        if not weight or not len(self):
+            return self.scores.copy()
+        log_heat = np.log1p(np.clip(self.heat, 0, None))
+        top = log_heat.max()
+        normalized = log_heat / top if top > 0 else np.zeros_like(log_heat)
+        return (1 - weight) * self.scores + weight * 100 * normalized
+
+    def ranking(self, weight: Optional[float] = None) -> List[int]:
+        """按（热度加权）得分从高到低的下标，得分相同时保持原顺序"""
+        weighted = self.heat_weighted(weight)
+        return np.argsort(-weighted, kind='stable').tolist()
+
+    def summary(self, bins: int = 10) -> Dict:
+        """等级统计、平均分、百分位和直方图"""
+        counts = self.class_counts()
+        return {
+            'total_topics': len(self),
+            'excellent_count': counts['excellent'],
+            'good_count': counts['good'],
+            'fair_count': counts['fair'],
+            'avg_score': round(float(self.scores.mean()), 1) if len(self) else 0,
+            'percentiles': self.percentiles(),
+            'histogram': self.histogram(bins)
+        }
+
+
+def rank_results(results: Sequence, weight: Optional[float] = None) -> List:
+    """
+    话题排序，各分析器的输出和报告共用
+
+    heat_weight 为 0（缺省）时按总分从高到低排序；大于 0 且安装了 NumPy 时按
+    ScoreBatch.heat_weighted 的热度加权得分排序，未安装 NumPy 时记录警告并按总分排序。
+    得分相同时保持原顺序。
+
+    Args:
+        results: 分析结果（含 score，热度加权时用到 heat_value）
+        weight: 热度权重（0-1），缺省取自 config.json 的 scoring.heat_weight
+
+    Returns:
+        排序后的新列表
+    """
+    weight = heat_weight() if weight is None else weight
+    if weight and len(results):
+        if np is not None:
+            batch = ScoreBatch.from_results(results)
+            return [results[i] for i in batch.ranking(weight)]
+        logger.warning('热度加权排序需要 numpy，按总分排序')
+    return sorted(results, key=lambda result: result.get('score', 0), reverse=True)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+话题信息搜索后端
+- SearchProvider: 搜索接口，按话题标题返回新闻、背景和时间线
+- PlaceholderSearchProvider: 示例文本（不联网，默认后端）
+- LocalIndexSearchProvider: 基于 SQLite FTS5 的本地全文索引，检索归档的新闻和背景资料
+- 批量查询，结果按最近使用缓存
+"""
+
+import os
+import re
+import sqlite3
+import argparse
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Dict, Iterable, Optional
+
+from config_loader import get_section
+import serialization
+from snapshot_cache import normalize_title
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.search_index', 'documents.sqlite3')
+
+# 文档类型
+DOCUMENT_KINDS = ('news', 'background', 'timeline')
+
+# 单个查询最多使用的三字组数量，避免超长标题生成过大的查询
+_MAX_QUERY_TERMS = 32
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def build_match_query(title: str) -> str:
+    """
+    把话题标题转换为 FTS5 查询
+
+    trigram 分词器按三个字符切分，中文标题无需分词；
+    标题的所有三字组以 OR 连接，由 bm25 按匹配程度排序。
+
+    Returns:
+        MATCH 表达式，标题过短（不足三个字符）时返回空字符串
+    """
+    terms = []
+    for segment in _NON_WORD.split(title.lower()):
+        terms.extend(segment[i:i + 3] for i in range(len(segment) - 2))
+    terms = list(dict.fromkeys(terms))[:_MAX_QUERY_TERMS]
+    return ' OR '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+class SearchProvider(ABC):
+    """搜索后端基类，子类实现 _search_many（未实现的子类无法实例化）"""
+
+    def __init__(self, cache_size: int = 1024):
+        """
+        初始化搜索后端
+
+        Args:
+            cache_size: 缓存的查询结果数量，0 表示不缓存
+        """
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def search(self, title: str) -> Dict:
+        """搜索单个话题，返回 {'news', 'background', 'timeline'}"""
+        return self.search_many([title])[title]
+
+    def search_many(self, titles: Iterable[str]) -> Dict[str, Dict]:
+        """
+        批量搜索话题，已缓存的标题不再重复查询
+
+        Args:
+            titles: 话题标题
+
+        Returns:
+            标题 -> 搜索结果
+        """
+        titles = list(dict.fromkeys(titles))
+        found = {}
+        pending = {}
+        for title in titles:
+            key = normalize_title(title)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                found[key] = cached
+            elif key not in pending:
+                self.misses += 1
+                pending[key] = title
+
+        if pending:
+            fresh = self._search_many(list(pending.values()))
+            for key, title in pending.items():
+                found[key] = fresh[title]
+                self._remember(key, fresh[title])
+
+        return {title: found[normalize_title(title)] for title in titles}
+
+    def _remember(self, key: str, result: Dict):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        """缓存命中统计"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0,
+            'cached': len(self._cache)
+        }
+
+    @abstractmethod
+    def _search_many(self, titles: List[str]) -> Dict[str, Dict]:
+        """查询未缓存的标题，返回 标题 -> {'news', 'background', 'timeline'}"""
+
+    def close(self):
+        pass
+
+
+class PlaceholderSearchProvider(SearchProvider):
+    """示例搜索后端，返回固定格式的占位文本"""
+
+    @staticmethod
+    def placeholder(title: str) -> Dict:
+        return {
+            'news': f'关于"{title}"的相关新闻报道...',
+            'background': f'"{title}"事件的背景信息...',
+            'timeline': f'"{title}"的事件发展时间线...'
+        }
+
+    def _search_many(self, titles: List[str]) -> Dict[str, Dict]:
+        return {title: self.placeholder(title) for title in titles}
+
+
+class LocalIndexSearchProvider(SearchProvider):
+    """基于 SQLite FTS5（trigram 分词）的本地全文检索后端"""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, max_results: int = 3, cache_size: int = 1024):
+        """
+        初始化本地索引
+
+        Args:
+            path: 索引数据库文件路径
+            max_results: 每种文档类型最多取回的条数
+            cache_size: 缓存的查询结果数量
+        """
+        super().__init__(cache_size)
+        self.path = path
+        self.max_results = max_results
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5('
+            ' title, content, kind UNINDEXED, published_at UNINDEXED,'
+            " tokenize = 'trigram')"
+        )
+        self.conn.commit()
+
+    def add_documents(self, documents: Iterable[Dict]) -> int:
+        """
+        批量写入文档（同一事务），写入后清空查询缓存
+
+        Args:
+            documents: {'title', 'content', 'kind', 'published_at'}，kind 为 news/background/timeline
+
+        Returns:
+            写入的文档数
+        """
+        rows = []
+        for document in documents:
+            kind = document.get('kind', 'news')
+            if kind not in DOCUMENT_KINDS:
+                logger.warning(f"未知的文档类型 {kind}，按 news 处理: {document.get('title', '')}")
+                kind = 'news'
+            rows.append((document.get('title', ''), document.get('content', ''), kind, document.get('published_at', '')))
+
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO documents (title, content, kind, published_at) VALUES (?, ?, ?, ?)', rows
+            )
+        self.clear_cache()
+        return len(rows)
+
+    def count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def _query(self, title: str) -> Dict[str, List[Dict]]:
+        """按文档类型返回最相关的文档"""
+        found = {kind: [] for kind in DOCUMENT_KINDS}
+        match = build_match_query(title)
+        if not match:
+            return found
+
+        rows = self.conn.execute(
+            'SELECT kind, title, content, published_at FROM ('
+            ' SELECT kind, title, content, published_at,'
+            '  ROW_NUMBER() OVER (PARTITION BY kind ORDER BY rank) AS position'
+            ' FROM documents WHERE documents MATCH ?)'
+            ' WHERE position <= ?',
+            (match, self.max_results)
+        )
+        for kind, doc_title, content, published_at in rows:
+            found[kind].append({'title': doc_title, 'content': content, 'published_at': published_at})
+        return found
+
+    @staticmethod
+    def _format(title: str, found: Dict[str, List[Dict]]) -> Dict:
+        """把命中的文档整理为搜索结果，缺失的部分使用占位文本"""
+        result = PlaceholderSearchProvider.placeholder(title)
+
+        if found['news']:
+            result['news'] = '\n'.join(f"{doc['title']}：{doc['content']}" for doc in found['news'])
+        if found['background']:
+            result['background'] = '\n'.join(doc['content'] for doc in found['background'])
+
+        events = found['timeline'] or found['news']
+        if events:
+            events = sorted(events, key=lambda doc: doc['published_at'] or '')
+            result['timeline'] = '；'.join(
+                f"{doc['published_at']} {doc['title']}" if doc['published_at'] else doc['title']
+                for doc in events
+            )
+
+        result['documents'] = sum(len(docs) for docs in found.values())
+        return result
+
+    def _search_many(self, titles: List[str]) -> Dict[str, Dict]:
+        # 所有查询在同一个读事务中完成
+        with self.conn:
+            return {title: self._format(title, self._query(title)) for title in titles}
+
+    def close(self):
+        self.conn.close()
+
+
+def create_search_provider(config_path: Optional[str] = None) -> SearchProvider:
+    """按 config.json 的 search 分节创建搜索后端"""
+    search_config = get_section('search', config_path)
+    backend = search_config.get('backend', 'placeholder')
+    cache_size = search_config.get('cache_size', 1024)
+
+    if backend == 'local':
+        return LocalIndexSearchProvider(
+            search_config.get('index_path') or DEFAULT_INDEX_PATH,
+            max_results=search_config.get('max_results', 3),
+            cache_size=cache_size
+        )
+    if backend != 'placeholder':
+        logger.warning(f"未知的搜索后端 {backend}，使用示例后端")
+    return PlaceholderSearchProvider(cache_size)
+
+
+def load_documents(path: str) -> List[Dict]:
+    """读取文档文件，支持JSON数组和JSON Lines"""
+    if path.endswith('.jsonl'):
+        return serialization.load_lines(path)
+    data = serialization.load(path)
+    return data.get('documents', []) if isinstance(data, dict) else data
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='话题信息本地索引工具')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help='索引数据库文件路径')
+    parser.add_argument('--add', nargs='*', default=[], help='要导入的文档文件（JSON 或 JSON Lines）')
+    parser.add_argument('--query', nargs='*', default=[], help='要检索的话题标题')
+
+    args = parser.parse_args()
+
+    provider = LocalIndexSearchProvider(args.index)
+    try:
+        for path in args.add:
+            added = provider.add_documents(load_documents(path))
+            print(f"✅ 从 {path} 导入 {added} 篇文档")
+        print(f"📚 索引中共有 {provider.count()} 篇文档")
+
+        for title, result in provider.search_many(args.query).items():
+            print(f"\n🔍 {title}（命中 {result['documents']} 篇）")
+            print(f"   新闻: {result['news'][:100]}")
+            print(f"   背景: {result['background'][:100]}")
+            print(f"   时间线: {result['timeline'][:100]}")
+    finally:
+        provider.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+JSON 读写
+- 安装了 orjson 时使用 orjson，否则使用标准库 json，输出内容一致（UTF-8、不转义中文）
+- 默认紧凑输出；pretty=True（或 config.json 的 output.pretty_json）时缩进两格，便于调试时阅读
+- JSON Lines：每行一个对象，可逐行写入和读取
+- 日期时间按 ISO 格式输出
+- 提供 to_list() / to_dict() 的对象（如 results_format.PackedTopics、PackedTopic）按展开结果输出
+
+orjson 为可选依赖
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+from config_loader import get_section
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def pretty_default() -> bool:
+    """是否缩进输出，取自 config.json 的 output.pretty_json，缺省为 False"""
+    return bool(get_section('output').get('pretty_json', False))
+
+
+def _expanded(value: Any) -> Any:
+    """按需展开的结果视图：有 to_list / to_dict 方法时返回展开结果，否则返回 None"""
+    if callable(getattr(value, 'to_list', None)):
+        return value.to_list()
+    if callable(getattr(value, 'to_dict', None)):
+        return value.to_dict()
+    return None
+
+
+def _default(value: Any) -> Any:
+    """标准库 json 无法序列化的类型（与 orjson 的行为一致）"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    expanded = _expanded(value)
+    if expanded is not None:
+        return expanded
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    expanded = _expanded(value)
+    if expanded is not None:
+        return expanded
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj: Any, pretty: Optional[bool] = None) -> bytes:
+    """
+    序列化为 UTF-8 字节串
+
+    Args:
+        obj: 要序列化的对象
+        pretty: 是否缩进两格，默认取自 config.json
+    """
+    if pretty is None:
+        pretty = pretty_default()
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, default=_orjson_default, option=option)
+    return dumps(obj, pretty).encode('utf-8')
+
+
+def dumps(obj: Any, pretty: Optional[bool] = None) -> str:
+    """序列化为字符串，参数同 dumps_bytes"""
+    if pretty is None:
+        pretty = pretty_default()
+    if orjson is not None:
+        return dumps_bytes(obj, pretty).decode('utf-8')
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=_default)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default)
+
+
+def loads(data) -> Any:
+    """解析 JSON 字符串或字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump(obj: Any, path: str, pretty: Optional[bool] = None):
+    """
+    保存为 JSON 文件
+
+    Args:
+        obj: 要保存的对象
+        path: 文件路径
+        pretty: 是否缩进两格，默认取自 config.json
+    """
+    with open(path, 'wb') as f:
+        f.write(dumps_bytes(obj, pretty))
+
+
+def load(path: str) -> Any:
+    """读取 JSON 文件"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump_lines(records: Iterable[Any], path: str, append: bool = False) -> int:
+    """
+    保存为 JSON Lines 文件（每行一个对象）
+
+    Args:
+        records: 要保存的对象序列，可以是生成器
+        path: 文件路径
+        append: 是否追加到已有文件末尾
+
+    Returns:
+        写入的行数
+    """
+    count = 0
+    with open(path, 'ab' if append else 'wb') as f:
+        for record in records:
+            f.write(dumps_bytes(record, pretty=False))
+            f.write(b'\n')
+            count += 1
+    return count
+
+
+def iter_lines(path: str) -> Iterator[Any]:
+    """逐行读取 JSON Lines 文件，跳过空行"""
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+def load_lines(path: str) -> List[Any]:
+    """读取 JSON Lines 文件的全部对象"""
+    return list(iter_lines(path))
+
+
+def _synthetic_archive(topic_count: int, seed: int = 0) -> Dict:
+    """构造基准测试用的分析结果（话题结构与 SmartAnalyzer 的输出相同）"""
+    rng = random.Random(seed)
+    categories = ['科技/数码', '娱乐/文化', '灾害/突发事件', '财经/金融', '美食/餐饮']
+    templates = [
+        {
+            'product_slogan': f'口号{i}',
+            'core_function': f'核心功能{i}：实时推送+智能分析+社区互动',
+            'feature_list': [f'功能{i}-{j}：面向用户的一项完整能力描述' for j in range(6)],
+            'target_users': '年轻用户、上班族、兴趣爱好者',
+            'user_pain_points': [f'痛点{i}-{j}：用户在此场景中遇到的实际问题' for j in range(4)],
+            'solution': '整合多源信息，提供个性化推荐和社区服务' * 2,
+            'business_model': '会员订阅+广告+电商导购佣金',
+            'competitive_advantage': '数据最全、响应最快、体验最好',
+            'implementation_steps': [f'{j + 1}. 实现步骤{i}-{j}，包含具体的技术方案' for j in range(5)]
+        }
+        for i in range(len(categories))
+    ]
+    topics = []
+    for rank in range(1, topic_count + 1):
+        index = rng.randrange(len(categories))
+        title = f'热搜话题{rank}：{categories[index]}相关新闻'
+        topic = {
+            'rank': rank,
+            'title': title,
+            'heat_value': rng.randint(10000, 5000000),
+            'tags': rng.choice(['热', '新', '']),
+            'category': categories[index],
+            'event_summary': f'【{title}】引发广泛关注。',
+            'key_points': [f'涉及：{title[:6]}', '事件进展', '公众反应', '行业影响'],
+            'event_timeline': ['【发布】消息发布', '【报道】媒体跟进', '【讨论】用户讨论'],
+            'public_opinion': '网友热议，观点不一。',
+            'related_topics': ['热点', categories[index]],
+            'product_name': f'{title[:4]}助手'
+        }
+        topic.update(templates[index])
+        topic.update({
+            'interestingness': 70,
+            'usefulness': 18,
+            'score': 88,
+            'score_class': 'excellent',
+            'market_analysis': f'基于【{title}】热点分析：用户需求真实，市场时机合适。'
+        })
+        topics.append(topic)
+    return {'analysis_time': datetime.now().isoformat(), 'total_topics': topic_count, 'topics': topics}
+
+
+def benchmark(topic_count: int = 10000, repeat: int = 3) -> List[Dict]:
+    """
+    比较原有写法（标准库 json、indent=2）与本模块各模式的写入和读取耗时
+
+    Returns:
+        每种方式一项：name、write_seconds、read_seconds、bytes
+    """
+    data = _synthetic_archive(topic_count)
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        def measure(name, write, read):
+            path = os.path.join(workdir, name)
+            best_write = best_read = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                write(path)
+                best_write = min(best_write, time.perf_counter() - start)
+                start = time.perf_counter()
+                read(path)
+                best_read = min(best_read, time.perf_counter() - start)
+            rows.append({
+                'name': name,
+                'write_seconds': round(best_write, 4),
+                'read_seconds': round(best_read, 4),
+                'bytes': os.path.getsize(path)
+            })
+
+        def stdlib_write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+        def stdlib_read(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                json.load(f)
+
+        measure('json indent=2（原有写法）', stdlib_write, stdlib_read)
+        measure(f'{BACKEND} pretty', lambda path: dump(data, path, pretty=True), load)
+        measure(f'{BACKEND} compact', lambda path: dump(data, path, pretty=False), load)
+        measure(f'{BACKEND} jsonl', lambda path: dump_lines(data['topics'], path), load_lines)
+    return rows
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='JSON 读写基准测试')
+    parser.add_argument('--topics', type=int, default=10000, help='合成数据的话题数')
+    parser.add_argument('--repeat', type=int, default=3, help='每种方式重复次数（取最快一次）')
+
+    args = parser.parse_args()
+
+    print(f"序列化后端: {BACKEND}，话题数: {args.topics}")
+    for row in benchmark(args.topics, args.repeat):
+        print(f"  {row['name']:<28} 写入 {row['write_seconds']:.4f}s  读取 {row['read_seconds']:.4f}s  "
+              f"{row['bytes'] / 1024 / 1024:.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,15 +9,25 @@
 """
 
 import json
+import hashlib
 import asyncio
 import aiohttp
 import re
 import sys
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterable, Callable, Type
 from dataclasses import dataclass, asdict
+from itertools import islice
 import logging
 
+from analysis_stats import RunningStats
+from scoring import classify_score, rank_results, score_thresholds
+import serialization
+from snapshot_cache import normalize_title
+
 # 解决Windows控制台编码问题
 if sys.platform == 'win32':
     try:
@@ -63,9 +73,161 @@ class ProductIdea:
     implementation_steps: List[str]  # 实现步骤
 
 
+# 实体识别规则（模块加载时编译一次）
+# 每条规则为 (实体类型, 正则, 提示字符正则, 无提示字符时改用的正则)。
+# 带通配前缀的规则只有在出现后缀提示字符时才可能命中，
+# 先用提示字符过滤，避免在每个汉字位置上尝试通配匹配。
+_ENTITY_RULES = (
+    ('city', re.compile(r'北京|上海|广州|深圳|杭州|成都|重庆|武汉|西安|南京|天津|苏州|郑州|长沙|大同|石家庄|贵州'), None, None),
+    ('region', re.compile(r'\w+省|\w+市|\w+县'), re.compile(r'[省市县]'), None),
+    ('brand', re.compile(r'华为|苹果|iPhone|小米|OPPO|vivo|三星|特斯拉|比亚迪|蔚来|理想|小鹏', re.IGNORECASE), None, None),
+    ('celebrity', re.compile(r'福原爱|魏建军|阿信|陈都灵|王影璐|[\u4e00-\u9fa5]{2,4}(?:明星|演员|歌手)'),
+     re.compile(r'明星|演员|歌手'), re.compile(r'福原爱|魏建军|阿信|陈都灵|王影璐')),
+)
+
+# 批量模式下拼接标题使用的分隔符（不会被任何实体规则匹配）
+_BATCH_SEPARATOR = '\n'
+
+
+def _build_entities(found: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """根据各规则的首个匹配构建实体字典（城市优先于省/市/县）"""
+    location = found.get('city') or found.get('region')
+    return {
+        'location': location,
+        'brand': found.get('brand'),
+        'celebrity': found.get('celebrity'),
+        'type': None,
+        'scene': None,
+        'feature': None,
+        'destination': location
+    }
+
+
+def extract_entities(title: str) -> Dict[str, Optional[str]]:
+    """
+    从标题中提取实体
+
+    Args:
+        title: 话题标题
+
+    Returns:
+        实体字典，未识别的实体为 None
+    """
+    found = {}
+    for kind, regex, hint, fallback in _ENTITY_RULES:
+        if hint is not None and hint.search(title) is None:
+            regex = fallback
+        if regex is None:
+            continue
+        match = regex.search(title)
+        if match:
+            found[kind] = match.group()
+
+    return _build_entities(found)
+
+
+def extract_entities_many(titles: Iterable[str]) -> List[Dict[str, Optional[str]]]:
+    """
+    批量提取实体
+
+    将整个热搜列表拼接成一个字符串，每条规则只扫描一遍，
+    再按偏移量把每个标题内的首个匹配归还给对应标题。
+    带提示字符的通配规则只对含提示字符的标题单独执行。
+
+    Args:
+        titles: 话题标题列表
+
+    Returns:
+        与输入顺序一致的实体字典列表
+    """
+    titles = list(titles)
+    if not titles:
+        return []
+
+    # 每个标题在拼接文本中的起始偏移
+    starts = []
+    offset = 0
+    for title in titles:
+        starts.append(offset)
+        offset += len(title) + len(_BATCH_SEPARATOR)
+
+    found = [{} for _ in titles]
+    text = _BATCH_SEPARATOR.join(titles)
+    for kind, regex, hint, fallback in _ENTITY_RULES:
+        # 含提示字符的标题单独执行完整规则，其余标题统一用快速规则扫描
+        hinted = set()
+        if hint is not None:
+            hinted = {bisect_right(starts, match.start()) - 1 for match in hint.finditer(text)}
+            for i in hinted:
+                match = regex.search(titles[i])
+                if match:
+                    found[i][kind] = match.group()
+            regex = fallback
+
+        if regex is None:
+            continue
+        for match in regex.finditer(text):
+            i = bisect_right(starts, match.start()) - 1
+            if i not in hinted:
+                found[i].setdefault(kind, match.group())
+
+    return [_build_entities(hits) for hits in found]
+
+
+def _compile_background_template(template: Dict, slot_defaults: Dict[str, str]) -> Callable[[str, Dict], EventBackground]:
+    """
+    将事件背景模板预处理为构造函数
+
+    不含槽位的文本和列表在此处一次性准备好，构造时只格式化含槽位的条目，
+    且仅在模板需要时才读取当前时间。每个话题得到各自的列表副本，修改一个结果不影响其他话题。
+
+    Args:
+        template: BACKGROUND_TEMPLATES 中的单个模板
+        slot_defaults: 实体槽位的默认值
+
+    Returns:
+        (title, entities) -> EventBackground
+    """
+    def split_slots(lines: List[str]) -> Tuple[List[str], List[Tuple[int, str]]]:
+        return list(lines), [(i, line) for i, line in enumerate(lines) if '{' in line]
+
+    summary = template['summary']
+    key_points, key_point_slots = split_slots(template['key_points'])
+    timeline, timeline_slots = split_slots(template['timeline'])
+    public_opinion = template['public_opinion']
+    related_topics = list(template['related_topics'])
+    needs_time = any('{time}' in line for _, line in key_point_slots + timeline_slots)
+
+    def fill(lines: List[str], slots: List[Tuple[int, str]], values: Dict[str, str]) -> List[str]:
+        filled = list(lines)
+        for i, line in slots:
+            filled[i] = line.format(**values)
+        return filled
+
+    def build(title: str, entities: Dict) -> EventBackground:
+        values = {key: entities.get(key, default) for key, default in slot_defaults.items()}
+        values['title'] = title
+        if needs_time:
+            values['time'] = datetime.now().strftime('%H:%M')
+
+        return EventBackground(
+            summary=summary.format(**values),
+            key_points=fill(key_points, key_point_slots, values),
+            timeline=fill(timeline, timeline_slots, values),
+            public_opinion=public_opinion,
+            related_topics=list(related_topics)
+        )
+
+    return build
+
+
 class SmartAnalyzer:
     """智能分析器"""
 
+    # 分析器版本，修改分析逻辑（而不仅是下方规则表）时需要递增，
+    # 以使增量模式下已保存的分析结果失效
+    VERSION = '2.0'
+
     # 话题分类规则
     TOPIC_CATEGORIES = {
         'disaster': {
@@ -122,6 +284,163 @@ class SmartAnalyzer:
         }
     }
 
+    # 事件背景模板（按分类）
+    # 模板在首次使用时按类编译一次，{title}、{location}、{brand}、{celebrity}、{time}
+    # 为逐话题填充的槽位，未命中任何分类时使用 general 模板
+    BACKGROUND_TEMPLATES = {
+        'disaster': {
+            'summary': '【{title}】事件引发社会广泛关注。相关部门已启动应急响应，正在进行灾情评估和救援工作。',
+            'key_points': [
+                '事件发生地点：{location}',
+                '当地政府已启动应急预案',
+                '救援队伍已抵达现场开展工作',
+                '暂无人员伤亡报告（待确认）',
+                '相关部门发布安全提醒'
+            ],
+            'timeline': [
+                '【{time}】事件发生，引发关注',
+                '【随后】相关信息开始在社交媒体传播',
+                '【跟进中】官方发布初步通报',
+                '【持续关注】后续情况待更新'
+            ],
+            'public_opinion': '网友表达关切，祈祷平安。部分网友分享防灾知识和经验。',
+            'related_topics': ['应急救援', '防灾减灾', '安全知识', '地震预警']
+        },
+        'entertainment': {
+            'summary': '【{title}】成为热议话题。该事件涉及娱乐圈动态，引发粉丝和网友的广泛讨论。',
+            'key_points': [
+                '事件相关方引发关注',
+                '粉丝群体活跃讨论',
+                '各方立场观点不一',
+                '舆论持续发酵中',
+                '媒体跟进报道'
+            ],
+            'timeline': [
+                '【起始】相关消息首次曝出',
+                '【发酵】话题登上热搜榜',
+                '【回应】相关方可能做出回应',
+                '【讨论】网友持续讨论分析'
+            ],
+            'public_opinion': '粉丝群体观点鲜明，普通网友吃瓜讨论，理性分析派呼吁等待官方说法。',
+            'related_topics': ['娱乐八卦', '粉丝文化', '明星动态', '舆论热点']
+        },
+        'tech': {
+            'summary': '【{title}】引发科技圈关注。这一动态与科技行业发展趋势密切相关。',
+            'key_points': [
+                '涉及品牌/产品：{brand}',
+                '技术创新或产品更新',
+                '市场反响和用户评价',
+                '行业竞争格局影响',
+                '未来发展趋势展望'
+            ],
+            'timeline': [
+                '【发布】相关消息/产品正式发布',
+                '【报道】科技媒体跟进报道',
+                '【讨论】用户和专家开始讨论',
+                '【展望】行业影响分析'
+            ],
+            'public_opinion': '科技爱好者热议，消费者关注价格和体验，行业分析师给出专业见解。',
+            'related_topics': ['科技创新', '数码产品', '行业动态', '技术趋势']
+        },
+        'finance': {
+            'summary': '【{title}】涉及财经金融领域重要信息，与广大市民的切身利益相关。',
+            'key_points': [
+                '政策/市场变化要点',
+                '对普通人的实际影响',
+                '专家解读和建议',
+                '操作指南和注意事项',
+                '后续可能的发展'
+            ],
+            'timeline': [
+                '【发布】政策/消息正式发布',
+                '【解读】专业机构和媒体解读',
+                '【讨论】市民关注和讨论',
+                '【实施】相关措施执行'
+            ],
+            'public_opinion': '上班族关心税务变化，投资者关注市场影响，专家提供解读建议。',
+            'related_topics': ['个税政策', '财税知识', '理财规划', '经济动态']
+        },
+        'law': {
+            'summary': '【{title}】涉及法律法规领域，对社会生活产生重要影响。',
+            'key_points': [
+                '法规/事件核心内容',
+                '涉及的法律条款',
+                '对日常生活的影响',
+                '合规建议和注意事项',
+                '相关案例参考'
+            ],
+            'timeline': [
+                '【公布】法规/消息公布',
+                '【解读】法律专家解读',
+                '【讨论】公众讨论法律边界',
+                '【执行】法规实施时间'
+            ],
+            'public_opinion': '普通网友关注法规对日常的影响，法律人士提供专业解读，部分人担忧执行尺度。',
+            'related_topics': ['法律法规', '权益保护', '合规指南', '案例分析']
+        },
+        'health': {
+            'summary': '【{title}】涉及健康医疗话题，引发公众对健康问题的关注。',
+            'key_points': [
+                '健康话题核心信息',
+                '医学专家观点',
+                '预防/治疗建议',
+                '常见误区提醒',
+                '就医/咨询指南'
+            ],
+            'timeline': [
+                '【起因】健康话题引发关注',
+                '【传播】话题在社交媒体扩散',
+                '【回应】专业医生/机构发声',
+                '【科普】健康知识普及'
+            ],
+            'public_opinion': '网友关心自身健康，医疗专业人士科普正确知识，呼吁理性对待健康信息。',
+            'related_topics': ['健康科普', '医疗知识', '养生保健', '疾病预防']
+        },
+        'celebrity_scandal': {
+            'summary': '【{title}】引发舆论热议，事件发展受到各方关注。',
+            'key_points': [
+                '事件涉及人物：{celebrity}',
+                '事件起因和经过',
+                '各方回应和态度',
+                '舆论反应和讨论',
+                '可能的后续发展'
+            ],
+            'timeline': [
+                '【曝光】事件首次被曝出',
+                '【发酵】话题迅速登上热搜',
+                '【回应】当事方做出回应',
+                '【讨论】各种观点碰撞'
+            ],
+            'public_opinion': '粉丝团体为偶像发声，路人网友吃瓜讨论，部分人呼吁尊重隐私和等待真相。',
+            'related_topics': ['名人八卦', '舆论热点', '公众人物', '社会讨论']
+        },
+        'general': {
+            'summary': '【{title}】成为当前热议话题，引发网友广泛关注和讨论。',
+            'key_points': [
+                '话题核心内容',
+                '各方观点和态度',
+                '事件发展脉络',
+                '社会影响分析',
+                '后续发展预期'
+            ],
+            'timeline': [
+                '【起始】话题开始引发关注',
+                '【传播】在社交媒体快速传播',
+                '【热议】登上微博热搜榜',
+                '【发展】事件持续发展中'
+            ],
+            'public_opinion': '网友各抒己见，讨论热烈，不同立场观点碰撞。',
+            'related_topics': ['社会热点', '舆论动态', '网络讨论']
+        }
+    }
+
+    # 背景模板中实体槽位的默认值
+    BACKGROUND_SLOT_DEFAULTS = {
+        'location': '相关地区',
+        'brand': '相关科技产品',
+        'celebrity': '相关当事人'
+    }
+
     # 产品创意模板库（按分类）
     PRODUCT_TEMPLATES = {
         'disaster': {
@@ -460,218 +779,97 @@ class SmartAnalyzer:
         """初始化分析器"""
         self.tianapi_key = tianapi_key or '65f9a968f0869a2d63564093fed9d911'
 
+    @classmethod
+    def _category_index(cls) -> Tuple[re.Pattern, Dict[str, Tuple[int, str, str]]]:
+        """
+        获取分类关键词索引（每个类只编译一次）
+
+        所有关键词按分类优先级排成一个交替正则，同一位置上优先级
+        最高的关键词先被匹配。逐个位置取匹配中优先级最高者，即可得到
+        与逐个分类、逐个关键词遍历完全一致的首个匹配结果。
+
+        Returns:
+            (编译后的正则, 关键词 -> (优先级, 分类, 分类名称))
+        """
+        index = cls.__dict__.get('_category_index_cache')
+        if index is None:
+            priorities = {}
+            for category, config in cls.TOPIC_CATEGORIES.items():
+                for keyword in config['keywords']:
+                    if keyword not in priorities:
+                        priorities[keyword] = (len(priorities), category, config['category_name'])
+
+            keywords = sorted(priorities, key=lambda kw: priorities[kw][0])
+            pattern = re.compile('|'.join(re.escape(kw) for kw in keywords))
+            index = (pattern, priorities)
+            cls._category_index_cache = index
+
+        return index
+
     def _categorize_topic(self, title: str, tags: str) -> Tuple[str, str]:
         """对话题进行分类"""
         combined_text = f"{title} {tags}".lower()
+        pattern, priorities = self._category_index()
+
+        # 每次从上一个匹配的下一个字符继续搜索，以免漏掉重叠的关键词
+        best = None
+        pos = 0
+        while True:
+            match = pattern.search(combined_text, pos)
+            if match is None:
+                break
+            hit = priorities[match.group()]
+            if best is None or hit[0] < best[0]:
+                best = hit
+            pos = match.start() + 1
+
+        if best is None:
+            return 'general', '综合资讯'
+        return best[1], best[2]
 
-        for category, config in self.TOPIC_CATEGORIES.items():
-            for keyword in config['keywords']:
-                if keyword in combined_text:
-                    return category, config['category_name']
+    def categorize_many(self, titles: Iterable[str], tags: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """
+        批量分类话题
 
-        return 'general', '综合资讯'
+        Args:
+            titles: 话题标题列表
+            tags: 与标题一一对应的标签列表（可选）
+
+        Returns:
+            与输入顺序一致的 (分类, 分类名称) 列表
+        """
+        titles = list(titles)
+        tags = list(tags) if tags is not None else [''] * len(titles)
+        return [self._categorize_topic(title, tag) for title, tag in zip(titles, tags)]
 
     def _extract_entities(self, title: str) -> Dict[str, str]:
         """从标题中提取实体"""
-        entities = {
-            'location': None,
-            'brand': None,
-            'celebrity': None,
-            'type': None,
-            'scene': None,
-            'feature': None,
-            'destination': None
-        }
+        return extract_entities(title)
 
-        # 提取地点
-        location_patterns = [
-            r'(北京|上海|广州|深圳|杭州|成都|重庆|武汉|西安|南京|天津|苏州|郑州|长沙|大同|石家庄|贵州)',
-            r'(\w+省|\w+市|\w+县)'
-        ]
-        for pattern in location_patterns:
-            match = re.search(pattern, title)
-            if match:
-                entities['location'] = match.group(1)
-                entities['destination'] = match.group(1)
-                break
-
-        # 提取品牌
-        brand_patterns = [
-            r'(华为|苹果|iPhone|小米|OPPO|vivo|三星|特斯拉|比亚迪|蔚来|理想|小鹏)'
-        ]
-        for pattern in brand_patterns:
-            match = re.search(pattern, title, re.IGNORECASE)
-            if match:
-                entities['brand'] = match.group(1)
-                break
+    def extract_entities_many(self, titles: Iterable[str]) -> List[Dict[str, str]]:
+        """批量提取实体，见 extract_entities_many"""
+        return extract_entities_many(titles)
 
-        # 提取名人
-        celebrity_patterns = [
-            r'(福原爱|魏建军|阿信|陈都灵|王影璐|[\u4e00-\u9fa5]{2,4}(?:明星|演员|歌手))'
-        ]
-        for pattern in celebrity_patterns:
-            match = re.search(pattern, title)
-            if match:
-                entities['celebrity'] = match.group(1)
-                break
+    @classmethod
+    def _background_factories(cls) -> Dict[str, Callable[[str, Dict], EventBackground]]:
+        """获取按分类注册的事件背景构造函数（每个类只编译一次）"""
+        factories = cls.__dict__.get('_background_factories_cache')
+        if factories is None:
+            factories = {
+                category: _compile_background_template(template, cls.BACKGROUND_SLOT_DEFAULTS)
+                for category, template in cls.BACKGROUND_TEMPLATES.items()
+            }
+            cls._background_factories_cache = factories
 
-        return entities
+        return factories
 
     def _generate_event_background(self, title: str, category: str, entities: Dict) -> EventBackground:
         """生成事件背景信息"""
+        factories = self._background_factories()
 
-        # 根据分类生成不同的背景信息
-        backgrounds = {
-            'disaster': EventBackground(
-                summary=f"【{title}】事件引发社会广泛关注。相关部门已启动应急响应，正在进行灾情评估和救援工作。",
-                key_points=[
-                    f"事件发生地点：{entities.get('location', '相关地区')}",
-                    "当地政府已启动应急预案",
-                    "救援队伍已抵达现场开展工作",
-                    "暂无人员伤亡报告（待确认）",
-                    "相关部门发布安全提醒"
-                ],
-                timeline=[
-                    f"【{datetime.now().strftime('%H:%M')}】事件发生，引发关注",
-                    "【随后】相关信息开始在社交媒体传播",
-                    "【跟进中】官方发布初步通报",
-                    "【持续关注】后续情况待更新"
-                ],
-                public_opinion="网友表达关切，祈祷平安。部分网友分享防灾知识和经验。",
-                related_topics=["应急救援", "防灾减灾", "安全知识", "地震预警"]
-            ),
-            'entertainment': EventBackground(
-                summary=f"【{title}】成为热议话题。该事件涉及娱乐圈动态，引发粉丝和网友的广泛讨论。",
-                key_points=[
-                    "事件相关方引发关注",
-                    "粉丝群体活跃讨论",
-                    "各方立场观点不一",
-                    "舆论持续发酵中",
-                    "媒体跟进报道"
-                ],
-                timeline=[
-                    "【起始】相关消息首次曝出",
-                    "【发酵】话题登上热搜榜",
-                    "【回应】相关方可能做出回应",
-                    "【讨论】网友持续讨论分析"
-                ],
-                public_opinion="粉丝群体观点鲜明，普通网友吃瓜讨论，理性分析派呼吁等待官方说法。",
-                related_topics=["娱乐八卦", "粉丝文化", "明星动态", "舆论热点"]
-            ),
-            'tech': EventBackground(
-                summary=f"【{title}】引发科技圈关注。这一动态与科技行业发展趋势密切相关。",
-                key_points=[
-                    f"涉及品牌/产品：{entities.get('brand', '相关科技产品')}",
-                    "技术创新或产品更新",
-                    "市场反响和用户评价",
-                    "行业竞争格局影响",
-                    "未来发展趋势展望"
-                ],
-                timeline=[
-                    "【发布】相关消息/产品正式发布",
-                    "【报道】科技媒体跟进报道",
-                    "【讨论】用户和专家开始讨论",
-                    "【展望】行业影响分析"
-                ],
-                public_opinion="科技爱好者热议，消费者关注价格和体验，行业分析师给出专业见解。",
-                related_topics=["科技创新", "数码产品", "行业动态", "技术趋势"]
-            ),
-            'finance': EventBackground(
-                summary=f"【{title}】涉及财经金融领域重要信息，与广大市民的切身利益相关。",
-                key_points=[
-                    "政策/市场变化要点",
-                    "对普通人的实际影响",
-                    "专家解读和建议",
-                    "操作指南和注意事项",
-                    "后续可能的发展"
-                ],
-                timeline=[
-                    "【发布】政策/消息正式发布",
-                    "【解读】专业机构和媒体解读",
-                    "【讨论】市民关注和讨论",
-                    "【实施】相关措施执行"
-                ],
-                public_opinion="上班族关心税务变化，投资者关注市场影响，专家提供解读建议。",
-                related_topics=["个税政策", "财税知识", "理财规划", "经济动态"]
-            ),
-            'law': EventBackground(
-                summary=f"【{title}】涉及法律法规领域，对社会生活产生重要影响。",
-                key_points=[
-                    "法规/事件核心内容",
-                    "涉及的法律条款",
-                    "对日常生活的影响",
-                    "合规建议和注意事项",
-                    "相关案例参考"
-                ],
-                timeline=[
-                    "【公布】法规/消息公布",
-                    "【解读】法律专家解读",
-                    "【讨论】公众讨论法律边界",
-                    "【执行】法规实施时间"
-                ],
-                public_opinion="普通网友关注法规对日常的影响，法律人士提供专业解读，部分人担忧执行尺度。",
-                related_topics=["法律法规", "权益保护", "合规指南", "案例分析"]
-            ),
-            'health': EventBackground(
-                summary=f"【{title}】涉及健康医疗话题，引发公众对健康问题的关注。",
-                key_points=[
-                    "健康话题核心信息",
-                    "医学专家观点",
-                    "预防/治疗建议",
-                    "常见误区提醒",
-                    "就医/咨询指南"
-                ],
-                timeline=[
-                    "【起因】健康话题引发关注",
-                    "【传播】话题在社交媒体扩散",
-                    "【回应】专业医生/机构发声",
-                    "【科普】健康知识普及"
-                ],
-                public_opinion="网友关心自身健康，医疗专业人士科普正确知识，呼吁理性对待健康信息。",
-                related_topics=["健康科普", "医疗知识", "养生保健", "疾病预防"]
-            ),
-            'celebrity_scandal': EventBackground(
-                summary=f"【{title}】引发舆论热议，事件发展受到各方关注。",
-                key_points=[
-                    f"事件涉及人物：{entities.get('celebrity', '相关当事人')}",
-                    "事件起因和经过",
-                    "各方回应和态度",
-                    "舆论反应和讨论",
-                    "可能的后续发展"
-                ],
-                timeline=[
-                    "【曝光】事件首次被曝出",
-                    "【发酵】话题迅速登上热搜",
-                    "【回应】当事方做出回应",
-                    "【讨论】各种观点碰撞"
-                ],
-                public_opinion="粉丝团体为偶像发声，路人网友吃瓜讨论，部分人呼吁尊重隐私和等待真相。",
-                related_topics=["名人八卦", "舆论热点", "公众人物", "社会讨论"]
-            )
-        }
-
-        # 返回对应分类的背景，如果没有则返回通用背景
-        if category in backgrounds:
-            return backgrounds[category]
-        else:
-            return EventBackground(
-                summary=f"【{title}】成为当前热议话题，引发网友广泛关注和讨论。",
-                key_points=[
-                    "话题核心内容",
-                    "各方观点和态度",
-                    "事件发展脉络",
-                    "社会影响分析",
-                    "后续发展预期"
-                ],
-                timeline=[
-                    "【起始】话题开始引发关注",
-                    "【传播】在社交媒体快速传播",
-                    "【热议】登上微博热搜榜",
-                    "【发展】事件持续发展中"
-                ],
-                public_opinion="网友各抒己见，讨论热烈，不同立场观点碰撞。",
-                related_topics=["社会热点", "舆论动态", "网络讨论"]
-            )
+        # 只构建对应分类的背景，如果没有则使用通用背景
+        factory = factories.get(category) or factories['general']
+        return factory(title, entities)
 
     def _generate_product_idea(self, title: str, category: str, entities: Dict, background: EventBackground) -> ProductIdea:
         """生成产品创意"""
@@ -697,13 +895,7 @@ class SmartAnalyzer:
         interestingness = template['interestingness']
         usefulness = template['usefulness']
         total_score = interestingness + usefulness
-
-        if total_score >= 80:
-            score_class = 'excellent'
-        elif total_score >= 60:
-            score_class = 'good'
-        else:
-            score_class = 'fair'
+        score_class = classify_score(total_score)
 
         # 生成针对性的市场分析
         market_analysis = f"""
@@ -792,39 +984,213 @@ class SmartAnalyzer:
 
         return result
 
-    def analyze_all(self, topics: List[Dict]) -> Dict:
-        """分析所有话题"""
-        results = []
+    @classmethod
+    def analyzer_version(cls) -> str:
+        """分析器版本：VERSION 加上规则表和评分阈值的哈希，规则变化后已保存的结果自动失效"""
+        version = cls.__dict__.get('_analyzer_version_cache')
+        if version is None:
+            payload = json.dumps(
+                [cls.TOPIC_CATEGORIES, cls.BACKGROUND_TEMPLATES, cls.BACKGROUND_SLOT_DEFAULTS, cls.PRODUCT_TEMPLATES,
+                 score_thresholds()],
+                ensure_ascii=False, sort_keys=True
+            )
+            version = f"{cls.VERSION}-{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]}"
+            cls._analyzer_version_cache = version
+
+        return version
+
+    def _iter_batch(self, items: Iterable[Tuple[int, Dict]], workers: int = 1,
+                    chunk_size: Optional[int] = None) -> Iterable[Dict]:
+        """
+        逐条产出一批话题的分析结果，workers 大于 1 时分块交给进程池并行处理
+
+        Args:
+            items: (排名, 话题) 列表或迭代器
+            workers: 工作进程数
+            chunk_size: 每个任务包含的话题数，默认按每个进程约4个任务划分（迭代器输入时为64）
 
-        for i, topic in enumerate(topics[:20]):
-            result = self.analyze_topic(topic, i + 1)
+        Yields:
+            与 items 顺序一致的分析结果
+        """
+        if workers > 1 and hasattr(items, '__len__'):
+            if len(items) < 2 * workers:
+                workers = 1
+            elif chunk_size is None:
+                chunk_size = max(1, -(-len(items) // (workers * 4)))
+
+        if workers <= 1:
+            for rank, topic in items:
+                yield self.analyze_topic(topic, rank)
+            return
+
+        # 只向工作进程传递分析需要的字段
+        compact = (
+            (rank, topic.get('title', ''), topic.get('heat', 0), topic.get('tags', ''))
+            for rank, topic in items
+        )
+        chunk_size = chunk_size or 64
+
+        # 同时在途的任务数有上限，结果按提交顺序产出，内存占用不随输入规模增长
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(type(self),)) as executor:
+            in_flight = deque()
+            while True:
+                while len(in_flight) < workers * 2:
+                    chunk = list(islice(compact, chunk_size))
+                    if not chunk:
+                        break
+                    in_flight.append(executor.submit(_analyze_chunk, chunk))
+                if not in_flight:
+                    break
+                yield from in_flight.popleft().result()
+
+    def _analyze_batch(self, items: List[Tuple[int, Dict]], workers: int = 1, chunk_size: Optional[int] = None) -> List[Dict]:
+        """分析一批 (排名, 话题)，返回与输入顺序一致的结果列表"""
+        return list(self._iter_batch(items, workers, chunk_size))
+
+    def _analyze_incremental(self, topics: List[Dict], store, workers: int = 1,
+                             chunk_size: Optional[int] = None) -> Tuple[List[Dict], Dict]:
+        """
+        增量分析：标题和标签与已保存结果一致的话题直接复用，只分析新增或变化的话题
+
+        Args:
+            topics: 热搜话题列表
+            store: ResultStore 分析结果存储
+            workers: 分析未命中话题时使用的工作进程数
+            chunk_size: 并行模式下每个任务包含的话题数
+
+        Returns:
+            (分析结果列表, 缓存命中统计)
+        """
+        version = self.analyzer_version()
+        keys = [normalize_title(topic.get('title', '')) for topic in topics]
+        cached = store.get_many(version, keys)
+
+        # 先确定每个话题是复用还是重新分析；同一批次中重复出现的话题复用前一次的结果
+        # 复用来源：已保存的结果（None）或本批次中先分析的位置
+        latest = {key: (entry[0], None) for key, entry in cached.items()}
+        sources: List[Optional[int]] = []
+        pending = []
+        hits = 0
+        for i, (topic, key) in enumerate(zip(topics, keys)):
+            tags = topic.get('tags', '')
+            entry = latest.get(key)
+            if entry is not None and entry[0] == tags:
+                sources.append(entry[1])
+                hits += 1
+            else:
+                sources.append(i)
+                pending.append(i)
+                latest[key] = (tags, i)
+
+        analyzed = dict(zip(pending, self._analyze_batch([(i + 1, topics[i]) for i in pending], workers, chunk_size)))
+
+        results = []
+        for i, (topic, key, source) in enumerate(zip(topics, keys, sources)):
+            if source == i:
+                results.append(analyzed[i])
+                continue
+            # 排名和热度每次都可能变化，合并时以本次数据为准
+            result = dict(cached[key][1] if source is None else analyzed[source])
+            result['rank'] = i + 1
+            result['title'] = topic.get('title', '')
+            result['heat_value'] = topic.get('heat', 0)
             results.append(result)
 
-        # 统计
-        excellent_count = sum(1 for r in results if r['score'] >= 80)
-        good_count = sum(1 for r in results if 60 <= r['score'] < 80)
-        fair_count = sum(1 for r in results if r['score'] < 60)
-        avg_score = sum(r['score'] for r in results) / len(results) if results else 0
-
-        # 按分数排序
-        results.sort(key=lambda x: x['score'], reverse=True)
-
-        return {
-            'analysis_time': datetime.now().isoformat(),
-            'total_topics': len(results),
-            'excellent_count': excellent_count,
-            'good_count': good_count,
-            'fair_count': fair_count,
-            'avg_score': round(avg_score, 1),
-            'topics': results
+        if pending:
+            store.put_many(version, [(keys[i], topics[i].get('tags', ''), analyzed[i]) for i in pending])
+
+        cache_stats = {
+            'hits': hits,
+            'misses': len(topics) - hits,
+            'hit_rate': round(hits / len(topics), 3) if topics else 0
         }
+        logger.info(f"增量分析：复用 {hits} 条，新分析 {len(topics) - hits} 条")
+        return results, cache_stats
+
+    def analyze_iter(self, topics: Iterable[Dict], max_topics: Optional[int] = 20, workers: int = 1,
+                     chunk_size: Optional[int] = None, stats: Optional[RunningStats] = None) -> Iterable[Dict]:
+        """
+        流式分析话题，按输入顺序逐条产出结果（未排序）
+
+        Args:
+            topics: 热搜话题（任意可迭代对象）
+            max_topics: 最多分析的话题数，None 表示不限制
+            workers: 工作进程数，大于 1 时使用进程池并行分析
+            chunk_size: 并行模式下每个任务包含的话题数
+            stats: RunningStats，传入时逐条累计统计
+
+        Yields:
+            分析结果
+        """
+        if isinstance(topics, list):
+            items = [(i + 1, topic) for i, topic in enumerate(topics[:max_topics])]
+        else:
+            items = enumerate(islice(topics, max_topics), 1)
+
+        for result in self._iter_batch(items, workers, chunk_size):
+            if stats is not None:
+                stats.add(result)
+            yield result
+
+    def analyze_all(self, topics: List[Dict], store=None, max_topics: Optional[int] = 20,
+                    workers: int = 1, chunk_size: Optional[int] = None) -> Dict:
+        """
+        分析所有话题
+
+        Args:
+            topics: 热搜话题列表
+            store: ResultStore 分析结果存储，传入时启用增量模式
+            max_topics: 最多分析的话题数，None 表示不限制
+            workers: 工作进程数，大于 1 时使用进程池并行分析
+            chunk_size: 并行模式下每个任务包含的话题数
+
+        Returns:
+            分析结果和统计信息，增量模式下包含 cache_stats
+        """
+        stats = RunningStats()
+        cache_stats = None
+        if store is None:
+            results = list(self.analyze_iter(topics, max_topics, workers, chunk_size, stats))
+        else:
+            if max_topics is not None:
+                topics = topics[:max_topics]
+            results, cache_stats = self._analyze_incremental(topics, store, workers, chunk_size)
+            for result in results:
+                stats.add(result)
+
+        # 按分数（或 scoring.heat_weight 热度加权得分）排序
+        results = rank_results(results)
+
+        output = {'analysis_time': datetime.now().isoformat()}
+        output.update(stats.summary())
+        output['topics'] = results
+        if cache_stats is not None:
+            output['cache_stats'] = cache_stats
+
+        return output
+
+
+# 并行模式下每个工作进程持有一个分析器实例
+_worker_analyzer: Optional[SmartAnalyzer] = None
+
+
+def _init_worker(analyzer_class: Type[SmartAnalyzer]):
+    global _worker_analyzer
+    _worker_analyzer = analyzer_class()
+
+
+def _analyze_chunk(chunk: List[Tuple[int, str, int, str]]) -> List[Dict]:
+    """工作进程：分析一组 (排名, 标题, 热度, 标签)"""
+    return [
+        _worker_analyzer.analyze_topic({'title': title, 'heat': heat, 'tags': tags}, rank)
+        for rank, title, heat, tags in chunk
+    ]
 
 
 def main():
     """主函数"""
     # 读取热搜数据
-    with open('weibo_analysis_data.json', 'r', encoding='utf-8') as f:
-        hot_search_data = json.load(f)
+    hot_search_data = serialization.load('weibo_analysis_data.json')
 
     topics = hot_search_data.get('data', [])
     print(f"开始分析 {min(len(topics), 20)} 个热搜话题...")
@@ -837,8 +1203,7 @@ def main():
     results = analyzer.analyze_all(topics)
 
     # 保存结果
-    with open('weibo_analysis_results.json', 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    serialization.dump(results, 'weibo_analysis_results.json')
 
     print()
     print('=' * 60)
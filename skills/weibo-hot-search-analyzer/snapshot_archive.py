@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+热搜快照列式归档
+- 每次抓取追加一个 Parquet 文件，按天分区：<root>/date=YYYY-MM-DD/HHMMSS_ffffff.parquet
+- 列：fetch_time、rank、title、heat、tags
+- 按时间范围读取时只打开相关日期的分区，并按 fetch_time 过滤
+- 开始写入新的一天时，把之前各天的小文件合并为一个文件
+- 可导入已有的 JSON 快照文件
+
+依赖 pyarrow（可选），未安装时使用归档功能会报错，其余脚本不受影响
+"""
+
+import glob
+import os
+import argparse
+import logging
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Optional, Iterable, Tuple, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 取决于运行环境
+    pa = None
+
+import serialization
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshot_archive')
+
+# 合并后的单日文件名
+_COMPACT_NAME = 'compact.parquet'
+
+TimeLike = Union[str, datetime, date, None]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError('快照归档需要 pyarrow，请先执行 pip install pyarrow')
+
+
+def _schema():
+    return pa.schema([
+        ('fetch_time', pa.timestamp('us')),
+        ('rank', pa.int32()),
+        ('title', pa.string()),
+        ('heat', pa.int64()),
+        ('tags', pa.string())
+    ])
+
+
+def _to_datetime(value: TimeLike, end_of_day: bool = False) -> Optional[datetime]:
+    """把 ISO 字符串、日期或时间转换为 datetime；只给出日期时按当天开始（或结束）处理"""
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        moment = datetime.combine(value, datetime.min.time())
+        return moment + timedelta(days=1) - timedelta(microseconds=1) if end_of_day else moment
+    if len(value) == 10:
+        return _to_datetime(date.fromisoformat(value), end_of_day)
+    return datetime.fromisoformat(value)
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class SnapshotArchive:
+    """按天分区的 Parquet 快照归档（只追加）"""
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE_DIR, auto_compact: bool = True):
+        """
+        初始化归档
+
+        Args:
+            root: 归档根目录
+            auto_compact: 开始写入新的一天时是否合并之前各天的文件
+        """
+        _require_pyarrow()
+        self.root = root
+        self.auto_compact = auto_compact
+        os.makedirs(root, exist_ok=True)
+
+    def _partition(self, day: date) -> str:
+        return os.path.join(self.root, f'date={day.isoformat()}')
+
+    def append(self, items: List[Dict], fetch_time: TimeLike = None) -> str:
+        """
+        追加一次抓取的热搜列表
+
+        Args:
+            items: 热搜列表（title、heat、tags、rank）
+            fetch_time: 抓取时间，默认为当前时间
+
+        Returns:
+            写入的文件路径
+        """
+        fetch_time = _to_datetime(fetch_time) or datetime.now()
+        table = pa.table({
+            'fetch_time': [fetch_time] * len(items),
+            'rank': [_to_int(item.get('rank', i + 1)) for i, item in enumerate(items)],
+            'title': [item.get('title', '') for item in items],
+            'heat': [_to_int(item.get('heat', 0)) for item in items],
+            'tags': [item.get('tags', '') or '' for item in items]
+        }, schema=_schema())
+
+        partition = self._partition(fetch_time.date())
+        new_day = not os.path.isdir(partition)
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, fetch_time.strftime('%H%M%S_%f') + '.parquet')
+        # 同一时刻重复写入时不覆盖已有文件
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(partition, fetch_time.strftime('%H%M%S_%f') + f'_{suffix}.parquet')
+            suffix += 1
+
+        # 先写临时文件再改名，读取方不会看到写了一半的文件
+        temp_path = path + '.tmp'
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, path)
+
+        if new_day and self.auto_compact:
+            for day in self.days():
+                if day < fetch_time.date():
+                    self.compact(day)
+        return path
+
+    def days(self) -> List[date]:
+        """归档中已有的日期"""
+        found = []
+        for partition in glob.glob(os.path.join(self.root, 'date=*')):
+            try:
+                found.append(date.fromisoformat(os.path.basename(partition)[5:]))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    def _files(self, start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+        files = []
+        for day in self.days():
+            if (start is not None and day < start.date()) or (end is not None and day > end.date()):
+                continue
+            files.extend(sorted(glob.glob(os.path.join(self._partition(day), '*.parquet'))))
+        return files
+
+    def read(self, start: TimeLike = None, end: TimeLike = None,
+             columns: Optional[List[str]] = None) -> 'pa.Table':
+        """
+        读取时间范围内的快照行（含两端），按 fetch_time、rank 排序
+
+        Args:
+            start: 起始时间（ISO 字符串、日期或时间），None 表示不限
+            end: 结束时间，只给日期时包含当天全部快照，None 表示不限
+            columns: 需要的列，默认全部
+
+        Returns:
+            pyarrow.Table
+        """
+        start = _to_datetime(start)
+        end = _to_datetime(end, end_of_day=True)
+        files = self._files(start, end)
+        if not files:
+            table = _schema().empty_table()
+            return table.select(columns) if columns else table
+
+        read_columns = None
+        if columns:
+            read_columns = list(dict.fromkeys(list(columns) + ['fetch_time', 'rank']))
+
+        condition = None
+        if start is not None:
+            condition = ds.field('fetch_time') >= pa.scalar(start, pa.timestamp('us'))
+        if end is not None:
+            upper = ds.field('fetch_time') <= pa.scalar(end, pa.timestamp('us'))
+            condition = upper if condition is None else condition & upper
+
+        dataset = ds.dataset(files, format='parquet', schema=_schema())
+        table = dataset.to_table(columns=read_columns, filter=condition)
+
+        table = table.sort_by([('fetch_time', 'ascending'), ('rank', 'ascending')])
+        return table.select(columns) if columns else table
+
+    def iter_snapshots(self, start: TimeLike = None, end: TimeLike = None) -> Iterable[Tuple[datetime, List[Dict]]]:
+        """
+        按时间顺序产出时间范围内的每个快照
+
+        Yields:
+            (抓取时间, 热搜列表)
+        """
+        table = self.read(start, end)
+        if not table.num_rows:
+            return
+        times = table['fetch_time'].to_pylist()
+        rows = table.select(['title', 'heat', 'tags', 'rank']).to_pylist()
+        current = times[0]
+        items = []
+        for fetch_time, row in zip(times, rows):
+            if fetch_time != current:
+                yield current, items
+                current, items = fetch_time, []
+            items.append(row)
+        yield current, items
+
+    def latest(self) -> Optional[Tuple[datetime, List[Dict]]]:
+        """
+        最近一次归档的快照，上游不可用时可作为后备数据
+
+        Returns:
+            (抓取时间, 热搜列表)，归档为空时返回 None
+        """
+        for day in reversed(self.days()):
+            snapshot = None
+            for snapshot in self.iter_snapshots(day, day):
+                pass
+            if snapshot is not None:
+                return snapshot
+        return None
+
+    def compact(self, day: Union[str, date]) -> Optional[str]:
+        """
+        把某天的所有快照文件合并为一个文件，减少后续读取时打开的文件数
+
+        Returns:
+            合并后的文件路径，当天没有数据时返回 None
+        """
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        partition = self._partition(day)
+        files = sorted(glob.glob(os.path.join(partition, '*.parquet')))
+        if not files:
+            return None
+        if len(files) == 1 and os.path.basename(files[0]) == _COMPACT_NAME:
+            return files[0]
+
+        table = ds.dataset(files, format='parquet', schema=_schema()).to_table()
+        table = table.sort_by([('fetch_time', 'ascending'), ('rank', 'ascending')])
+        target = os.path.join(partition, _COMPACT_NAME)
+        temp_path = target + '.tmp'
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, target)
+        for path in files:
+            if path != target:
+                os.remove(path)
+        return target
+
+    def import_json(self, paths: Iterable[str]) -> int:
+        """
+        导入已保存的JSON快照文件（fetch_time + data 格式）
+
+        Returns:
+            导入的快照数
+        """
+        count = 0
+        for path in paths:
+            snapshot = serialization.load(path)
+            items = snapshot.get('data', [])
+            fetch_time = snapshot.get('fetch_time')
+            if not isinstance(items, list) or not fetch_time:
+                logger.warning(f"不是快照文件，已跳过: {path}")
+                continue
+            self.append(items, fetch_time)
+            count += 1
+        return count
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='热搜快照列式归档工具')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_DIR, help='归档目录')
+    parser.add_argument('--import-json', nargs='*', default=[], help='要导入的JSON快照文件')
+    parser.add_argument('--compact', nargs='*', default=[], help='要合并的日期（YYYY-MM-DD）')
+    parser.add_argument('--start', help='查询起始时间（ISO 格式）')
+    parser.add_argument('--end', help='查询结束时间（ISO 格式）')
+
+    args = parser.parse_args()
+
+    archive = SnapshotArchive(args.archive)
+    if args.import_json:
+        print(f"✅ 导入 {archive.import_json(args.import_json)} 个快照")
+    for day in args.compact:
+        print(f"📦 已合并: {archive.compact(day)}")
+
+    table = archive.read(args.start, args.end, columns=['fetch_time'])
+    snapshots = len(pc.unique(table['fetch_time'])) if table.num_rows else 0
+    print(f"📊 时间范围内共 {snapshots} 个快照，{table.num_rows} 行")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+热搜快照缓存
+- 按接口地址保存上一次的热搜快照、ETag 和 Last-Modified
+- 支持条件请求（If-None-Match / If-Modified-Since）
+- 以内容哈希判断榜单是否变化，并输出新增、移除、排名、热度和标签变化的差异
+"""
+
+import hashlib
+import json
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple
+
+import serialization
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshot_cache')
+
+
+def normalize_title(title: str) -> str:
+    """归一化话题标题，用作跨快照、跨来源的话题键：合并空白、去掉首尾的话题标记 #、转为小写"""
+    return ' '.join((title or '').strip().strip('#').split()).lower()
+
+
+def _snapshot_rows(items: List[Dict]) -> List[Tuple[str, int, int, str]]:
+    """提取参与比较的字段：(标题, 排名, 热度, 标签)"""
+    return [
+        (item.get('title', ''), item.get('rank', i + 1), item.get('heat', 0), item.get('tags', ''))
+        for i, item in enumerate(items)
+    ]
+
+
+def content_hash(items: List[Dict]) -> str:
+    """计算热搜列表的内容哈希（只包含标题、排名、热度和标签）"""
+    payload = json.dumps(_snapshot_rows(items), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class SnapshotDiff:
+    """两次快照之间的差异"""
+    content_hash: str
+    previous_hash: Optional[str]
+    added: List[Dict] = field(default_factory=list)         # 新上榜的话题
+    removed: List[Dict] = field(default_factory=list)       # 已下榜的话题
+    reranked: List[Dict] = field(default_factory=list)      # {'title', 'old_rank', 'new_rank'}
+    heat_changed: List[Dict] = field(default_factory=list)  # {'title', 'old_heat', 'new_heat'}
+    tags_changed: List[Dict] = field(default_factory=list)  # {'title', 'old_tags', 'new_tags'}
+
+    @property
+    def unchanged(self) -> bool:
+        return self.content_hash == self.previous_hash
+
+    @property
+    def changed_titles(self) -> List[str]:
+        """需要后续环节重新处理的话题标题（新增、排名、热度或标签变化）"""
+        titles = [item.get('title', '') for item in self.added]
+        seen = set(titles)
+        for change in self.reranked + self.heat_changed + self.tags_changed:
+            if change['title'] not in seen:
+                seen.add(change['title'])
+                titles.append(change['title'])
+        return titles
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'reranked': len(self.reranked),
+            'heat_changed': len(self.heat_changed),
+            'tags_changed': len(self.tags_changed)
+        }
+
+
+def diff_snapshots(previous: Optional[List[Dict]], current: List[Dict],
+                   previous_hash: Optional[str] = None, current_hash: Optional[str] = None) -> SnapshotDiff:
+    """
+    比较两次热搜快照
+
+    Args:
+        previous: 上一次的热搜列表，None 表示没有历史快照
+        current: 本次的热搜列表
+        previous_hash: 上一次的内容哈希（可选，缺省时重新计算）
+        current_hash: 本次的内容哈希（可选，缺省时重新计算）
+
+    Returns:
+        快照差异
+    """
+    current_hash = current_hash or content_hash(current)
+    if previous is None:
+        return SnapshotDiff(current_hash, None, added=list(current))
+
+    previous_hash = previous_hash or content_hash(previous)
+    diff = SnapshotDiff(current_hash, previous_hash)
+    if diff.unchanged:
+        return diff
+
+    old_items = {}
+    for i, item in enumerate(previous):
+        old_items.setdefault(normalize_title(item.get('title', '')), (i, item))
+
+    seen = set()
+    for i, item in enumerate(current):
+        key = normalize_title(item.get('title', ''))
+        if key in seen:
+            continue
+        seen.add(key)
+
+        if key not in old_items:
+            diff.added.append(item)
+            continue
+
+        old_index, old_item = old_items[key]
+        title = item.get('title', '')
+        old_rank = old_item.get('rank', old_index + 1)
+        new_rank = item.get('rank', i + 1)
+        if old_rank != new_rank:
+            diff.reranked.append({'title': title, 'old_rank': old_rank, 'new_rank': new_rank})
+        old_heat = old_item.get('heat', 0)
+        new_heat = item.get('heat', 0)
+        if old_heat != new_heat:
+            diff.heat_changed.append({'title': title, 'old_heat': old_heat, 'new_heat': new_heat})
+        old_tags = old_item.get('tags', '')
+        new_tags = item.get('tags', '')
+        if old_tags != new_tags:
+            diff.tags_changed.append({'title': title, 'old_tags': old_tags, 'new_tags': new_tags})
+
+    diff.removed = [item for key, (_, item) in old_items.items() if key not in seen]
+    return diff
+
+
+class SnapshotCache:
+    """按接口地址持久化的热搜快照缓存"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录，每个接口地址一个JSON文件
+        """
+        self.cache_dir = cache_dir
+        self._entries: Dict[str, Dict] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url: str) -> Optional[Dict]:
+        """读取某个地址的缓存条目：etag、last_modified、content_hash、items"""
+        if url not in self._entries:
+            try:
+                self._entries[url] = serialization.load(self._path(url))
+            except FileNotFoundError:
+                return None
+            except json.JSONDecodeError as e:
+                logger.warning(f"快照缓存损坏，已忽略: {url}: {e}")
+                return None
+        return self._entries[url]
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """根据缓存构造条件请求头"""
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def unchanged(self, url: str) -> Tuple[List[Dict], SnapshotDiff]:
+        """上游返回 304 时使用缓存的快照"""
+        entry = self.get(url)
+        return entry['items'], SnapshotDiff(entry['content_hash'], entry['content_hash'])
+
+    def update(self, url: str, items: List[Dict],
+               etag: Optional[str] = None, last_modified: Optional[str] = None) -> SnapshotDiff:
+        """
+        保存新快照并返回相对上一次快照的差异
+
+        Args:
+            url: 接口地址
+            items: 本次解析出的热搜列表
+            etag: 响应的 ETag
+            last_modified: 响应的 Last-Modified
+
+        Returns:
+            快照差异
+        """
+        entry = self.get(url)
+        new_hash = content_hash(items)
+        if entry is None:
+            diff = diff_snapshots(None, items, current_hash=new_hash)
+        else:
+            diff = diff_snapshots(entry['items'], items, entry['content_hash'], new_hash)
+
+        if entry is None or not diff.unchanged or entry.get('etag') != etag or entry.get('last_modified') != last_modified:
+            entry = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'content_hash': new_hash,
+                'items': items
+            }
+            self._entries[url] = entry
+            # 先写临时文件再改名，中断时不会留下写了一半的缓存
+            path = self._path(url)
+            temp_path = path + '.tmp'
+            serialization.dump(entry, temp_path, pretty=False)
+            os.replace(temp_path, path)
+
+        return diff
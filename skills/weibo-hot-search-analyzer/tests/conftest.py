@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""测试公共设置：脚本模块位于上一级目录，直接按模块名导入"""
+
+import copy
+import os
+import sys
+import threading
+
+import pytest
+
+SKILL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SKILL_DIR not in sys.path:
+    sys.path.insert(0, SKILL_DIR)
+
+import config_loader
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path_factory, monkeypatch):
+    """
+    把 config.json 中的缓存和归档目录指向本测试的临时目录
+
+    测试不在脚本目录中留下 .snapshot_cache/、.template_cache/、.fragment_cache/ 等状态，
+    结果也不依赖之前的运行。
+    """
+    config = copy.deepcopy(config_loader.load_config())
+    state_dir = tmp_path_factory.mktemp('state')
+    config.setdefault('snapshot_cache', {})['dir'] = str(state_dir / 'snapshot_cache')
+    config.setdefault('archive', {})['dir'] = str(state_dir / 'snapshot_archive')
+    report = config.setdefault('report', {})
+    report['bytecode_cache_dir'] = str(state_dir / 'template_cache')
+    report['fragment_cache_path'] = str(state_dir / 'fragment_cache' / 'fragments.sqlite3')
+    monkeypatch.setitem(config_loader._config_cache, config_loader.DEFAULT_CONFIG_PATH, config)
+    return config
+
+
+@pytest.fixture
+def mock_api_url():
+    """在后台线程启动 mock_api.py 的模拟热搜服务，返回服务地址"""
+    pytest.importorskip('flask')
+    from werkzeug.serving import make_server
+    from mock_api import app
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+        thread.join()
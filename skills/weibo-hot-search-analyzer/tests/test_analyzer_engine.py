@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+import pytest
+
+from analyzer_engine import AnalyzerEngine, create_engine
+
+TOPICS = [{'title': f'某地发生地震{i}', 'heat': 1000 - i, 'tags': '', 'rank': i + 1} for i in range(4)]
+
+
+def test_chain_without_api_key_reports_notice(caplog):
+    engine = create_engine('smart>trend', top_k=2)
+
+    with caplog.at_level(logging.WARNING):
+        output = engine.analyze_all(TOPICS, max_topics=None)
+
+    schedule = output['schedule']
+    assert schedule['selected'] == 2
+    assert schedule['refined'] == 0
+    assert 'OpenAI' in schedule['notice']
+    assert any('OpenAI' in record.getMessage() for record in caplog.records)
+    assert all(topic['engine'] == 'smart' for topic in output['topics'])
+
+
+def test_incomplete_engine_fails_at_construction():
+    class Incomplete(AnalyzerEngine):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_chain_runs_inside_an_event_loop():
+    engine = create_engine('rules>trend', top_k=2)
+
+    async def collect():
+        # 模拟在异步抓取流程中调用：当前线程已有运行中的事件循环
+        return await engine.analyze_all_async(TOPICS, max_topics=None)
+
+    output = asyncio.run(collect())
+    assert output['total_topics'] == len(TOPICS)
+    assert output['schedule']['selected'] == 2
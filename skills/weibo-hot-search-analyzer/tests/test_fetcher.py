@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from weibo_hotsearch_fetcher import merge_hot_search_lists
+
+
+def test_merge_deduplicates_titles_and_reranks():
+    page1 = [
+        {'title': '话题A', 'heat': 300, 'tags': '热', 'rank': 1},
+        {'title': '话题B', 'heat': 200, 'tags': '', 'rank': 2}
+    ]
+    page2 = [
+        {'title': ' #话题B# ', 'heat': 250, 'tags': '', 'rank': 1},
+        {'title': '话题C', 'heat': 100, 'tags': '新', 'rank': 2}
+    ]
+
+    merged = merge_hot_search_lists([page1, page2])
+
+    assert [item['title'] for item in merged] == ['话题A', '话题B', '话题C']
+    assert [item['rank'] for item in merged] == [1, 2, 3]
+    assert merged[1]['heat'] == 250
+    # 输入列表不被修改
+    assert page2[1]['rank'] == 2
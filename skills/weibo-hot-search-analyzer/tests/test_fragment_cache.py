@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""report_template_v2.html 的片段缓存：键只取卡片用到的字段，排名和热度变化不导致重新渲染"""
+
+import copy
+import os
+
+import pytest
+
+import serialization
+from report_renderer import RANK_SLOT, FragmentCache, ReportRenderer, get_environment
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(BASE_DIR, 'weibo_analysis_results.json')
+
+
+@pytest.fixture
+def results():
+    return serialization.load(RESULTS_FILE)
+
+
+@pytest.fixture
+def env(tmp_path):
+    return get_environment(BASE_DIR, cache_dir=str(tmp_path / 'bytecode'))
+
+
+@pytest.fixture
+def cache(tmp_path, env):
+    cache = FragmentCache(str(tmp_path / 'fragments.sqlite3'), env)
+    yield cache
+    cache.close()
+
+
+def _refresh_heat(results):
+    """分钟级刷新：热度和排名变化，分析内容不变"""
+    refreshed = copy.deepcopy(results)
+    topics = refreshed['topics']
+    for topic in topics:
+        topic['heat_value'] = topic.get('heat_value', 0) * 2 + 1
+    topics.reverse()
+    for rank, topic in enumerate(topics, 1):
+        topic['rank'] = rank
+    return refreshed
+
+
+def test_cached_report_matches_uncached(results, env, cache):
+    expected = ReportRenderer('report_template_v2.html', env=env).render(results, date='fixed')
+    renderer = ReportRenderer('report_template_v2.html', env=env, fragment_cache=cache)
+    assert renderer.render(results, date='fixed') == expected
+    assert renderer.render(results, date='fixed') == expected
+
+
+def test_heat_and_rank_refresh_has_no_card_misses(results, env, cache):
+    renderer = ReportRenderer('report_template_v2.html', env=env, fragment_cache=cache)
+    renderer.render(results, date='fixed')
+
+    refreshed = _refresh_heat(results)
+    misses = cache.misses
+    html = renderer.render(refreshed, date='fixed')
+    assert cache.misses == misses
+    # 排名仍按本次数据渲染
+    expected = ReportRenderer('report_template_v2.html', env=env).render(refreshed, date='fixed')
+    assert html == expected
+
+
+def test_card_key_ignores_rank_and_heat(results, cache):
+    topic = results['topics'][0]
+    fingerprint = cache._card_fingerprint()
+    key = cache._card_key(topic, fingerprint)
+
+    assert cache._card_key(dict(topic, rank=99, heat_value=1), fingerprint) == key
+    assert cache._card_key(dict(topic, title=topic['title'] + '（更新）'), fingerprint) != key
+    assert cache._card_key(dict(topic, feature_list=['新功能']), fingerprint) != key
+
+
+def test_changed_topic_is_rendered_again(results, env, cache):
+    renderer = ReportRenderer('report_template_v2.html', env=env, fragment_cache=cache)
+    renderer.render(results, date='fixed')
+
+    changed = copy.deepcopy(results)
+    changed['topics'][0]['event_summary'] = '事件有了新进展'
+    misses = cache.misses
+    html = renderer.render(changed, date='fixed')
+    assert cache.misses == misses + 1
+    assert '事件有了新进展' in html
+
+
+def test_cached_card_is_self_contained(results, env, cache):
+    renderer = ReportRenderer('report_template_v2.html', env=env, fragment_cache=cache)
+    renderer.render(results, date='fixed')
+    cache.flush()
+
+    html = next(row[0] for row in cache.conn.execute('SELECT html FROM fragments')
+                if 'class="topic-card"' in row[0])
+    assert html.count('<div') == html.count('</div>')
+    assert RANK_SLOT in html
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""HeatIndex 的速度、峰值、在榜时长和上升榜查询（手工构造的快照，答案已知）"""
+
+import pytest
+
+from heat_index import HeatIndex
+from snapshot_archive import SnapshotArchive
+
+# 每10分钟一次快照；话题A在 08:20 下榜后又回到榜上，话题C在 08:10 新上榜
+SNAPSHOTS = [
+    ('2025-12-22T08:00:00', [
+        {'title': '话题A', 'rank': 1, 'heat': 100},
+        {'title': '话题B', 'rank': 2, 'heat': 50},
+    ]),
+    ('2025-12-22T08:10:00', [
+        {'title': '话题B', 'rank': 1, 'heat': 300},
+        {'title': '话题A', 'rank': 2, 'heat': 200},
+        {'title': '话题C', 'rank': 3, 'heat': 10},
+    ]),
+    ('2025-12-22T08:20:00', [
+        {'title': '话题B', 'rank': 1, 'heat': 400},
+        {'title': '话题C', 'rank': 2, 'heat': 70},
+    ]),
+    ('2025-12-22T08:30:00', [
+        {'title': '话题B', 'rank': 1, 'heat': 350},
+        {'title': '话题C', 'rank': 2, 'heat': 100},
+        {'title': '话题A', 'rank': 3, 'heat': 150},
+    ]),
+]
+
+
+@pytest.fixture
+def index():
+    return HeatIndex.from_snapshots(SNAPSHOTS)
+
+
+def test_stats(index):
+    assert index.stats() == {'snapshots': 4, 'topics': 3, 'points': 10}
+
+
+def test_velocity(index):
+    velocity = index.velocity('话题A')
+    assert velocity['heat_change'] == 50
+    assert velocity['rank_change'] == -2
+    assert velocity['heat_per_minute'] == 1.67
+    assert velocity['rank_per_hour'] == -4.0
+
+    window = index.velocity('#话题B#', '2025-12-22T08:00', '2025-12-22T08:20')
+    assert window['heat_per_minute'] == 17.5
+    assert window['rank_per_hour'] == 3.0
+
+    # 窗口内只有一个数据点、未知话题
+    assert index.velocity('话题C', '2025-12-22T08:10', '2025-12-22T08:10') is None
+    assert index.velocity('不存在') is None
+
+
+def test_time_to_peak(index):
+    peak = index.time_to_peak('话题B')
+    assert peak['first_seen'] == '2025-12-22T08:00:00'
+    assert peak['peak_time'] == '2025-12-22T08:20:00'
+    assert peak['peak_heat'] == 400
+    assert peak['peak_rank'] == 1
+    assert peak['seconds_to_peak'] == 1200
+
+    assert index.time_to_peak('话题A')['seconds_to_peak'] == 600
+    assert index.time_to_peak('话题A', '2025-12-22T08:20')['peak_heat'] == 150
+
+
+def test_dwell_time(index):
+    dwell = index.dwell_time('话题A')
+    # 08:00、08:10 各计到下一次快照，08:30 是最后一次快照，按典型间隔（10分钟）计
+    assert dwell['appearances'] == 3
+    assert dwell['seconds'] == 1800
+    assert dwell['first_seen'] == '2025-12-22T08:00:00'
+    assert dwell['last_seen'] == '2025-12-22T08:30:00'
+
+    assert index.dwell_time('话题C', end='2025-12-22T08:20')['seconds'] == 1200
+    assert index.dwell_time('话题C', end='2025-12-22T08:00') is None
+
+
+def test_top_risers_by_heat(index):
+    risers = index.top_risers('2025-12-22T08:00', '2025-12-22T08:10')
+    assert [riser['title'] for riser in risers] == ['话题B', '话题A', '话题C']
+    # 新上榜的话题从0热度起算，没有起始排名
+    new = risers[2]
+    assert (new['start_heat'], new['heat_change'], new['rank_change']) == (0, 10, None)
+
+
+def test_top_risers_by_rank(index):
+    risers = index.top_risers('2025-12-22T08:00', '2025-12-22T08:10', by='rank')
+    # 新上榜的话题C按从榜单末尾（第3名）上升计算：0 名
+    assert [riser['title'] for riser in risers] == ['话题B', '话题C', '话题A']
+    assert index.top_risers('2025-12-22T08:10', '2025-12-22T08:30', limit=1, by='rank')[0]['title'] == '话题C'
+
+    with pytest.raises(ValueError):
+        index.top_risers(by='score')
+
+
+def test_snapshots_must_be_added_in_order(index):
+    with pytest.raises(ValueError):
+        index.add_snapshot('2025-12-22T07:50:00', [{'title': '话题A', 'rank': 1, 'heat': 1}])
+
+
+def test_from_archive_matches_from_snapshots(tmp_path, index):
+    pytest.importorskip('pyarrow')
+
+    archive = SnapshotArchive(str(tmp_path / 'archive'))
+    for fetch_time, items in SNAPSHOTS:
+        archive.append(items, fetch_time)
+
+    archived = HeatIndex.from_archive(archive)
+    assert list(archived.times) == list(index.times)
+    assert archived.stats() == index.stats()
+    for title in ('话题A', '话题B', '话题C'):
+        assert archived.series(title) == index.series(title)
+    assert archived.top_risers(by='rank') == index.top_risers(by='rank')
+
+    window = HeatIndex.from_archive(archive, '2025-12-22T08:10', '2025-12-22T08:20')
+    assert window.stats() == {'snapshots': 2, 'topics': 3, 'points': 5}
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""HttpClient 的重试、熔断和延迟统计，通过 mock_api.py 的 fail_rate/delay 参数注入故障"""
+
+import asyncio
+import random
+
+import aiohttp
+import pytest
+import requests
+
+from http_client import HttpClient, CircuitBreaker, CircuitOpenError, RetryableStatusError
+
+
+def _host_stats(client: HttpClient) -> dict:
+    (stats,) = client.stats().values()
+    return stats
+
+
+def test_retries_recover_from_injected_faults(mock_api_url):
+    random.seed(1)
+    client = HttpClient(timeout=5, retry_count=10, backoff_base=0)
+    url = f'{mock_api_url}/hotsearch?fail_rate=0.5'
+
+    for _ in range(5):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()['data']) == 15
+
+    stats = _host_stats(client)
+    # 部分请求先收到 503 再重试成功
+    assert stats['latency']['count'] > 5
+    assert stats['circuit'] == CircuitBreaker.CLOSED
+
+
+def test_async_retries_recover_from_injected_faults(mock_api_url):
+    random.seed(2)
+    client = HttpClient(timeout=5, retry_count=10, backoff_base=0)
+    url = f'{mock_api_url}/hotsearch?fail_rate=0.5'
+
+    async def fetch():
+        async with aiohttp.ClientSession() as session:
+            return [await client.get_json_async(session, url) for _ in range(5)]
+
+    for data in asyncio.run(fetch()):
+        assert len(data['data']) == 15
+    assert _host_stats(client)['latency']['count'] > 5
+
+
+def test_breaker_opens_after_exhausted_retries(mock_api_url):
+    client = HttpClient(timeout=5, retry_count=1, backoff_base=0, failure_threshold=2, reset_timeout=60)
+    url = f'{mock_api_url}/hotsearch?fail_rate=1'
+
+    for _ in range(2):
+        with pytest.raises(RetryableStatusError):
+            client.get(url)
+    attempts = _host_stats(client)['latency']['count']
+    assert attempts == 4
+
+    # 熔断器打开后直接拒绝，不再发出请求
+    with pytest.raises(CircuitOpenError):
+        client.get(url)
+    stats = _host_stats(client)
+    assert stats['circuit'] == CircuitBreaker.OPEN
+    assert stats['latency']['count'] == attempts
+
+
+def test_breaker_half_open_probe_closes_on_success(mock_api_url):
+    client = HttpClient(timeout=5, retry_count=0, failure_threshold=1, reset_timeout=0)
+
+    with pytest.raises(RetryableStatusError):
+        client.get(f'{mock_api_url}/hotsearch?fail_rate=1')
+    assert _host_stats(client)['circuit'] == CircuitBreaker.OPEN
+
+    assert client.get(f'{mock_api_url}/hotsearch').status_code == 200
+    assert _host_stats(client)['circuit'] == CircuitBreaker.CLOSED
+
+
+def test_latency_histogram_records_injected_delay(mock_api_url):
+    client = HttpClient(timeout=5, retry_count=0)
+    client.get(f'{mock_api_url}/hotsearch')
+    client.get(f'{mock_api_url}/hotsearch?delay=0.3')
+
+    latency = _host_stats(client)['latency']
+    assert latency['count'] == 2
+    assert sum(latency['buckets'].values()) == 2
+    assert latency['buckets']['<=500ms'] == 1
+    assert latency['p95_ms'] >= 500
+
+
+def test_timeout_is_retried_then_raised(mock_api_url):
+    client = HttpClient(timeout=0.1, retry_count=1, backoff_base=0)
+    with pytest.raises(requests.Timeout):
+        client.get(f'{mock_api_url}/hotsearch?delay=0.5')
+    assert _host_stats(client)['latency']['count'] == 2
+
+
+def test_half_open_breaker_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_concurrent_requests_send_one_probe_to_a_failing_host(mock_api_url):
+    client = HttpClient(timeout=5, retry_count=3, backoff_base=0, failure_threshold=1, reset_timeout=60)
+    url = f'{mock_api_url}/hotsearch?fail_rate=1'
+    with pytest.raises(RetryableStatusError):
+        client.get(url)
+    breaker = next(iter(client.breakers.values()))
+    assert breaker.state == CircuitBreaker.OPEN
+    attempts = _host_stats(client)['latency']['count']
+
+    # 熔断时间已过：并发请求中只有一个试探请求到达上游，试探失败后不再重试
+    breaker.opened_at -= 60
+
+    async def fetch_all():
+        async with aiohttp.ClientSession() as session:
+            return await asyncio.gather(*(client.get_json_async(session, url) for _ in range(5)),
+                                        return_exceptions=True)
+
+    errors = asyncio.run(fetch_all())
+    assert sum(isinstance(error, CircuitOpenError) for error in errors) == 4
+    assert sum(isinstance(error, aiohttp.ClientResponseError) for error in errors) == 1
+    assert _host_stats(client)['latency']['count'] == attempts + 1
+    assert breaker.state == CircuitBreaker.OPEN
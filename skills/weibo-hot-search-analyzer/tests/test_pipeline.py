@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""上游故障时 WeiboHotSearchPipeline.run 不分析空列表"""
+
+import pytest
+
+import run_analysis
+from http_client import CircuitOpenError
+from result_store import ResultStore
+from run_analysis import WeiboHotSearchPipeline
+from snapshot_archive import SnapshotArchive
+from snapshot_cache import SnapshotCache
+
+
+def _failing_fetch():
+    raise CircuitOpenError('熔断器已打开')
+
+
+def _pipeline(tmp_path, monkeypatch, archive_config):
+    pipeline = WeiboHotSearchPipeline(output_prefix='test')
+    pipeline.base_dir = str(tmp_path)
+    monkeypatch.setattr(pipeline, 'fetch_hot_search', _failing_fetch)
+
+    real_get_section = run_analysis.get_section
+    monkeypatch.setattr(run_analysis, 'get_section',
+                        lambda name, *args: archive_config if name == 'archive' else real_get_section(name, *args))
+    return pipeline
+
+
+def test_run_aborts_when_fetch_fails_without_archive(tmp_path, monkeypatch):
+    pipeline = _pipeline(tmp_path, monkeypatch, {'enabled': False})
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError('不应在获取失败时分析')
+
+    monkeypatch.setattr(run_analysis, 'create_engine', unexpected)
+
+    with pytest.raises(run_analysis.HotSearchFetchError):
+        pipeline.run(topics_count=5)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_falls_back_to_latest_archived_snapshot(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+
+    archive_dir = tmp_path / 'archive'
+    archive = SnapshotArchive(str(archive_dir))
+    archive.append([{'title': '旧话题', 'heat': 100, 'tags': '', 'rank': 1}], '2025-12-22T08:00')
+    latest = [{'title': f'某地发生地震{i}', 'heat': 1000 - i, 'tags': '', 'rank': i + 1} for i in range(3)]
+    archive.append(latest, '2025-12-22T09:00')
+
+    pipeline = _pipeline(tmp_path, monkeypatch, {'enabled': True, 'dir': str(archive_dir)})
+    results = pipeline.run(topics_count=5)
+
+    assert results is not None
+    assert sorted(topic['title'] for topic in results['topics']) == sorted(item['title'] for item in latest)
+    # 后备快照不再重复归档
+    assert len(list(archive.iter_snapshots())) == 2
+
+
+def test_run_only_processes_changed_snapshots(tmp_path, monkeypatch):
+    pipeline = WeiboHotSearchPipeline(output_prefix='test')
+    pipeline.base_dir = str(tmp_path)
+    cache = SnapshotCache(str(tmp_path / 'snapshots'))
+    monkeypatch.setattr(run_analysis, 'ResultStore', lambda: ResultStore(str(tmp_path / 'results.sqlite3')))
+
+    snapshot = [{'title': f'某地发生地震{i}', 'heat': 1000 - i, 'tags': '', 'rank': i + 1} for i in range(3)]
+
+    def fetch():
+        pipeline.last_diff = cache.update('http://example.com/hot', snapshot)
+        return [dict(item) for item in snapshot]
+
+    monkeypatch.setattr(pipeline, 'fetch_hot_search', fetch)
+
+    first = pipeline.run(topics_count=5)
+    assert first['snapshot_diff']['added'] == 3
+    assert first['cache_stats']['misses'] == 3
+
+    # 榜单未变化：跳过分析
+    assert pipeline.run(topics_count=5) is None
+
+    # 只有一个新话题：其余话题复用已保存的结果
+    snapshot = snapshot[:2] + [{'title': '新话题', 'heat': 500, 'tags': '新', 'rank': 3}]
+    third = pipeline.run(topics_count=5)
+    assert third['snapshot_diff']['added'] == 1
+    assert third['cache_stats']['misses'] == 1
+
+
+class _StubPipeline:
+    """代替 WeiboHotSearchPipeline，只检查 main 对 run 结果的处理"""
+
+    outcome = None
+
+    def __init__(self, **kwargs):
+        pass
+
+    def run(self, **kwargs):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def test_main_exits_nonzero_when_fetch_fails(monkeypatch):
+    monkeypatch.setattr(_StubPipeline, 'outcome', run_analysis.HotSearchFetchError('熔断器已打开'))
+    monkeypatch.setattr(run_analysis, 'WeiboHotSearchPipeline', _StubPipeline)
+    monkeypatch.setattr('sys.argv', ['run_analysis.py'])
+    with pytest.raises(SystemExit) as exc_info:
+        run_analysis.main()
+    assert exc_info.value.code == 1
+
+
+def test_main_exits_zero_when_snapshot_is_unchanged(monkeypatch):
+    monkeypatch.setattr(run_analysis, 'WeiboHotSearchPipeline', _StubPipeline)
+    monkeypatch.setattr('sys.argv', ['run_analysis.py'])
+    run_analysis.main()
@@ -0,0 +1,42 @@
+import logging
+
+import pytest
+
+pytest.importorskip('jinja2')
+
+from report_generator import ReportGenerator
+
+DATA = {'total_topics': 0, 'excellent_count': 0, 'good_count': 0, 'avg_score': 0, 'topics': []}
+
+
+def test_builtin_template_is_enhanced(caplog):
+    with caplog.at_level(logging.WARNING, logger='report_generator'):
+        generator = ReportGenerator('report_template.html')
+    assert generator.enhanced
+    assert 'report_enhancements.html' not in caplog.text
+
+
+def test_custom_template_without_include_warns(tmp_path, caplog):
+    template = tmp_path / 'custom.html'
+    template.write_text('<html><body>{{ total_topics }}</body></html>', encoding='utf-8')
+    with caplog.at_level(logging.WARNING, logger='report_generator'):
+        generator = ReportGenerator(str(template))
+    assert not generator.enhanced
+    assert 'report_enhancements.html' in caplog.text
+
+
+def test_custom_template_inheriting_include(tmp_path, caplog):
+    (tmp_path / 'base.html').write_text(
+        "<body>{% block body %}{% endblock %}"
+        "{% if enhance %}{% include 'report_enhancements.html' %}{% endif %}</body>",
+        encoding='utf-8'
+    )
+    template = tmp_path / 'child.html'
+    template.write_text("{% extends 'base.html' %}{% block body %}{{ total_topics }}{% endblock %}",
+                        encoding='utf-8')
+    with caplog.at_level(logging.WARNING, logger='report_generator'):
+        generator = ReportGenerator(str(template))
+    assert generator.enhanced
+    output = tmp_path / 'report.html'
+    generator.generate_report(dict(DATA), str(output))
+    assert '打印报告' in output.read_text(encoding='utf-8')
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""紧凑记录与字典结果的往返一致性，以及在报告模板和Markdown摘要中的兼容性"""
+
+import os
+
+import pytest
+
+import result_record
+import serialization
+from report_renderer import ReportRenderer, get_environment
+from result_record import TopicResult, compact_output, expand_output, shared_tuple
+from run_analysis import WeiboHotSearchPipeline
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(BASE_DIR, 'weibo_analysis_results.json')
+
+
+@pytest.fixture
+def results():
+    return serialization.load(RESULTS_FILE)
+
+
+def test_round_trip_preserves_fields_and_order(results):
+    expanded = expand_output(compact_output(results))
+    assert expanded == results
+    for original, topic in zip(results['topics'], expanded['topics']):
+        assert list(topic) == list(original)
+
+
+def test_missing_fields_stay_missing():
+    record = TopicResult(title='话题', score=72, idea_source='template')
+    assert record.to_dict() == {'title': '话题', 'score': 72, 'idea_source': 'template'}
+    assert 'product_name' not in record
+    assert record.get('product_name', 'n/a') == 'n/a'
+    with pytest.raises(KeyError):
+        record['rank']
+
+
+def test_unhashable_list_items_are_not_pooled():
+    record = TopicResult(title='话题', event_timeline=[{'time': '08:00', 'event': '上榜'}])
+    assert record['event_timeline'] == ({'time': '08:00', 'event': '上榜'},)
+    assert record.to_dict()['event_timeline'] == [{'time': '08:00', 'event': '上榜'}]
+
+
+def test_shared_tuple_pool_is_bounded(monkeypatch):
+    monkeypatch.setattr(result_record, 'SHARED_TUPLE_POOL_SIZE', 8)
+    monkeypatch.setattr(result_record, '_tuple_pool', type(result_record._tuple_pool)())
+    first = shared_tuple(['功能A', '功能B'])
+    assert shared_tuple(['功能A', '功能B']) is first
+    for i in range(20):
+        shared_tuple([f'功能{i}'])
+    assert len(result_record._tuple_pool) == 8
+
+
+def test_report_renders_records_like_dicts(results, tmp_path):
+    renderer = ReportRenderer('report_template_v2.html', env=get_environment(BASE_DIR, cache_dir=str(tmp_path)))
+    data = dict(results, analysis_time='fixed')
+    expected = renderer.render(data, date='fixed')
+    assert renderer.render(compact_output(data), date='fixed') == expected
+
+
+def test_markdown_summary_accepts_records(results):
+    pipeline = WeiboHotSearchPipeline(output_prefix='test')
+    expected = pipeline.generate_markdown_summary(results)
+    actual = pipeline.generate_markdown_summary(compact_output(results))
+    # 只有"分析时间"一行随当前时间变化
+    strip = lambda text: [line for line in text.splitlines() if '分析时间' not in line]
+    assert strip(actual) == strip(expected)
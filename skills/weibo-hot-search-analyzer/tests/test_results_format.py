@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+import serialization
+from results_format import is_packed, load_results, pack_results, unpack_results
+
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'weibo_analysis_results.json')
+
+
+@pytest.fixture
+def results():
+    return serialization.load(RESULTS_FILE)
+
+
+def test_pack_round_trip(results):
+    packed = pack_results(results)
+    assert is_packed(packed)
+    assert len(packed['templates']) < len(results['topics'])
+    unpacked = unpack_results(packed)
+    assert unpacked == results
+    # 字段顺序也保持不变
+    assert [list(topic) for topic in unpacked['topics']] == [list(topic) for topic in results['topics']]
+    assert list(unpacked) == list(results)
+
+
+def test_lazy_topics_match_full_topics(results, tmp_path):
+    path = tmp_path / 'packed.json'
+    serialization.dump(pack_results(results), str(path))
+    loaded = load_results(str(path))
+    assert not isinstance(loaded['topics'], list)
+    assert [dict(topic) for topic in loaded['topics']] == results['topics']
+
+
+@pytest.mark.parametrize('backend', ['orjson', 'json'])
+def test_lazy_results_can_be_saved_again(results, tmp_path, monkeypatch, backend):
+    if backend == 'json':
+        monkeypatch.setattr(serialization, 'orjson', None)
+    else:
+        pytest.importorskip('orjson')
+    path = tmp_path / 'packed.json'
+    serialization.dump(pack_results(results), str(path))
+    loaded = load_results(str(path))
+
+    resaved = tmp_path / 'resaved.json'
+    serialization.dump(loaded, str(resaved))
+    assert serialization.load(str(resaved)) == results
+    # 单个话题视图同样可以序列化
+    assert serialization.loads(serialization.dumps(loaded['topics'][0])) == results['topics'][0]
+
+
+def test_stdlib_json_needs_unpack(results, tmp_path):
+    path = tmp_path / 'packed.json'
+    serialization.dump(pack_results(results), str(path))
+    with pytest.raises(TypeError):
+        json.dumps(load_results(str(path)))
+    assert json.loads(json.dumps(load_results(str(path), lazy=False), ensure_ascii=False)) == results
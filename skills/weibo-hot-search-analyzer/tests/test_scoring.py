@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from analysis_stats import RunningStats
+import scoring
+from scoring import ScoreBatch, rank_results
+
+# score 与 interestingness + usefulness 不一致（例如分析器另行调整了总分）
+RESULTS = [
+    {'interestingness': 70, 'usefulness': 15, 'score': 79, 'heat_value': 100},
+    {'interestingness': 50, 'usefulness': 8, 'score': 61, 'heat_value': 10},
+    {'interestingness': 40, 'usefulness': 5, 'score': 45, 'heat_value': 0},
+]
+
+
+def test_batch_uses_result_score():
+    batch = ScoreBatch.from_results(RESULTS, thresholds=(80, 60))
+    assert batch.scores.tolist() == [79, 61, 45]
+    assert batch.classes() == ['good', 'good', 'fair']
+
+
+def test_batch_matches_running_stats():
+    stats = RunningStats()
+    stats.excellent_threshold, stats.good_threshold = 80, 60
+    for result in RESULTS:
+        stats.add(result)
+
+    summary = ScoreBatch.from_results(RESULTS, thresholds=(80, 60)).summary()
+    for key, value in stats.summary().items():
+        assert summary[key] == value
+
+
+def test_batch_without_scores_sums_parts():
+    batch = ScoreBatch([70, 50], [15, 8], thresholds=(80, 60))
+    assert batch.scores.tolist() == [85, 58]
+
+
+def test_rank_results_defaults_to_score_order():
+    ranked = rank_results(RESULTS[::-1], weight=0)
+    assert [result['score'] for result in ranked] == [79, 61, 45]
+
+
+def test_rank_results_applies_heat_weight(monkeypatch):
+    results = [
+        {'score': 80, 'heat_value': 10},
+        {'score': 70, 'heat_value': 1000000},
+    ]
+    assert rank_results(results, weight=0.5)[0] is results[1]
+    # 缺省取自 config.json 的 scoring.heat_weight
+    monkeypatch.setattr(scoring, 'heat_weight', lambda: 0.5)
+    assert rank_results(results)[0] is results[1]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from search_backend import SearchProvider, PlaceholderSearchProvider, LocalIndexSearchProvider
+
+
+def test_incomplete_provider_fails_at_construction():
+    class Incomplete(SearchProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_search_many_caches_by_normalized_title():
+    provider = PlaceholderSearchProvider()
+    provider.search_many(['话题A', '话题B'])
+    provider.search_many(['话题a', '话题C'])
+    assert provider.stats()['hits'] == 1
+    assert provider.stats()['misses'] == 3
+
+
+def test_local_index_finds_added_documents(tmp_path):
+    provider = LocalIndexSearchProvider(str(tmp_path / 'index.sqlite3'))
+    provider.add_documents([
+        {'title': '新能源汽车降价', 'content': '多家车企宣布降价', 'kind': 'news'},
+        {'title': '春节档电影票房', 'content': '票房创新高', 'kind': 'background'}
+    ])
+    result = provider.search('新能源汽车降价潮')
+    assert '多家车企宣布降价' in result['news']
+    provider.close()
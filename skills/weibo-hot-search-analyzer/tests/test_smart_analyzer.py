@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+from smart_analyzer import SmartAnalyzer
+
+
+def test_background_lists_are_not_shared_between_topics():
+    analyzer = SmartAnalyzer()
+    first = analyzer.analyze_topic({'title': '某地发生地震', 'hotnum': 100, 'tag': ''}, 1)
+    second = analyzer.analyze_topic({'title': '另一地发生地震', 'hotnum': 90, 'tag': ''}, 2)
+
+    assert first['related_topics'] == second['related_topics']
+    for key in ('related_topics', 'key_points', 'event_timeline'):
+        assert first[key] is not second[key]
+
+    first['related_topics'].append('修改')
+    assert '修改' not in second['related_topics']
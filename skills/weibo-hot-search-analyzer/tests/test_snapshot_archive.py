@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""SnapshotArchive 的时间范围读取、跨天自动合并和最近快照"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from snapshot_archive import SnapshotArchive
+
+
+def _items(*titles):
+    return [{'title': title, 'heat': 100 * (len(titles) - i), 'tags': '热', 'rank': i + 1}
+            for i, title in enumerate(titles)]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = SnapshotArchive(str(tmp_path / 'archive'))
+    archive.append(_items('晚间话题', '夜间话题'), '2025-12-21T23:50:00')
+    archive.append(_items('跨天话题'), '2025-12-21T23:55:00')
+    archive.append(_items('凌晨话题', '早间话题', '跨天话题'), '2025-12-22T00:05:00')
+    archive.append(_items('上午话题'), '2025-12-22T09:00:00')
+    return archive
+
+
+def _files(archive, day):
+    return sorted(os.listdir(os.path.join(archive.root, f'date={day}')))
+
+
+def test_read_across_day_boundary(archive):
+    table = archive.read('2025-12-21T23:55', '2025-12-22T00:05')
+    assert table['title'].to_pylist() == ['跨天话题', '凌晨话题', '早间话题', '跨天话题']
+    assert table['rank'].to_pylist() == [1, 1, 2, 3]
+
+    # 只给日期时包含当天全部快照
+    assert archive.read('2025-12-22', '2025-12-22').num_rows == 4
+    assert archive.read(end='2025-12-21').num_rows == 3
+    assert archive.read(columns=['title']).column_names == ['title']
+
+
+def test_new_day_compacts_previous_days_without_losing_rows(archive):
+    assert archive.days() == [datetime(2025, 12, 21).date(), datetime(2025, 12, 22).date()]
+    # 写入 12-22 的第一个快照时，12-21 的两个文件合并为一个
+    assert _files(archive, '2025-12-21') == ['compact.parquet']
+    assert len(_files(archive, '2025-12-22')) == 2
+
+    day = archive.read('2025-12-21', '2025-12-21')
+    assert day.num_rows == 3
+    assert day['fetch_time'].to_pylist() == [datetime(2025, 12, 21, 23, 50)] * 2 + [datetime(2025, 12, 21, 23, 55)]
+
+    before = archive.read().to_pylist()
+    assert archive.compact('2025-12-22').endswith('compact.parquet')
+    assert _files(archive, '2025-12-22') == ['compact.parquet']
+    assert archive.read().to_pylist() == before
+    assert archive.compact('2025-12-23') is None
+
+
+def test_latest_returns_newest_snapshot(archive):
+    fetch_time, items = archive.latest()
+    assert fetch_time == datetime(2025, 12, 22, 9, 0)
+    assert items == [{'title': '上午话题', 'heat': 100, 'tags': '热', 'rank': 1}]
+
+    assert len(list(archive.iter_snapshots())) == 4
+
+
+def test_latest_of_empty_archive(tmp_path):
+    assert SnapshotArchive(str(tmp_path / 'empty')).latest() is None
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""快照差异、缓存持久化和条件请求"""
+
+import os
+
+from http_client import HttpClient
+from snapshot_cache import SnapshotCache, diff_snapshots
+from weibo_hotsearch_fetcher import WeiboHotSearchFetcher
+
+PREVIOUS = [
+    {'title': '话题A', 'rank': 1, 'heat': 300, 'tags': '热'},
+    {'title': '话题B', 'rank': 2, 'heat': 200, 'tags': ''},
+    {'title': '话题C', 'rank': 3, 'heat': 100, 'tags': ''}
+]
+CURRENT = [
+    {'title': '话题B', 'rank': 1, 'heat': 350, 'tags': ''},
+    {'title': '话题A', 'rank': 2, 'heat': 300, 'tags': '沸'},
+    {'title': '话题D', 'rank': 3, 'heat': 90, 'tags': '新'}
+]
+
+
+def test_diff_reports_each_kind_of_change():
+    diff = diff_snapshots(PREVIOUS, CURRENT)
+
+    assert not diff.unchanged
+    assert [item['title'] for item in diff.added] == ['话题D']
+    assert [item['title'] for item in diff.removed] == ['话题C']
+    assert {change['title'] for change in diff.reranked} == {'话题A', '话题B'}
+    assert diff.heat_changed == [{'title': '话题B', 'old_heat': 200, 'new_heat': 350}]
+    assert diff.tags_changed == [{'title': '话题A', 'old_tags': '热', 'new_tags': '沸'}]
+    assert diff.changed_titles == ['话题D', '话题B', '话题A']
+
+
+def test_diff_of_identical_snapshots_is_unchanged():
+    diff = diff_snapshots(PREVIOUS, [dict(item) for item in PREVIOUS])
+    assert diff.unchanged
+    assert diff.summary() == {'added': 0, 'removed': 0, 'reranked': 0, 'heat_changed': 0, 'tags_changed': 0}
+
+
+def test_first_snapshot_is_all_added():
+    diff = diff_snapshots(None, CURRENT)
+    assert diff.previous_hash is None
+    assert len(diff.added) == 3
+
+
+def test_cache_persists_snapshots_atomically(tmp_path):
+    url = 'http://example.com/hot'
+    cache = SnapshotCache(str(tmp_path))
+    assert cache.update(url, PREVIOUS, etag='"v1"').previous_hash is None
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+    # 新实例从磁盘读取上次快照
+    reloaded = SnapshotCache(str(tmp_path))
+    assert reloaded.conditional_headers(url) == {'If-None-Match': '"v1"'}
+    diff = reloaded.update(url, CURRENT, etag='"v2"')
+    assert diff.previous_hash is not None
+    assert diff.summary()['added'] == 1
+
+
+def test_conditional_request_returns_cached_snapshot(mock_api_url, tmp_path):
+    cache = SnapshotCache(str(tmp_path))
+    client = HttpClient(timeout=5, retry_count=0)
+    fetcher = WeiboHotSearchFetcher(f'{mock_api_url}/hotsearch', client=client)
+
+    items, diff = fetcher.fetch_changes(cache)
+    assert len(items) == 15
+    assert diff.previous_hash is None
+
+    items_again, diff_again = fetcher.fetch_changes(cache)
+    assert items_again == items
+    assert diff_again.unchanged
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""TrendAnalyzer 的AI调用并发上限和预算（用假的异步客户端代替 OpenAI）"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from llm_cache import LLMResponseCache
+from trend_analyzer import LLMBudget, TrendAnalyzer
+
+AI_RESULT = json.dumps({'product_name': '测试产品', 'interestingness': 60, 'usefulness': 15})
+
+
+class FakeCompletions:
+    """记录同时进行的调用数"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        message = SimpleNamespace(content=AI_RESULT)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=100))
+
+
+def _analyzer(max_concurrency: int = 2, **options) -> TrendAnalyzer:
+    analyzer = TrendAnalyzer('sk-test', **options)
+    analyzer.max_concurrency = max_concurrency
+    completions = FakeCompletions()
+    analyzer.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return analyzer
+
+
+def test_direct_async_calls_share_the_concurrency_limit():
+    analyzer = _analyzer(max_concurrency=2)
+    completions = analyzer.async_client.chat.completions
+
+    async def run():
+        topics = [{'title': f'话题{i}', 'heat': 100} for i in range(10)]
+        return await asyncio.gather(*(analyzer.generate_product_idea_async(topic, {}) for topic in topics))
+
+    ideas = asyncio.run(run())
+    assert all(idea.source == 'ai' for idea in ideas)
+    assert completions.calls == 10
+    assert completions.max_in_flight == 2
+
+
+def test_semaphore_is_recreated_for_a_new_event_loop():
+    analyzer = _analyzer(max_concurrency=1)
+    topic = {'title': '话题', 'heat': 100}
+
+    asyncio.run(analyzer.generate_product_idea_async(topic, {}))
+    first = analyzer._llm_semaphore
+    asyncio.run(analyzer.generate_product_idea_async(topic, {}))
+    assert analyzer._llm_semaphore is not first
+    assert analyzer.async_client.chat.completions.max_in_flight == 1
+
+
+def test_budget_records_skipped_calls():
+    budget = LLMBudget(max_tokens=1)
+    analyzer = _analyzer(budget=budget)
+
+    idea = asyncio.run(analyzer.generate_product_idea_async({'title': '话题', 'heat': 100}, {}))
+
+    assert idea.source == 'rules'
+    assert analyzer.async_client.chat.completions.calls == 0
+    assert budget.report()['skipped_calls'] == 1
+
+
+def test_cached_response_is_reused_when_only_heat_changes(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / 'responses.sqlite3'))
+    analyzer = _analyzer(cache=cache)
+    completions = analyzer.async_client.chat.completions
+    search_info = {'background': '背景', 'news': '新闻'}
+
+    async def run(topic):
+        return await analyzer.generate_product_idea_async(topic, search_info)
+
+    first = asyncio.run(run({'title': '话题', 'heat': 1000}))
+    second = asyncio.run(run({'title': ' #话题# ', 'heat': 2500}))
+    assert completions.calls == 1
+    assert cache.hits == 1
+    assert second == first
+
+    asyncio.run(run({'title': '另一个话题', 'heat': 2500}))
+    assert completions.calls == 2
+    cache.close()
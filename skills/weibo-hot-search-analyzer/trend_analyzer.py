@@ -5,12 +5,22 @@ import json
 import asyncio
 import aiohttp
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, AsyncIterator
 import argparse
 import logging
 import re
+import time
 from dataclasses import dataclass
-from openai import OpenAI
+from itertools import islice
+from openai import OpenAI, AsyncOpenAI
+
+from config_loader import get_section
+from analysis_stats import RunningStats
+from llm_cache import LLMResponseCache
+from scoring import classify_score, rank_results
+from search_backend import SearchProvider, create_search_provider
+from snapshot_cache import normalize_title
+import serialization
 
 # 配置日志
 logging.basicConfig(
@@ -31,21 +41,160 @@ class ProductIdea:
     total_score: float  # 总分 0-100
     market_analysis: str
     score_class: str  # excellent, good, fair
+    source: str = 'rules'  # 创意来源：ai 或 rules
+
+
+class TokenRateLimiter:
+    """
+    令牌桶限速：限制每分钟消耗的LLM令牌数
+
+    请求前按估算值预扣令牌，拿到实际用量后再用 adjust 校正。
+    只在单个事件循环中使用，检查和扣减之间没有 await，无需加锁。
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        """
+        初始化限速器
+
+        Args:
+            tokens_per_minute: 每分钟允许的令牌数，0 表示不限速
+        """
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: int):
+        """等待直到桶内有足够令牌并扣除"""
+        if self.capacity <= 0:
+            return
+        tokens = min(tokens, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def adjust(self, delta: int):
+        """按实际用量校正（delta 为实际用量减去预扣值）"""
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class LLMBudget:
+    """
+    单次运行的AI调用预算：令牌总数和耗时上限
+
+    调用前按估算值预留令牌，预留后超出上限或已超时则不再调用，
+    拿到响应后按实际用量结算。
+    """
+
+    def __init__(self, max_tokens: int = 0, max_seconds: float = 0):
+        """
+        初始化预算
+
+        Args:
+            max_tokens: 令牌总数上限，0 表示不限
+            max_seconds: 从 start 起的耗时上限（秒），0 表示不限
+        """
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.started: Optional[float] = None
+        self.tokens_used = 0
+        self.reserved = 0
+        self.calls = 0
+        self.skipped = 0
+
+    def start(self):
+        if self.started is None:
+            self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started if self.started is not None else 0.0
+
+    def remaining_seconds(self) -> Optional[float]:
+        """剩余时间，不限时返回 None"""
+        if not self.max_seconds:
+            return None
+        return max(0.0, self.max_seconds - self.elapsed())
+
+    def reserve(self, tokens: int) -> bool:
+        """为一次调用预留令牌，预算不足或已超时返回 False"""
+        self.start()
+        if self.max_seconds and self.remaining_seconds() <= 0:
+            return False
+        if self.max_tokens and self.tokens_used + self.reserved + tokens > self.max_tokens:
+            return False
+        self.reserved += tokens
+        self.calls += 1
+        return True
+
+    def skip(self):
+        """记录一次因预算不足而跳过的调用"""
+        self.skipped += 1
+
+    def settle(self, reserved: int, used: int):
+        """按实际用量结算一次调用"""
+        self.reserved -= reserved
+        self.tokens_used += used
+
+    def report(self) -> Dict:
+        """预算使用情况"""
+        return {
+            'llm_calls': self.calls,
+            'skipped_calls': self.skipped,
+            'tokens_used': self.tokens_used,
+            'token_budget': self.max_tokens or None,
+            'elapsed_seconds': round(self.elapsed(), 2),
+            'time_budget': self.max_seconds or None
+        }
 
 
 class TrendAnalyzer:
     """热搜趋势分析器"""
 
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(self, openai_api_key: Optional[str] = None, cache: Optional[LLMResponseCache] = None,
+                 search_provider: Optional[SearchProvider] = None, budget: Optional[LLMBudget] = None):
         """
         初始化分析器
 
         Args:
             openai_api_key: OpenAI API密钥，用于AI分析
+            cache: LLM响应缓存，相同请求不再重复调用API
+            search_provider: 话题信息搜索后端，默认按 config.json 的 search 分节创建
+            budget: AI调用预算，用尽后其余话题使用规则引擎
         """
+        openai_config = get_section('openai')
+        self.model = openai_config.get('model', 'gpt-3.5-turbo')
+        self.temperature = openai_config.get('temperature', 0.8)
+        self.max_tokens = openai_config.get('max_tokens', 1000)
+        self.max_concurrency = openai_config.get('max_concurrency', 5)
+        self.request_timeout = openai_config.get('request_timeout', 60)
+        self.cache = cache
+
         self.openai_api_key = openai_api_key
         if openai_api_key:
-            self.client = OpenAI(api_key=openai_api_key)
+            client_options = {'api_key': openai_api_key}
+            if openai_config.get('base_url'):
+                client_options['base_url'] = openai_config['base_url']
+            self.client = OpenAI(**client_options)
+            self.async_client = AsyncOpenAI(**client_options)
+
+        # 异步分析时的并发和令牌限速
+        self.token_limiter = TokenRateLimiter(openai_config.get('tokens_per_minute', 0))
+        self._llm_semaphore: Optional[asyncio.Semaphore] = None
+        self._llm_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.budget = budget
+
+        self.search_provider = search_provider or create_search_provider()
 
     async def search_topic_info(self, session: aiohttp.ClientSession, topic: str) -> Dict:
         """
@@ -58,17 +207,8 @@ class TrendAnalyzer:
         Returns:
             搜索结果信息
         """
-        # 这里使用示例搜索逻辑，实际应用中需要配置真实的搜索API
-        search_results = {
-            'news': f'关于"{topic}"的相关新闻报道...',
-            'background': f'"{topic}"事件的背景信息...',
-            'timeline': f'"{topic}"的事件发展时间线...'
-        }
-
-        # 模拟网络请求延迟
-        await asyncio.sleep(0.5)
-
-        return search_results
+        # analyze_topics 会先批量查询，这里通常直接命中搜索后端的缓存
+        return self.search_provider.search(topic)
 
     def generate_product_idea(self, topic: Dict, search_info: Dict) -> ProductIdea:
         """
@@ -88,8 +228,15 @@ class TrendAnalyzer:
             # 使用规则引擎生成创意
             return self._generate_with_rules(topic, search_info)
 
-    def _generate_with_ai(self, topic: Dict, search_info: Dict) -> ProductIdea:
-        """使用AI生成产品创意"""
+    async def generate_product_idea_async(self, topic: Dict, search_info: Dict) -> ProductIdea:
+        """generate_product_idea 的异步版本，AI调用不阻塞事件循环"""
+        if self.openai_api_key:
+            return await self._generate_with_ai_async(topic, search_info)
+        else:
+            return self._generate_with_rules(topic, search_info)
+
+    def _build_ai_messages(self, topic: Dict, search_info: Dict) -> List[Dict]:
+        """构造AI生成创意的对话消息"""
         prompt = f"""
         基于以下微博热搜话题，请生成一个创新的产品创意：
 
@@ -108,40 +255,148 @@ class TrendAnalyzer:
         - market_analysis: 市场机会分析
         """
 
+        return [
+            {"role": "system", "content": "你是一个专业的产品创新分析师，擅长从热点中发现产品机会。"},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _cache_key(self, topic: Dict, search_info: Dict) -> str:
+        """
+        AI响应的缓存键
+
+        只取模型、温度、归一化标题和搜索信息：提示词中的热度每次轮询都在变化，
+        计入缓存键会让长时间在榜的话题永远无法命中。
+        """
+        stable = {'title': normalize_title(topic.get('title', ''))}
+        return self.cache.make_key(self.model, self.temperature, stable, search_info)
+
+    def _parse_ai_result(self, result: Dict) -> ProductIdea:
+        """将AI返回的JSON转换为产品创意"""
+        # 计算总分
+        total_score = result.get('interestingness', 0) + result.get('usefulness', 0)
+
+        # 确定评分等级
+        score_class = classify_score(total_score)
+
+        return ProductIdea(
+            name=result.get('product_name', ''),
+            core_function=result.get('core_function', ''),
+            target_users=result.get('target_users', ''),
+            interestingness_score=result.get('interestingness', 0),
+            usefulness_score=result.get('usefulness', 0),
+            total_score=total_score,
+            market_analysis=result.get('market_analysis', ''),
+            score_class=score_class,
+            source='ai'
+        )
+
+    def _generate_with_ai(self, topic: Dict, search_info: Dict) -> ProductIdea:
+        """使用AI生成产品创意"""
+        messages = self._build_ai_messages(topic, search_info)
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "你是一个专业的产品创新分析师，擅长从热点中发现产品机会。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8
-            )
+            cache_key = None
+            content = None
+            if self.cache is not None:
+                cache_key = self._cache_key(topic, search_info)
+                content = self.cache.get(cache_key)
+
+            if content is None:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+                content = response.choices[0].message.content
+                result = json.loads(content)
+                # 只缓存能正确解析的响应
+                if cache_key is not None:
+                    self.cache.put(cache_key, content)
+            else:
+                result = json.loads(content)
+
+            return self._parse_ai_result(result)
+
+        except Exception as e:
+            logger.error(f"AI生成创意失败: {e}")
+            # 降级到规则引擎
+            return self._generate_with_rules(topic, search_info)
+
+    def _llm_slots(self) -> asyncio.Semaphore:
+        """
+        限制同时进行的AI调用数的信号量
 
-            result = json.loads(response.choices[0].message.content)
+        每个分析器在每个事件循环中只创建一次，analyze_topics、analyze_iter 和
+        直接调用 generate_product_idea_async 的所有路径共用同一个上限。
+        """
+        loop = asyncio.get_running_loop()
+        if self._llm_semaphore is None or self._llm_semaphore_loop is not loop:
+            self._llm_semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._llm_semaphore_loop = loop
+        return self._llm_semaphore
+
+    def _estimate_tokens(self, messages: List[Dict]) -> int:
+        """粗略估算一次请求消耗的令牌数（中文约每字一个令牌，加上最大输出长度）"""
+        return sum(len(message['content']) for message in messages) + self.max_tokens
 
-            # 计算总分
-            total_score = result.get('interestingness', 0) + result.get('usefulness', 0)
+    async def _generate_with_ai_async(self, topic: Dict, search_info: Dict) -> ProductIdea:
+        """使用异步客户端生成产品创意，受并发数、单次超时和令牌速率限制"""
+        messages = self._build_ai_messages(topic, search_info)
 
-            # 确定评分等级
-            if total_score >= 80:
-                score_class = 'excellent'
-            elif total_score >= 60:
-                score_class = 'good'
+        try:
+            cache_key = None
+            content = None
+            if self.cache is not None:
+                cache_key = self._cache_key(topic, search_info)
+                content = self.cache.get(cache_key)
+
+            if content is None:
+                estimated = self._estimate_tokens(messages)
+                async with self._llm_slots():
+                    timeout = self.request_timeout
+                    if self.budget is not None:
+                        if not self.budget.reserve(estimated):
+                            self.budget.skip()
+                            logger.info(f"AI调用预算已用尽，使用规则引擎: {topic.get('title', '')}")
+                            return self._generate_with_rules(topic, search_info)
+                        remaining = self.budget.remaining_seconds()
+                        if remaining is not None:
+                            timeout = min(timeout, remaining)
+
+                    used = estimated
+                    try:
+                        await self.token_limiter.acquire(estimated)
+                        response = await asyncio.wait_for(
+                            self.async_client.chat.completions.create(
+                                model=self.model,
+                                messages=messages,
+                                temperature=self.temperature,
+                                max_tokens=self.max_tokens
+                            ),
+                            timeout=timeout
+                        )
+                        usage = getattr(response, 'usage', None)
+                        if usage is not None and getattr(usage, 'total_tokens', None):
+                            used = usage.total_tokens
+                            self.token_limiter.adjust(used - estimated)
+                    finally:
+                        if self.budget is not None:
+                            self.budget.settle(estimated, used)
+
+                content = response.choices[0].message.content
+                result = json.loads(content)
+                # 只缓存能正确解析的响应
+                if cache_key is not None:
+                    self.cache.put(cache_key, content)
             else:
-                score_class = 'fair'
+                result = json.loads(content)
 
-            return ProductIdea(
-                name=result.get('product_name', ''),
-                core_function=result.get('core_function', ''),
-                target_users=result.get('target_users', ''),
-                interestingness_score=result.get('interestingness', 0),
-                usefulness_score=result.get('usefulness', 0),
-                total_score=total_score,
-                market_analysis=result.get('market_analysis', ''),
-                score_class=score_class
-            )
+            return self._parse_ai_result(result)
 
+        except asyncio.TimeoutError:
+            logger.error(f"AI生成创意超时: {topic.get('title', '')}")
+            return self._generate_with_rules(topic, search_info)
         except Exception as e:
             logger.error(f"AI生成创意失败: {e}")
             # 降级到规则引擎
@@ -286,10 +541,14 @@ class TrendAnalyzer:
             分析结果列表
         """
         results = []
+        topics = topics[:20]  # 限制处理前20个
+
+        # 批量查询所有话题的背景信息
+        self.search_provider.search_many(topic.get('title', '') for topic in topics)
 
         async with aiohttp.ClientSession() as session:
             tasks = []
-            for i, topic in enumerate(topics[:20]):  # 限制处理前20个
+            for i, topic in enumerate(topics):  # 限制处理前20个
                 task = self._analyze_single_topic(session, topic, i + 1)
                 tasks.append(task)
 
@@ -297,6 +556,50 @@ class TrendAnalyzer:
 
         return results
 
+    async def analyze_iter(self, topics: Iterable[Dict], max_topics: Optional[int] = 20,
+                           stats: Optional[RunningStats] = None,
+                           window: Optional[int] = None) -> AsyncIterator[Dict]:
+        """
+        流式分析话题，每个话题分析完成后立即产出（按完成顺序，分析失败的话题跳过）
+
+        Args:
+            topics: 热搜话题（任意可迭代对象）
+            max_topics: 最多分析的话题数，None 表示不限制
+            stats: RunningStats，传入时逐条累计统计
+            window: 每批同时调度的话题数，默认为最大并发数的4倍（至少20）
+
+        Yields:
+            分析结果
+        """
+        window = window or max(self.max_concurrency * 4, 20)
+        numbered = enumerate(islice(topics, max_topics), 1)
+
+        async with aiohttp.ClientSession() as session:
+            while True:
+                batch = list(islice(numbered, window))
+                if not batch:
+                    break
+
+                # 批量查询本批话题的背景信息
+                self.search_provider.search_many(topic.get('title', '') for _, topic in batch)
+
+                tasks = [
+                    asyncio.ensure_future(self._analyze_single_topic(session, topic, rank))
+                    for rank, topic in batch
+                ]
+                try:
+                    for future in asyncio.as_completed(tasks):
+                        result = await future
+                        if result is None:
+                            continue
+                        if stats is not None:
+                            stats.add(result)
+                        yield result
+                finally:
+                    # 调用方提前结束迭代时取消本批剩余的任务
+                    for task in tasks:
+                        task.cancel()
+
     async def _analyze_single_topic(self, session: aiohttp.ClientSession, topic: Dict, rank: int) -> Dict:
         """分析单个话题"""
         try:
@@ -307,7 +610,7 @@ class TrendAnalyzer:
             search_info = await self.search_topic_info(session, title)
 
             # 生成产品创意
-            product_idea = self.generate_product_idea(topic, search_info)
+            product_idea = await self.generate_product_idea_async(topic, search_info)
 
             # 构建结果
             result = {
@@ -323,7 +626,8 @@ class TrendAnalyzer:
                 'usefulness': product_idea.usefulness_score,
                 'score': product_idea.total_score,
                 'score_class': product_idea.score_class,
-                'market_analysis': product_idea.market_analysis
+                'market_analysis': product_idea.market_analysis,
+                'idea_source': product_idea.source
             }
 
             logger.info(f"话题 #{rank} 分析完成，得分: {product_idea.total_score}")
@@ -354,22 +658,21 @@ class TrendAnalyzer:
         valid_results = [r for r in results if r is not None]
 
         # 添加统计信息
-        total_count = len(valid_results)
-        excellent_count = sum(1 for r in valid_results if r['score'] >= 80)
-        good_count = sum(1 for r in valid_results if 60 <= r['score'] < 80)
-        avg_score = sum(r['score'] for r in valid_results) / total_count if total_count > 0 else 0
+        stats = RunningStats()
+        for result in valid_results:
+            stats.add(result)
+        summary = stats.summary()
 
         output_data = {
             'analysis_time': datetime.now().isoformat(),
-            'total_topics': total_count,
-            'excellent_count': excellent_count,
-            'good_count': good_count,
-            'avg_score': round(avg_score, 1),
-            'topics': valid_results
+            'total_topics': summary['total_topics'],
+            'excellent_count': summary['excellent_count'],
+            'good_count': summary['good_count'],
+            'avg_score': summary['avg_score'],
+            'topics': rank_results(valid_results)
         }
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        serialization.dump(output_data, output_file)
 
         logger.info(f"分析结果已保存到: {output_file}")
 
@@ -380,22 +683,35 @@ async def main():
     parser.add_argument('--input', required=True, help='热搜数据文件路径')
     parser.add_argument('--output', default='analysis_results.json', help='输出文件路径')
     parser.add_argument('--openai-key', help='OpenAI API密钥')
+    parser.add_argument('--llm-cache', default=None, help='LLM响应缓存文件路径（默认在脚本目录下的 .llm_cache）')
+    parser.add_argument('--llm-cache-ttl', type=float, default=6 * 3600, help='LLM响应缓存有效期（秒）')
+    parser.add_argument('--no-llm-cache', action='store_true', help='不使用LLM响应缓存')
 
     args = parser.parse_args()
 
     try:
         # 读取热搜数据
-        with open(args.input, 'r', encoding='utf-8') as f:
-            hot_search_data = json.load(f)
+        hot_search_data = serialization.load(args.input)
 
         topics = hot_search_data.get('data', [])
         logger.info(f"加载了 {len(topics)} 个热搜话题")
 
         # 创建分析器
-        analyzer = TrendAnalyzer(args.openai_key)
+        cache = None
+        if args.openai_key and not args.no_llm_cache:
+            cache_options = {'ttl': args.llm_cache_ttl}
+            if args.llm_cache:
+                cache_options['path'] = args.llm_cache
+            cache = LLMResponseCache(**cache_options)
+        analyzer = TrendAnalyzer(args.openai_key, cache=cache)
 
         # 分析话题
         results = await analyzer.analyze_topics(topics)
+        logger.info(f"搜索缓存统计: {analyzer.search_provider.stats()}")
+        analyzer.search_provider.close()
+        if cache is not None:
+            logger.info(f"LLM缓存统计: {cache.stats()}")
+            cache.close()
 
         # 保存结果
         analyzer.save_results(results, args.output)
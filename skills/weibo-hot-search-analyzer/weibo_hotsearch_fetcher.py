@@ -2,13 +2,21 @@
 # -*- coding: utf-8 -*-
 
 import requests
+import aiohttp
+import asyncio
 import json
 import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 import argparse
 import logging
 
+from http_client import HttpClient, DEFAULT_HEADERS
+import serialization
+from snapshot_archive import SnapshotArchive
+from snapshot_cache import SnapshotCache, SnapshotDiff, normalize_title
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -17,21 +25,139 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _parse_heat(value) -> int:
+    """清理热度数值，如 "1,234"、"123 剧集"，无法解析时返回 0"""
+    if not isinstance(value, str):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return 0
+
+    hot_num = value.strip()
+    # 移除类别前缀如"剧集 "
+    if ' ' in hot_num and hot_num.split(' ')[0].isdigit():
+        hot_num = hot_num.split(' ')[0]
+    # 转换为数字
+    try:
+        return int(hot_num.replace(',', ''))
+    except ValueError:
+        return 0
+
+
+def parse_tianapi_list(raw_list: List[Dict], heat_key: str) -> List[Dict]:
+    """转换天API的热搜列表"""
+    hot_search_list = []
+    for i, item in enumerate(raw_list):
+        hot_search_list.append({
+            'title': item.get('hotword', ''),
+            'heat': _parse_heat(item.get(heat_key, '0')),
+            'tags': (item.get('hottag') or '').strip(),
+            'rank': i + 1
+        })
+    return hot_search_list
+
+
+def parse_hot_search_response(data) -> List[Dict]:
+    """
+    根据API响应格式解析热搜列表
+
+    支持的格式：
+    - 天API代理格式：{"data": {"result": {"list": [...]}}}，热度字段 hotwordnum
+    - 天API官方格式：{"code": 200, "result": {"list": [...]}}，热度字段 hotnum
+    - 自定义格式：{"data": [...]} 或直接返回列表
+
+    Args:
+        data: 已解码的JSON响应
+
+    Returns:
+        热搜列表数据
+    """
+    if isinstance(data, dict) and 'data' in data and isinstance(data['data'], dict) and 'result' in data['data'] and 'list' in data['data']['result']:
+        # 天API格式
+        return parse_tianapi_list(data['data']['result']['list'], 'hotwordnum')
+    elif isinstance(data, dict) and isinstance(data.get('result'), dict) and 'list' in data['result']:
+        return parse_tianapi_list(data['result']['list'], 'hotnum')
+    elif isinstance(data, dict) and 'data' in data:
+        return data['data']
+    else:
+        return data
+
+
+def merge_hot_search_lists(lists: List[List[Dict]]) -> List[Dict]:
+    """
+    合并多个热搜列表（多个接口或分页）
+
+    按归一化标题去重，保留第一次出现的条目，热度取各来源中的最大值；
+    合并后按出现顺序重新编号 rank，不会出现多个从 1 开始的排名。
+
+    Args:
+        lists: 按来源顺序排列的热搜列表
+
+    Returns:
+        去重并重新排名后的热搜列表
+    """
+    merged: List[Dict] = []
+    seen: Dict[str, Dict] = {}
+    for items in lists:
+        for item in items:
+            key = normalize_title(item.get('title', ''))
+            existing = seen.get(key) if key else None
+            if existing is not None:
+                if isinstance(item.get('heat'), int) and item['heat'] > existing.get('heat', 0):
+                    existing['heat'] = item['heat']
+                continue
+            item = dict(item)
+            merged.append(item)
+            if key:
+                seen[key] = item
+
+    for rank, item in enumerate(merged, 1):
+        item['rank'] = rank
+    return merged
+
+
+class HostRateLimiter:
+    """按主机限速：同一主机的两次请求之间至少间隔 min_interval 秒"""
+
+    def __init__(self, min_interval: float = 0):
+        """
+        初始化限速器
+
+        Args:
+            min_interval: 同一主机两次请求的最小间隔（秒），0 表示不限速
+        """
+        self.min_interval = min_interval
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_request: Dict[str, float] = {}
+
+    async def wait(self, host: str):
+        """等待直到可以向该主机发出下一个请求"""
+        if self.min_interval <= 0:
+            return
+
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            delay = self._last_request.get(host, 0) + self.min_interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_request[host] = loop.time()
+
+
 class WeiboHotSearchFetcher:
     """微博热搜数据抓取器"""
 
-    def __init__(self, api_url: str):
+    def __init__(self, api_url: str, client: Optional[HttpClient] = None):
         """
         初始化抓取器
 
         Args:
             api_url: 微博热搜API地址
+            client: 共享HTTP客户端，默认按 config.json 创建
         """
         self.api_url = api_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.client = client or HttpClient.from_config()
+        self.session = self.client.session
 
     def fetch_hot_search(self) -> List[Dict]:
         """
@@ -42,39 +168,10 @@ class WeiboHotSearchFetcher:
         """
         try:
             logger.info(f"正在获取微博热搜数据: {self.api_url}")
-            response = self.session.get(self.api_url, timeout=10)
+            response = self.client.get(self.api_url)
             response.raise_for_status()
 
-            data = response.json()
-
-            # 根据实际API响应格式解析数据
-            if isinstance(data, dict) and 'data' in data and isinstance(data['data'], dict) and 'result' in data['data'] and 'list' in data['data']['result']:
-                # 天API格式
-                raw_list = data['data']['result']['list']
-                hot_search_list = []
-                for i, item in enumerate(raw_list):
-                    # 清理热度数值
-                    hot_num = item.get('hotwordnum', '0').strip()
-                    # 移除类别前缀如"剧集 "
-                    if ' ' in hot_num and hot_num.split(' ')[0].isdigit():
-                        hot_num = hot_num.split(' ')[0]
-                    # 转换为数字
-                    try:
-                        hot_value = int(hot_num.replace(',', ''))
-                    except:
-                        hot_value = 0
-
-                    hot_search_list.append({
-                        'title': item.get('hotword', ''),
-                        'heat': hot_value,
-                        'tags': item.get('hottag', '').strip(),
-                        'rank': i + 1
-                    })
-            elif isinstance(data, dict) and 'data' in data:
-                hot_search_list = data['data']
-            else:
-                hot_search_list = data
-
+            hot_search_list = parse_hot_search_response(response.json())
             logger.info(f"成功获取 {len(hot_search_list)} 条热搜数据")
             return hot_search_list
 
@@ -88,6 +185,36 @@ class WeiboHotSearchFetcher:
             logger.error(f"获取热搜数据时发生错误: {e}")
             raise
 
+    def fetch_changes(self, cache: SnapshotCache) -> Tuple[List[Dict], SnapshotDiff]:
+        """
+        使用条件请求获取热搜数据，并返回相对上次快照的变化
+
+        上游支持 ETag/Last-Modified 时，未变化的榜单直接返回 304，不再下载和解析；
+        否则按内容哈希判断榜单是否变化。
+
+        Args:
+            cache: 快照缓存
+
+        Returns:
+            (完整热搜列表, 快照差异)
+        """
+        logger.info(f"正在获取微博热搜数据: {self.api_url}")
+        response = self.client.get(self.api_url, headers=cache.conditional_headers(self.api_url))
+        if response.status_code == 304:
+            logger.info("热搜榜单未变化（304）")
+            return cache.unchanged(self.api_url)
+
+        response.raise_for_status()
+        hot_search_list = parse_hot_search_response(response.json())
+        diff = cache.update(
+            self.api_url,
+            hot_search_list,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        logger.info(f"成功获取 {len(hot_search_list)} 条热搜数据，变化: {diff.summary()}")
+        return hot_search_list, diff
+
     def save_data(self, data: List[Dict], output_file: str):
         """
         保存数据到文件
@@ -104,8 +231,7 @@ class WeiboHotSearchFetcher:
                 'data': data
             }
 
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+            serialization.dump(output_data, output_file)
 
             logger.info(f"数据已保存到: {output_file}")
 
@@ -114,24 +240,125 @@ class WeiboHotSearchFetcher:
             raise
 
 
+class AsyncHotSearchFetcher:
+    """
+    并发热搜抓取器
+
+    在一个连接池上并发抓取多个热搜接口或分页，
+    通过信号量限制并发数，并对同一主机按最小间隔限速。
+    可作为异步上下文管理器使用，在多轮轮询之间复用连接池。
+    """
+
+    def __init__(self, api_urls: List[str], concurrency: int = 4, delay: float = 0,
+                 client: Optional[HttpClient] = None):
+        """
+        初始化抓取器
+
+        Args:
+            api_urls: 热搜API地址列表
+            concurrency: 同时进行的最大请求数
+            delay: 同一主机两次请求的最小间隔（秒）
+            client: 共享HTTP客户端（超时、重试、熔断），默认按 config.json 创建
+        """
+        self.api_urls = list(api_urls)
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = HostRateLimiter(delay)
+        self.client = client or HttpClient.from_config()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        return aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+
+    async def __aenter__(self):
+        self._session = self._create_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    async def _fetch_one(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str) -> List[Dict]:
+        """抓取并解析单个地址"""
+        async with semaphore:
+            await self.rate_limiter.wait(urlsplit(url).netloc)
+            logger.info(f"正在获取微博热搜数据: {url}")
+            data = await self.client.get_json_async(session, url)
+
+        hot_search_list = parse_hot_search_response(data)
+        logger.info(f"成功获取 {len(hot_search_list)} 条热搜数据: {url}")
+        return hot_search_list
+
+    async def fetch_all(self) -> Dict[str, List[Dict]]:
+        """
+        并发抓取所有地址
+
+        Returns:
+            地址 -> 热搜列表，按 api_urls 顺序排列；失败的地址会记录日志并被跳过
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        session = self._session or self._create_session()
+        try:
+            responses = await asyncio.gather(
+                *(self._fetch_one(session, semaphore, url) for url in self.api_urls),
+                return_exceptions=True
+            )
+        finally:
+            if session is not self._session:
+                await session.close()
+
+        results = {}
+        for url, response in zip(self.api_urls, responses):
+            if isinstance(response, Exception):
+                logger.error(f"请求失败: {url}: {response}")
+                continue
+            results[url] = response
+        return results
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='微博热搜数据抓取工具')
-    parser.add_argument('--api-url', required=True, help='微博热搜API地址')
+    parser.add_argument('--api-url', required=True, nargs='+', help='微博热搜API地址，可传入多个（如分页），结果按顺序合并、按标题去重并重新排名')
     parser.add_argument('--output', default='hot_search_data.json', help='输出文件路径')
-    parser.add_argument('--delay', type=int, default=1, help='请求间隔（秒）')
+    parser.add_argument('--delay', type=float, default=1, help='同一主机的请求间隔（秒）')
+    parser.add_argument('--concurrency', type=int, default=4, help='最大并发请求数')
+    parser.add_argument('--cache-dir', help='快照缓存目录，指定后使用条件请求并输出与上次快照的差异（只支持单个地址）')
+    parser.add_argument('--archive', help='列式快照归档目录，指定后把本次快照追加到 Parquet 归档（需要 pyarrow）')
 
     args = parser.parse_args()
+    if args.cache_dir and len(args.api_url) > 1:
+        parser.error('--cache-dir 只支持单个 --api-url')
 
     try:
         # 创建抓取器
-        fetcher = WeiboHotSearchFetcher(args.api_url)
+        client = HttpClient.from_config()
+        fetcher = WeiboHotSearchFetcher(args.api_url[0], client=client)
 
         # 获取热搜数据
-        hot_search_data = fetcher.fetch_hot_search()
+        if len(args.api_url) == 1 and args.cache_dir:
+            hot_search_data, diff = fetcher.fetch_changes(SnapshotCache(args.cache_dir))
+            if diff.unchanged:
+                print("\nℹ️ 热搜榜单与上次快照相同")
+            else:
+                print(f"\n🔄 与上次快照相比: {diff.summary()}")
+        elif len(args.api_url) == 1:
+            hot_search_data = fetcher.fetch_hot_search()
+        else:
+            async_fetcher = AsyncHotSearchFetcher(args.api_url, concurrency=args.concurrency,
+                                                  delay=args.delay, client=client)
+            results = asyncio.run(async_fetcher.fetch_all())
+            if not results:
+                raise RuntimeError('所有热搜地址均获取失败')
+            hot_search_data = merge_hot_search_lists(list(results.values()))
+
+        logger.info(f"请求统计: {client.stats()}")
 
         # 保存数据
         fetcher.save_data(hot_search_data, args.output)
+        if args.archive:
+            archived = SnapshotArchive(args.archive).append(hot_search_data)
+            logger.info(f"快照已追加到归档: {archived}")
 
         print(f"\n✅ 成功抓取 {len(hot_search_data)} 条热搜数据")
         print(f"📁 数据已保存到: {args.output}")